@@ -0,0 +1,132 @@
+"""
+Trilingual article groups.
+
+Gazette articles are printed three times, once per language column. After
+chunking, the Kinyarwanda, English and French versions of an article (same
+article number, overlapping page spans) are aligned into one group: every
+chunk gets metadata['article_group'] and metadata['sibling_chunk_ids'].
+
+The vector store can then embed one version per group (see
+create_embeddings.EMBEDDING_GROUP_MODE) and keep the sibling chunks in the
+docstore only; retrieval expands a hit to its siblings by ID.
+"""
+
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, Tuple
+
+# 'all' embeds every chunk, 'canonical' one language version per group,
+# 'pooled' the mean of the versions' vectors (one vector per group)
+GROUP_MODES = ('all', 'canonical', 'pooled')
+
+# Versions tried, in order, as the embedded one of a group
+CANONICAL_LANGUAGES = ('en', 'fr', 'rw')
+
+
+def _article_key(chunk_id: str) -> str:
+    """Chunk ID of the whole article (sub-chunk suffix removed)"""
+    return re.sub(r'_sub\d+', '', chunk_id)
+
+
+def _spans_overlap(a: Dict, b: Dict) -> bool:
+    """Page spans that share or touch a page (a translation may run one page longer)"""
+    return a['page_start'] <= b['page_end'] + 1 and b['page_start'] <= a['page_end'] + 1
+
+
+def align_article_groups(chunks: List[Dict]) -> int:
+    """
+    Tag the language versions of each article with a shared group.
+
+    Chunks without an article number (fragments, tables of contents, case law)
+    are left alone. Returns the number of groups formed.
+    """
+    # Whole articles in order: key -> {'column', 'number', 'page_start', 'page_end', 'chunks'}
+    articles = {}
+    for chunk in chunks:
+        metadata = chunk['metadata']
+        if not metadata.get('article_number'):
+            continue
+        key = _article_key(chunk['chunk_id'])
+        article = articles.get(key)
+        if article is None:
+            page_start = metadata.get('page_start', metadata.get('page'))
+            article = articles[key] = {
+                'key': key,
+                'column': metadata.get('column'),
+                'number': metadata['article_number'],
+                'page_start': page_start,
+                'page_end': metadata.get('page_end', page_start),
+                'chunks': [],
+            }
+        article['chunks'].append(chunk)
+
+    by_number = defaultdict(list)
+    for article in articles.values():
+        by_number[article['number']].append(article)
+
+    group_ids = Counter()
+    groups = 0
+    for number, candidates in by_number.items():
+        used = set()
+        for article in candidates:
+            if article['key'] in used:
+                continue
+            members = [article]
+            for other in candidates:
+                if (other['key'] not in used and other is not article
+                        and other['column'] not in {m['column'] for m in members}
+                        and _spans_overlap(article, other)):
+                    members.append(other)
+            used.update(m['key'] for m in members)
+            if len(members) < 2:
+                continue
+
+            group_id = re.sub(r'_col\d+', '', article['key']) + '_grp'
+            group_ids[group_id] += 1
+            if group_ids[group_id] > 1:
+                group_id = f"{group_id}{group_ids[group_id] - 1}"
+            groups += 1
+
+            for member in members:
+                siblings = [c['chunk_id'] for m in members if m is not member for c in m['chunks']]
+                for chunk in member['chunks']:
+                    chunk['metadata']['article_group'] = group_id
+                    chunk['metadata']['sibling_chunk_ids'] = siblings
+    return groups
+
+
+def split_canonical(chunks: List[Dict], language: str = CANONICAL_LANGUAGES[0]
+                    ) -> Tuple[List[Dict], List[Dict], Dict[str, List[str]]]:
+    """
+    Split grouped chunks into the ones to embed and the ones stored by ID only.
+
+    Returns (embedded chunks, sibling chunks, pairs) where pairs maps each
+    embedded chunk_id to the sibling chunk_ids covering the same text (the
+    sub-chunk at the same relative position in every other language), which
+    is what a pooled vector averages over.
+    """
+    preference = (language,) + tuple(l for l in CANONICAL_LANGUAGES if l != language)
+    groups = defaultdict(lambda: defaultdict(list))  # group -> language/column -> chunks
+    embedded, siblings = [], []
+    for chunk in chunks:
+        metadata = chunk['metadata']
+        group_id = metadata.get('article_group')
+        if group_id is None:
+            embedded.append(chunk)
+        else:
+            groups[group_id][metadata.get('language') or metadata.get('column')].append(chunk)
+
+    pairs = {}
+    for versions in groups.values():
+        canonical = next((l for l in preference if l in versions), next(iter(versions)))
+        kept = versions[canonical]
+        embedded.extend(kept)
+        for version, version_chunks in versions.items():
+            if version != canonical:
+                siblings.extend(version_chunks)
+        for i, chunk in enumerate(kept):
+            pairs[chunk['chunk_id']] = [
+                version_chunks[i * len(version_chunks) // len(kept)]['chunk_id']
+                for version, version_chunks in versions.items() if version != canonical
+            ]
+    return embedded, siblings, pairs
@@ -0,0 +1,103 @@
+"""
+Persistent article index for exact-article questions.
+
+Maps (source_file, language, article_number) to the chunk IDs of that article
+and the pages it spans. It is written at ingestion next to the FAISS index
+(article_index.json inside the vector store directory), and the chat page
+resolves references such as "Ingingo ya 91" or "Article 12" with a dictionary
+lookup instead of an LLM scout call and a similarity search.
+
+Chunk IDs are also the FAISS docstore IDs (see create_embeddings.py), so the
+matching chunks are read straight from the docstore.
+"""
+
+import json
+import os
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from article_groups import CANONICAL_LANGUAGES
+
+ARTICLE_INDEX_FILE = "article_index.json"
+
+
+class ArticleIndex:
+    """article_number -> source_file -> language -> list of article entries"""
+
+    def __init__(self, path: str, articles: Optional[Dict] = None):
+        self.path = path
+        self.articles = articles or {}
+
+    @classmethod
+    def load(cls, vector_store_path: str) -> 'ArticleIndex':
+        path = os.path.join(vector_store_path, ARTICLE_INDEX_FILE)
+        try:
+            with open(path) as f:
+                return cls(path, json.load(f)['articles'])
+        except (OSError, ValueError, KeyError):
+            return cls(path)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp-{os.getpid()}"
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': 1, 'articles': self.articles}, f)
+        os.replace(tmp_path, self.path)
+
+    def add_chunks(self, chunks: Iterable[Dict]):
+        """Index the article chunks of ingested documents (chunks need metadata['source_file'])"""
+        entries = {}  # (number, source, language, page_start, column) -> entry
+        for chunk in chunks:
+            metadata = chunk['metadata']
+            number = metadata.get('article_number')
+            if not number:
+                continue
+            page_start = metadata.get('page_start', metadata.get('page'))
+            key = (number, metadata['source_file'], metadata.get('language'), page_start, metadata.get('column'))
+            entry = entries.get(key)
+            if entry is None:
+                entry = entries[key] = {
+                    'chunk_ids': [],
+                    'page_start': page_start,
+                    'page_end': metadata.get('page_end', page_start),
+                    'column': metadata.get('column'),
+                }
+                languages = self.articles.setdefault(number, {}).setdefault(metadata['source_file'], {})
+                languages.setdefault(metadata.get('language') or 'unknown', []).append(entry)
+            entry['chunk_ids'].append(chunk['chunk_id'])
+
+    def remove_source(self, source_file: str) -> int:
+        """Drop every article of one document; returns the number of entries removed"""
+        removed = 0
+        for number in list(self.articles):
+            languages = self.articles[number].pop(source_file, {})
+            removed += sum(len(entries) for entries in languages.values())
+            if not self.articles[number]:
+                del self.articles[number]
+        return removed
+
+    def lookup(self, article_number: str, language: Optional[str] = None,
+               source_files: Optional[Iterable[str]] = None) -> List[Dict]:
+        """
+        Entries for one article number, optionally limited to a language and to
+        some documents. Each entry has source_file, language, chunk_ids,
+        page_start, page_end and column.
+        """
+        results = []
+        by_source = self.articles.get(str(article_number), {})
+        sources = by_source if source_files is None else [s for s in source_files if s in by_source]
+        for source_file in sources:
+            for entry_language, entries in by_source[source_file].items():
+                if language is None or entry_language == language:
+                    results.extend({'source_file': source_file, 'language': entry_language, **entry} for entry in entries)
+        return results
+
+
+def preferred_versions(entries: List[Dict], preference: Sequence[str] = CANONICAL_LANGUAGES) -> List[Dict]:
+    """Entries of one language per document: the first language of preference it has"""
+    rank = {language: i for i, language in enumerate(preference)}
+    best = {}
+    for entry in entries:
+        current = best.get(entry['source_file'])
+        if current is None or rank.get(entry['language'], len(rank)) < rank.get(current, len(rank)):
+            best[entry['source_file']] = entry['language']
+    return [entry for entry in entries if entry['language'] == best[entry['source_file']]]
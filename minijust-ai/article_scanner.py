@@ -0,0 +1,134 @@
+"""
+Single-pass scanner for article headers in Rwandan legal documents.
+
+One precompiled regex recognizes "Ingingo ya <n>" (Kinyarwanda), "Article <n>"
+(English/French) and "Art. <n>" headers. Numbers may be digits, Kinyarwanda
+ordinals (mbere ... magana cyenda na mirongo icyenda na icyenda), "premier",
+English number words or roman numerals; they are all normalized to digit
+strings, so "Ingingo ya cumi na kabiri", "Article 12" and "Art. XII" all give '12'.
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+# Kinyarwanda ordinals: "Ingingo ya mbere", "ya kabiri", ..., "ya cumi na rimwe",
+# "ya makumyabiri na gatanu", "ya mirongo itatu", "ya ijana na mbere" ...
+KINYARWANDA_UNITS = {
+    'rimwe': 1, 'kabiri': 2, 'gatatu': 3, 'kane': 4, 'gatanu': 5,
+    'gatandatu': 6, 'karindwi': 7, 'umunani': 8, 'munani': 8, 'icyenda': 9,
+}
+KINYARWANDA_TENS = {
+    'icumi': 10, 'cumi': 10, 'makumyabiri': 20,
+    'mirongo itatu': 30, 'mirongo ine': 40, 'mirongo itanu': 50, 'mirongo itandatu': 60,
+    'mirongo irindwi': 70, 'mirongo inani': 80, 'mirongo icyenda': 90,
+}
+KINYARWANDA_HUNDREDS = {
+    'ijana': 100, 'magana abiri': 200, 'magana atatu': 300, 'magana ane': 400,
+    'magana atanu': 500, 'magana atandatu': 600, 'magana arindwi': 700,
+    'magana inani': 800, 'magana cyenda': 900,
+}
+KINYARWANDA_NUMBERS = {'mbere': 1, **KINYARWANDA_UNITS, **KINYARWANDA_TENS, **KINYARWANDA_HUNDREDS}
+
+ENGLISH_NUMBERS = {
+    'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5,
+    'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10,
+}
+FRENCH_NUMBERS = {'premier': 1, 'première': 1}
+
+ROMAN_VALUES = {'I': 1, 'V': 5, 'X': 10, 'L': 50, 'C': 100}
+
+
+def _alternation(words) -> str:
+    """Regex alternation of words (longest first), spaces matching any whitespace"""
+    return '|'.join(
+        re.escape(word).replace(r'\ ', r'\s+')
+        for word in sorted(words, key=len, reverse=True)
+    )
+
+
+# Units after "na": "ya ijana na mbere" (101) as well as "ya cumi na rimwe" (11)
+_UNITS = _alternation({'mbere', *KINYARWANDA_UNITS})
+_TENS = _alternation(KINYARWANDA_TENS)
+_HUNDREDS = _alternation(KINYARWANDA_HUNDREDS)
+_KINYARWANDA_NUMBER = (
+    rf'(?:{_HUNDREDS})(?:\s+na\s+(?:{_TENS}))?(?:\s+na\s+(?:{_UNITS}))?'
+    rf'|(?:{_TENS})(?:\s+na\s+(?:{_UNITS}))?'
+    rf'|mbere|{_alternation(set(KINYARWANDA_UNITS) - {"rimwe"})}'
+)
+
+_HEADER = (
+    rf'(?P<header>Ingingo\s+ya\s+(?P<rw_number>\d+|{_KINYARWANDA_NUMBER})'
+    rf'|(?:Article|Art\.)\s+(?P<number>\d+|{_alternation(FRENCH_NUMBERS)}|{_alternation(ENGLISH_NUMBERS)}|(?-i:[IVXLC]+)))\b'
+)
+
+# Headers anywhere in the text (page text joined with spaces)
+HEADER_PATTERN = re.compile(_HEADER, re.IGNORECASE)
+
+# Headers that open a line and end there or at a ':' / '.' / '-', which skips
+# cross-references such as "... in accordance with Article 3;"
+LINE_HEADER_PATTERN = re.compile(rf'^[ \t]*{_HEADER}(?=[ \t]*(?:[:.\-–]|$))', re.IGNORECASE | re.MULTILINE)
+
+# Matches starting this close to the previous one are the same header
+MIN_HEADER_DISTANCE = 5
+
+
+def kinyarwanda_number(words: str) -> int:
+    """Value of a Kinyarwanda ordinal such as 'cumi na kabiri' (12)"""
+    parts = re.split(r'\s+na\s+', words.strip().lower())
+    return sum(KINYARWANDA_NUMBERS[' '.join(part.split())] for part in parts)
+
+
+def roman_number(numeral: str) -> int:
+    values = [ROMAN_VALUES[c] for c in numeral]
+    return sum(-v if i + 1 < len(values) and v < values[i + 1] else v for i, v in enumerate(values))
+
+
+def _parse_number(match) -> Tuple[str, Optional[str]]:
+    """(digit string, language implied by the header) of a header match"""
+    if match.group('rw_number'):
+        number = match.group('rw_number')
+        return (number if number.isdigit() else str(kinyarwanda_number(number))), 'rw'
+
+    number = match.group('number')
+    if number.isdigit():
+        return number, None
+    if number.lower() in FRENCH_NUMBERS:
+        return '1', 'fr'
+    if number.lower() in ENGLISH_NUMBERS:
+        return str(ENGLISH_NUMBERS[number.lower()]), 'en'
+    return str(roman_number(number)), None
+
+
+def scan_articles(text: str, line_start: bool = False) -> List[Dict]:
+    """
+    Find article headers in one pass over the text.
+
+    Args:
+        text: Text to scan
+        line_start: Only accept headers that open a line (column text in reading
+            order); otherwise headers are found anywhere (space-joined page text)
+
+    Returns:
+        list: Headers in text order, each a dict with 'number' (digit string),
+        'start_pos', 'matched_text' and 'language' ('rw' for Ingingo, 'fr' for
+        "premier", 'en' for English number words, otherwise None)
+    """
+    pattern = LINE_HEADER_PATTERN if line_start else HEADER_PATTERN
+    articles = []
+    last_start = -MIN_HEADER_DISTANCE
+
+    for match in pattern.finditer(text):
+        start = match.start('header')
+        if start - last_start < MIN_HEADER_DISTANCE:
+            continue
+        last_start = start
+
+        number, language = _parse_number(match)
+        articles.append({
+            'number': number,
+            'start_pos': start,
+            'matched_text': match.group('header'),
+            'language': language
+        })
+
+    return articles
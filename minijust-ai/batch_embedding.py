@@ -0,0 +1,147 @@
+"""
+Length-bucketed batch embedding for ingestion.
+
+A transformer batch is padded to its longest text, so mixing a section header
+with a full page wastes most of the batch. Texts are sorted by token count
+(token_budget.token_counts), longest first, and cut into batches whose padded
+size (texts x longest text) stays within EMBED_BATCH_TOKENS; short texts end
+up in large batches and long ones in small batches.
+
+With EMBED_WORKERS > 1 the batches are spread over a process pool. Each
+worker loads its own copy of the model and is pinned to
+EMBED_THREADS_PER_WORKER threads (by default the CPUs split evenly), so the
+workers do not oversubscribe the machine. The pool lives for one
+embed_documents call, as in parse_pdf_words; it pays off for large ingestion
+runs, not for a handful of chunks.
+
+Every call records its throughput in BucketedEmbeddings.stats; run
+python batch_embedding.py file.pdf 1 2 4 to compare worker counts.
+"""
+
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from token_budget import MAX_SEQ_LENGTH, SPECIAL_TOKENS, token_counts
+
+# Padded tokens (texts x longest text) per model batch
+EMBED_BATCH_TOKENS = int(os.getenv("EMBED_BATCH_TOKENS", "8192"))
+# Texts per model batch, however short they are
+EMBED_MAX_BATCH = int(os.getenv("EMBED_MAX_BATCH", "256"))
+# Encode processes for ingestion (1 embeds in this process)
+EMBED_WORKERS = int(os.getenv("EMBED_WORKERS", "1"))
+# Torch threads per encode process; 0 splits the CPUs evenly between workers
+EMBED_THREADS_PER_WORKER = int(os.getenv("EMBED_THREADS_PER_WORKER", "0"))
+# Fewer batches than this are embedded in this process even with workers
+MIN_POOL_BATCHES = 4
+
+
+def padded_lengths(texts: Sequence[str]) -> np.ndarray:
+    """Sequence length of each text as the model sees it (special tokens added, truncated)"""
+    return np.minimum(token_counts(texts) + SPECIAL_TOKENS, MAX_SEQ_LENGTH)
+
+
+def plan_batches(lengths: np.ndarray, batch_tokens: int = EMBED_BATCH_TOKENS,
+                 max_batch: int = EMBED_MAX_BATCH) -> List[np.ndarray]:
+    """Indices of the texts in each batch: longest first, padded size within batch_tokens"""
+    order = np.argsort(-np.asarray(lengths), kind='stable')
+    batches = []
+    i = 0
+    while i < len(order):
+        size = min(max_batch, max(1, batch_tokens // max(1, int(lengths[order[i]]))))
+        batches.append(order[i:i + size])
+        i += size
+    return batches
+
+
+_WORKER_MODEL = None
+
+
+def _init_worker(model: Embeddings, threads: int):
+    """Pool initializer: pin the thread count before torch starts its pools"""
+    global _WORKER_MODEL
+    for variable in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[variable] = str(threads)
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    _WORKER_MODEL = model
+
+
+def _embed_batch(texts: List[str]) -> np.ndarray:
+    return np.asarray(_WORKER_MODEL.embed_documents(texts), dtype=np.float32)
+
+
+class BucketedEmbeddings(Embeddings):
+    """LangChain Embeddings that embed documents in length-sorted, token-budgeted batches"""
+
+    def __init__(self, model: Embeddings, workers: int = EMBED_WORKERS,
+                 threads_per_worker: int = EMBED_THREADS_PER_WORKER,
+                 batch_tokens: int = EMBED_BATCH_TOKENS, max_batch: int = EMBED_MAX_BATCH):
+        self.model = model  # must be picklable when workers > 1
+        self.workers = workers
+        self.threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // max(1, workers))
+        self.batch_tokens = batch_tokens
+        self.max_batch = max_batch
+        self.stats: Optional[Dict] = None
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        start = time.perf_counter()
+        lengths = padded_lengths(texts)
+        batches = plan_batches(lengths, self.batch_tokens, self.max_batch)
+        batch_texts = [[texts[i] for i in batch] for batch in batches]
+
+        if self.workers > 1 and len(batches) >= MIN_POOL_BATCHES:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            # spawn: forking a process that has already started torch threads can hang
+            with ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'),
+                                     initializer=_init_worker, initargs=(self.model, self.threads_per_worker)) as pool:
+                results = list(pool.map(_embed_batch, batch_texts))
+        else:
+            results = [np.asarray(self.model.embed_documents(chunk), dtype=np.float32) for chunk in batch_texts]
+
+        vectors = np.zeros((len(texts), results[0].shape[1]), dtype=np.float32)
+        for batch, result in zip(batches, results):
+            vectors[batch] = result
+
+        seconds = time.perf_counter() - start
+        padded = sum(len(batch) * int(lengths[batch[0]]) for batch in batches)
+        self.stats = {
+            'chunks': len(texts),
+            'batches': len(batches),
+            'workers': self.workers if len(batches) >= MIN_POOL_BATCHES else 1,
+            'seconds': seconds,
+            'chunks_per_sec': len(texts) / seconds if seconds else float('inf'),
+            'padding': 1 - int(lengths.sum()) / padded,
+        }
+        print(f"Embedded {len(texts)} chunks in {len(batches)} batches with {self.stats['workers']} worker(s): "
+              f"{self.stats['chunks_per_sec']:.1f} chunks/sec, {self.stats['padding']:.0%} padding")
+        return vectors.tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.model.embed_query(text)
+
+
+if __name__ == '__main__':
+    # Ingestion throughput per worker count: python batch_embedding.py file.pdf [workers ...]
+    from create_chunks import create_chunks_from_pdf
+    from create_embeddings import LazyEmbeddings
+
+    if len(sys.argv) > 1:
+        texts = [chunk['text'] for chunk in create_chunks_from_pdf(sys.argv[1])]
+        model = LazyEmbeddings()
+        model.embed_documents(texts[:1])  # load the model outside the timings
+        for workers in [int(arg) for arg in sys.argv[2:]] or [1]:
+            BucketedEmbeddings(model, workers=workers).embed_documents(texts)
+    else:
+        print("Usage: python batch_embedding.py <pdf_path> [workers ...]")
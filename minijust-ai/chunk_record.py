@@ -0,0 +1,172 @@
+"""
+Compact chunk records.
+
+A Chunk is a slotted object instead of a nested dict. Its metadata keeps only
+the fields that differ per chunk (page, column, article number, ...); fields
+that describe the whole document (doc_type, source_file, jurisdiction,
+source_url, upload date ...) live in one dict shared by all chunks of the
+document. Categorical string values are interned, so a corpus holds one copy
+of 'rw', 'legislation' or a file name however many chunks use it.
+
+Chunks keep dict-style access (chunk['text'], chunk['metadata']['page']) so
+existing callers work unchanged.
+
+In the vector store the docstore holds the per-chunk fields plus chunk_id and
+source_file; the shared fields are written once per document to
+document_metadata.json next to the FAISS index and merged back at retrieval.
+"""
+
+import json
+import os
+import sys
+from collections.abc import MutableMapping
+from typing import Dict, Iterator, Optional
+
+DOCUMENT_METADATA_FILE = "document_metadata.json"
+
+# String fields with few distinct values across the corpus
+CATEGORICAL_FIELDS = frozenset({
+    'doc_type', 'language', 'chunk_type', 'source', 'source_file', 'jurisdiction', 'source_url', 'doc_id',
+})
+
+
+def _intern(key: str, value):
+    return sys.intern(value) if key in CATEGORICAL_FIELDS and isinstance(value, str) else value
+
+
+class ChunkMetadata(MutableMapping):
+    """Per-chunk fields layered over the document's shared fields (per-chunk wins)"""
+
+    __slots__ = ('fields', 'shared')
+
+    def __init__(self, fields: Optional[Dict] = None, shared: Optional[Dict] = None):
+        self.fields = {key: _intern(key, value) for key, value in (fields or {}).items()}
+        self.shared = shared if shared is not None else {}
+
+    def __getitem__(self, key):
+        if key in self.fields:
+            return self.fields[key]
+        return self.shared[key]
+
+    def __setitem__(self, key, value):
+        self.fields[key] = _intern(key, value)
+
+    def __delitem__(self, key):
+        del self.fields[key]
+
+    def __contains__(self, key):
+        return key in self.fields or key in self.shared
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.fields
+        for key in self.shared:
+            if key not in self.fields:
+                yield key
+
+    def __len__(self):
+        return len(self.fields) + sum(1 for key in self.shared if key not in self.fields)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class Chunk:
+    """One chunk of a document; chunk['key'] access is kept for the old dict form"""
+
+    __slots__ = ('doc_id', 'chunk_id', 'text', 'metadata', 'split_suffix')
+    _KEYS = ('doc_id', 'chunk_id', 'text', 'metadata')
+
+    def __init__(self, doc_id: str, chunk_id: str, text: str, metadata: ChunkMetadata,
+                 split_suffix: Optional[str] = None):
+        self.doc_id = doc_id
+        self.chunk_id = chunk_id
+        self.text = text
+        self.metadata = metadata
+        self.split_suffix = split_suffix  # set by the chunker on records it may still split
+
+    def __getitem__(self, key):
+        if key in self._KEYS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key not in self._KEYS:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in self._KEYS
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self._KEYS else default
+
+    def replace(self, chunk_id: str, text: str, **fields) -> 'Chunk':
+        """A piece of this chunk: same document and shared metadata, own fields updated"""
+        metadata = ChunkMetadata(self.metadata.fields, self.metadata.shared)
+        metadata.fields.update(fields)
+        return Chunk(self.doc_id, chunk_id, text, metadata)
+
+    def to_dict(self) -> Dict:
+        """Plain dict form (e.g. for JSON output)"""
+        return {'doc_id': self.doc_id, 'chunk_id': self.chunk_id, 'text': self.text, 'metadata': dict(self.metadata)}
+
+    def document_metadata(self) -> Dict:
+        """Metadata stored with the chunk in the docstore: its own fields, chunk_id and source_file"""
+        metadata = dict(self.metadata.fields)
+        metadata['chunk_id'] = self.chunk_id
+        if 'source_file' in self.metadata:
+            metadata['source_file'] = self.metadata['source_file']
+        return metadata
+
+    def __eq__(self, other):
+        if not isinstance(other, Chunk):
+            return NotImplemented
+        return (self.chunk_id, self.doc_id, self.text, self.metadata) == (other.chunk_id, other.doc_id, other.text, other.metadata)
+
+    __hash__ = None
+
+    def __reduce__(self):
+        # The shared dict is pickled once per batch by pickle's memo, not per chunk
+        return (_rebuild_chunk, (self.doc_id, self.chunk_id, self.text, self.metadata.fields, self.metadata.shared))
+
+    def __repr__(self):
+        return f"Chunk({self.chunk_id!r})"
+
+
+def _rebuild_chunk(doc_id, chunk_id, text, fields, shared):
+    return Chunk(doc_id, chunk_id, text, ChunkMetadata(fields, shared))
+
+
+class DocumentMetadataStore:
+    """source_file -> shared metadata of that document, kept next to the FAISS index"""
+
+    def __init__(self, path: str, documents: Optional[Dict] = None):
+        self.path = path
+        self.documents = documents or {}
+
+    @classmethod
+    def load(cls, vector_store_path: str) -> 'DocumentMetadataStore':
+        path = os.path.join(vector_store_path, DOCUMENT_METADATA_FILE)
+        try:
+            with open(path) as f:
+                return cls(path, json.load(f)['documents'])
+        except (OSError, ValueError, KeyError):
+            return cls(path)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp-{os.getpid()}"
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': 1, 'documents': self.documents}, f)
+        os.replace(tmp_path, self.path)
+
+    def set(self, source_file: str, metadata: Dict):
+        self.documents[source_file] = dict(metadata)
+
+    def remove(self, source_file: str) -> bool:
+        return self.documents.pop(source_file, None) is not None
+
+    def merged(self, metadata: Dict) -> Dict:
+        """Docstore metadata of a chunk with its document's shared fields added"""
+        shared = self.documents.get(metadata.get('source_file'))
+        return {**shared, **metadata} if shared else dict(metadata)
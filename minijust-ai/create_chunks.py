@@ -1,60 +1,114 @@
 """
 Document Chunking System for Rwandan Legal Documents
 Creates chunks with metadata: doc_id, language, page, column, article_number
-Uses LangChain for intelligent text splitting
+(chunk_record.Chunk records; document-wide metadata is shared by all chunks)
+Splits text within the embedding model's token budget (token_budget.py)
 """
 
 import re
 import hashlib
-from typing import List, Dict
-from parse_pdf import parse_pdf_words
-from detect_column import detect_columns_all_pages, reconstruct_text_reading_order
-from detect_language import detect_language
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+from collections import Counter
+from itertools import islice
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple
+from parse_pdf import PageWords
+from parsed_document import ParsedDocument
+from chunk_record import Chunk, ChunkMetadata
+from article_scanner import scan_articles
+from detect_column import lines_fit, template_fits
+from detect_language import classify_texts, profile_column_languages
+from token_budget import CHUNK_OVERLAP_TOKENS, CHUNK_TOKENS, TokenBudgetSplitter
+
+
+# Pages kept in memory while streaming a document we opened ourselves
+# (the first three are re-used by document type detection)
+STREAMING_CACHE_PAGES = 4
+
+# Table of contents detection: articles at the start of a column with at most
+# TOC_MAX_ENTRY_WORDS words (page numbers and dot leaders aside) are held back
+# until the article numbering restarts or a real article shows up. A restart
+# only ends a TOC when the entries have dot leaders / page numbers or the first
+# one is repeated; otherwise they were the short articles of an earlier act
+TOC_MAX_ENTRY_WORDS = 40
+TOC_MAX_ENTRIES = 300  # bound on held-back entries while streaming
+TOC_NOISE = re.compile(r'\.{3,}|…+|^\s*\d+\s*$', re.MULTILINE)
+
+# Lines that end the article before them: chapter headings, annexes and the
+# signature block ("Kigali, 25/08/2025", "(sé)", "Bibonywe / Seen / Vu ...").
+# What follows is stored as fragments, not as part of the last article.
+ARTICLE_END = re.compile(
+    r'^\s*(?:(?:UMUTWE|CHAPTER|CHAPITRE|UMUGEREKA|ANNEXE?)\b'
+    r'|Kigali,\s*(?:ku\s+(?:wa\s+)?|on\s+|le\s+)?\d'
+    r'|\(s[ée]\)'
+    r'|(?:Bibonywe|Seen|Vu)\s*(?:$|kandi\b|kugira\b|and\b|to\b|et\b|pour\b))',
+    re.MULTILINE
+)
+
+# Split points for Kinyarwanda / English / French legal text, strongest first
+LEGAL_SEPARATORS = [
+    "\n\nIngingo ya",     # Kinyarwanda article (primary)
+    "\nIngingo ya",       # Kinyarwanda article (single newline)
+    "\n\nUMUTWE",         # Kinyarwanda chapter
+    "\n\nICYICIRO",       # Kinyarwanda section  
+    "\n\nArticle",        # English/French article
+    "\n\n",               # Double newline (paragraph)
+    "\n",                 # Single newline
+    ". ",                 # Sentence
+    " ",                  # Word
+]
+
+# Split points for judgments: numbered paragraphs ("[12] ...") first
+CASE_LAW_SEPARATORS = [
+    "\n[",                # Numbered paragraph
+    "\n\n",               # Double newline (paragraph)
+    "\n",                 # Single newline
+    ". ",                 # Sentence
+    "; ",                 # Clause
+    " ",                  # Word
+]
+
+# Chunks are tokenized for splitting this many at a time
+SPLIT_BATCH_SIZE = 32
+
+# Character-based settings chunks were cut with before the token budget
+# (kept for comparison reports: python token_budget.py file.pdf)
+LEGACY_CHUNK_SIZE = 1500
+LEGACY_CHUNK_OVERLAP = 200
+LEGACY_ARTICLE_WORDS = 500
 
 
 class DocumentChunker:
     """Chunk legal documents with metadata"""
     
-    def __init__(self, pdf_path: str, doc_type: str = 'auto'):
+    def __init__(self, pdf_path: str, doc_type: str = 'auto', document: Optional[ParsedDocument] = None,
+                 workers: int = 1, data=None, page_range: Optional[Tuple[int, int]] = None,
+                 max_tokens: int = CHUNK_TOKENS, overlap_tokens: int = CHUNK_OVERLAP_TOKENS,
+                 document_metadata: Optional[Dict] = None):
         self.pdf_path = pdf_path
         self.doc_type = doc_type
+        self.document = document
+        self.workers = workers  # worker processes for extraction/layout when we open the document
+        self.data = data  # in-memory PDF bytes; pdf_path is then only used as the document name
+        self.page_range = page_range  # (start, stop) pages to chunk, stop exclusive; None = all
         self.doc_id = hashlib.md5(pdf_path.encode()).hexdigest()[:12]
+        # Document-wide metadata (doc_type, source_file, jurisdiction ...), one dict
+        # shared by every chunk of the document rather than copied into each
+        self.document_metadata = dict(document_metadata or {})
         
-        # Initialize LangChain text splitter with custom separators for Kinyarwanda legal documents
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            separators=[
-                "\n\nIngingo ya",     # Kinyarwanda article (primary)
-                "\nIngingo ya",       # Kinyarwanda article (single newline)
-                "\n\nUMUTWE",         # Kinyarwanda chapter
-                "\n\nICYICIRO",       # Kinyarwanda section  
-                "\n\nArticle",        # English/French article
-                "\n\n",               # Double newline (paragraph)
-                "\n",                 # Single newline
-                ". ",                 # Sentence
-                " ",                  # Word
-                "",                   # Character
-            ],
-            chunk_size=1500,
-            chunk_overlap=200,
-            length_function=len,
-            is_separator_regex=False,
-        )
+        # Chunks are cut to what the embedding model reads (max_tokens model tokens)
+        self.text_splitter = TokenBudgetSplitter(LEGAL_SEPARATORS, max_tokens, overlap_tokens)
+        self.case_law_splitter = TokenBudgetSplitter(CASE_LAW_SEPARATORS, max_tokens, overlap_tokens)
     
-    def _detect_document_type(self, pages_data: List[Dict]) -> str:
+    def _detect_document_type(self, pages_data: List[PageWords]) -> str:
         """Auto-detect legislation vs case law - prioritizing Kinyarwanda patterns"""
-        pdf_document = pages_data[:min(3, len(pages_data))]
+        pdf_document = pages_data[:3]
         article_count = 0
         case_indicators = 0
         
         for page_data in pdf_document:
-            text = ' '.join(word['text'] for word in page_data['words'] if 'text' in word)
-            
-            # Count Kinyarwanda article patterns (primary)
-            article_count += len(re.findall(r'Ingingo\s+ya\s+(\d+|mbere|kabiri|gatatu|kane|gatanu)', text, re.IGNORECASE))
+            text = ' '.join(page_data.text)
             
-            # Count English/French articles (secondary)
-            article_count += len(re.findall(r'\bArticle\s+\d+', text, re.IGNORECASE))
+            # Count Kinyarwanda / English / French article headers
+            article_count += len(scan_articles(text))
             
             # Check for Kinyarwanda legislation indicators
             if re.search(r'(UMUTWE|ICYICIRO|Amabwiriza|Iteka)', text):
@@ -67,237 +121,437 @@ class DocumentChunker:
         return 'legislation' if article_count >= 3 else 'case_law' if case_indicators >= 2 else 'legislation'
     
     def _detect_articles(self, text: str) -> List[Dict]:
-        """Detect articles - primarily focused on Kinyarwanda patterns"""
-        articles = []
-        
-        for match in re.finditer(r'Ingingo\s+ya\s+mbere', text, re.IGNORECASE):
-            articles.append({
-                'number': '1',
-                'start_pos': match.start(),
-                'matched_text': match.group(0),
-                'language': 'rw'
-            })
+        """Detect article headers (Ingingo ya / Article / Art.) that open a line of the column"""
+        return scan_articles(text, line_start=True)
+    
+    def _article_title(self, article_text: str) -> str:
+        """Title of an article: the line after its header"""
+        return article_text.split('\n')[1].strip() if '\n' in article_text else ''
+    
+    def _page_bounds(self, document: ParsedDocument) -> Tuple[int, int]:
+        start, stop = self.page_range or (0, document.page_count)
+        return max(start, 0), min(stop, document.page_count)
+    
+    def _chunk(self, chunk_id: str, text: str, fields: Dict, split_suffix: Optional[str] = None) -> Chunk:
+        return Chunk(self.doc_id, chunk_id, text, ChunkMetadata(fields, self.document_metadata), split_suffix)
+    
+    def _fragment_chunks(self, text: str, page_num: int, column_num: int, language: str,
+                         verified: bool) -> Iterator[Chunk]:
+        """Column text outside any article (preambles, annexes), numbered _chunk0, _chunk1 ... once split"""
+        yield self._chunk(f"{self.doc_id}_p{page_num}_col{column_num}", text, {
+            'page': page_num,
+            'column': column_num,
+            'language': language,
+            'language_verified': verified,
+            'article_number': None,
+        }, split_suffix='_chunk')
+    
+    @staticmethod
+    def _split_article_end(parts: List[Tuple[int, str]]) -> Tuple[List[Tuple[int, str]], List[Tuple[int, str]]]:
+        """(page, text) parts of an article up to the first ARTICLE_END line, and the parts after it"""
+        for i, (page_num, text) in enumerate(parts):
+            match = ARTICLE_END.search(text)
+            if match:
+                head = text[:match.start()].strip()
+                kept = parts[:i] + ([(page_num, head)] if head else [])
+                if kept:
+                    return kept, [(page_num, text[match.start():].strip())] + parts[i + 1:]
+        return parts, []
+    
+    def _article_chunks(self, article: Dict) -> Iterator[Chunk]:
+        """One assembled article; _split_to_budget cuts it into _sub chunks if it is too long
         
-        # Pattern 2: "Ingingo ya [number]" (e.g., Ingingo ya 2, Ingingo ya 15)
-        for match in re.finditer(r'Ingingo\s+ya\s+(\d+)', text, re.IGNORECASE):
-            # Skip if already captured
-            if not any(abs(a['start_pos'] - match.start()) < 5 for a in articles):
-                articles.append({
-                    'number': match.group(1),
-                    'start_pos': match.start(),
-                    'matched_text': match.group(0),
-                    'language': 'rw'
-                })
+        Text from a chapter heading, annex or signature block on is emitted as fragments;
+        pages carried along after it (annex tables can change language down a column)
+        have their language classified rather than taken from the column.
+        """
+        parts, rest = self._split_article_end(article['parts'])
+        article_text = '\n'.join(text for _, text in parts)
+        base_id = f"{self.doc_id}_p{article['page_start']}_col{article['column']}_art{article['number']}"
+        yield self._chunk(base_id, article_text, {
+            'page': article['page_start'],
+            'page_start': article['page_start'],
+            'page_end': parts[-1][0],
+            'column': article['column'],
+            'language': article['language'],
+            'language_verified': article['language_verified'],
+            'article_number': article['number'],
+            'article_title': self._article_title(article_text),
+        }, split_suffix='_sub')
         
-        # Pattern 3: Kinyarwanda number words for articles 2-10
-        kiny_numbers = {
-            'kabiri': '2',
-            'gatatu': '3', 
-            'kane': '4',
-            'gatanu': '5',
-            'gatandatu': '6',
-            'karindwi': '7',
-            'umunani': '8',
-            'icyenda': '9',
-            'icumi': '10'
-        }
+        if rest:
+            page_num, text = rest[0]
+            yield from self._fragment_chunks(text, page_num, article['column'], article['language'],
+                                             article['language_verified'])
+            carried = [(page_num, text) for page_num, text in rest[1:] if text]
+            for (page_num, text), language in zip(carried, classify_texts([text for _, text in carried])):
+                yield from self._fragment_chunks(text, page_num, article['column'], language, False)
+    
+    def _split_to_budget(self, chunks: Iterable[Chunk], splitter: TokenBudgetSplitter) -> Iterator[Chunk]:
+        """Split chunks marked with a split_suffix with splitter, SPLIT_BATCH_SIZE at a time
         
-        for kiny_word, number in kiny_numbers.items():
-            pattern = rf'Ingingo\s+ya\s+{kiny_word}'
-            for match in re.finditer(pattern, text, re.IGNORECASE):
-                if not any(abs(a['start_pos'] - match.start()) < 5 for a in articles):
-                    articles.append({
-                        'number': number,
-                        'start_pos': match.start(),
-                        'matched_text': match.group(0),
-                        'language': 'rw'
-                    })
+        Articles keep their ID when they fit and become _sub0, _sub1 ... otherwise;
+        fragments are always numbered (_chunk0 ...). Other chunks pass through.
+        """
+        batch = []
+        for chunk in chunks:
+            batch.append(chunk)
+            if len(batch) == SPLIT_BATCH_SIZE:
+                yield from self._split_batch(batch, splitter)
+                batch = []
+        if batch:
+            yield from self._split_batch(batch, splitter)
+    
+    def _split_batch(self, batch: List[Chunk], splitter: TokenBudgetSplitter) -> Iterator[Chunk]:
+        splittable = [chunk for chunk in batch if chunk.split_suffix]
+        pieces = dict(zip(map(id, splittable), splitter.split_texts([c.text for c in splittable])))
         
-        return sorted(articles, key=lambda x: x['start_pos'])
+        for chunk in batch:
+            suffix, chunk.split_suffix = chunk.split_suffix, None
+            if suffix is None:
+                chunk.metadata.setdefault('word_count', len(chunk.text.split()))
+                yield chunk
+                continue
+            
+            texts = pieces[id(chunk)]
+            if len(texts) == 1 and suffix != '_chunk':
+                chunk.metadata['word_count'] = len(chunk.text.split())
+                yield chunk
+                continue
+            
+            for idx, text in enumerate(texts):
+                fields = {'word_count': len(text.split())}
+                if suffix == '_sub':
+                    fields['sub_chunk'] = idx
+                yield chunk.replace(f"{chunk.chunk_id}{suffix}{idx}", text, **fields)
+    
+    def _is_toc_entry(self, article: Dict) -> bool:
+        """Header-only article: a table of contents line (plus wrapped title, chapter heading)"""
+        text = TOC_NOISE.sub(' ', '\n'.join(text for _, text in article['parts']))
+        return len(text.split()) <= TOC_MAX_ENTRY_WORDS
     
-    def _extract_article_content(self, text: str, articles: List[Dict]):
-        """Extract content for each article"""
-        for i, article in enumerate(articles):
-            start = article['start_pos']
-            end = articles[i + 1]['start_pos'] if i + 1 < len(articles) else len(text)
-            article['content'] = text[start:end].strip()
-            article['title'] = article['content'].split('\n')[1].strip() if '\n' in article['content'] else ''
+    @staticmethod
+    def _header_line(text: str) -> str:
+        """First line of an article with TOC noise removed, for comparing headers"""
+        line = TOC_NOISE.sub(' ', text.split('\n')[0])
+        return ' '.join(re.sub(r'\s\d+\s*$', '', line).lower().split())
     
-    def _chunk_by_articles(self, pages_data: List[Dict]) -> List[Dict]:
-        """Chunk legislation by articles within columns using LangChain"""
-        chunks = []
-        columns_all_pages = detect_columns_all_pages(self.pdf_path)
+    def _is_toc(self, entries: List[Dict], restart: Dict, restart_text: str) -> bool:
+        """Held-back entries followed by a numbering restart: a TOC, or short articles of an earlier act?"""
+        if any(TOC_NOISE.search(entry['parts'][0][1]) for entry in entries):
+            return True
+        return (entries[0]['number'] == restart['number']
+                and self._header_line(entries[0]['parts'][0][1]) == self._header_line(restart_text))
+    
+    def _toc_chunk(self, entries: List[Dict]) -> Chunk:
+        """One navigation record for a column's table of contents"""
+        first = entries[0]
+        text = '\n'.join(text for entry in entries for _, text in entry['parts'])
+        return self._chunk(f"{self.doc_id}_p{first['page_start']}_col{first['column']}_toc", text, {
+            'chunk_type': 'toc',
+            'page': first['page_start'],
+            'page_start': first['page_start'],
+            'page_end': entries[-1]['page_end'],
+            'column': first['column'],
+            'language': first['language'],
+            'language_verified': first['language_verified'],
+            'article_number': None,
+            'articles_listed': len(entries),
+            'word_count': len(text.split())
+        }, split_suffix='_part')
+    
+    def _close_article(self, article: Dict, toc_entries: Dict[int, List[Dict]]) -> Iterator[Chunk]:
+        """Emit a finished article, or hold it back while its column may still be in a TOC"""
+        column_num = article['column']
+        entries = toc_entries.get(column_num)
+        if entries is not None:
+            if self._is_toc_entry(article) and len(entries) < TOC_MAX_ENTRIES:
+                entries.append(article)
+                return
+            # Real content: the entries held back were short articles, not a TOC
+            del toc_entries[column_num]
+            for held in entries:
+                yield from self._article_chunks(held)
+        yield from self._article_chunks(article)
+    
+    def _chunk_by_articles(self, document: ParsedDocument) -> Iterator[Chunk]:
+        """Chunk legislation by articles, assembled across pages per language column
+        
+        Each column position keeps the article currently open in it. Text at the top
+        of a page column continues that article; the next header in the same column
+        closes it, and so does a page whose words or lines do not fit the column layout
+        the article was opened in (a full-width annex, table or signature block). Articles are emitted
+        once, when closed, with their page span; chapter headings, annexes and
+        signatures carried along are split off then (ARTICLE_END).
         
-        for page_idx, page_data in enumerate(pages_data):
-            page_num = page_data['page_num']
-            page_columns = columns_all_pages[page_idx]['columns']
+        A table of contents (a run of header-only entries at the start of a column,
+        ended by the numbering starting over) is stored as one navigation record
+        instead of one near-empty chunk per listed article.
+        """
+        # Column languages are profiled once per document; positional rw/en/fr
+        # is kept for columns the profile never saw text in
+        column_languages = document.column_languages
+        open_articles = {}  # column_num -> article being assembled
+        toc_entries = {}  # column_num -> possible TOC entries held back
+        toc_checked = set()  # columns past their possible TOC
+        
+        for page_num in range(*self._page_bounds(document)):
+            columns = document.columns(page_num)
+            column_texts = document.column_texts(page_num)
+            if not columns:
+                continue
+            
+            page = document.page(page_num)
+            fits = {}  # column boundaries -> this page fits them
+            for column_num, article in list(open_articles.items()):
+                layout = article['layout']
+                if layout['boundaries'] not in fits:
+                    fits[layout['boundaries']] = template_fits(page, layout) and lines_fit(page, layout['boundaries'])
+                if not fits[layout['boundaries']]:
+                    del open_articles[column_num]
+                    yield from self._close_article(article, toc_entries)
+            layout = {'width': page.width, 'boundaries': (columns[1]['x0'], columns[2]['x0'])}
             
-            for column in page_columns:
-                column_text = reconstruct_text_reading_order(column)
+            for column, column_text in zip(columns, column_texts):
                 if not column_text.strip():
                     continue
                 
-                # Detect articles in the column
-                articles = self._detect_articles(column_text)
+                column_num = column['column_num']
+                profiled = column_languages[column_num]
+                language = profiled or column['language']
                 
-                if not articles:
-                    # No articles detected - use LangChain to split intelligently
-                    text_chunks = self.text_splitter.split_text(column_text)
-                    for idx, chunk_text in enumerate(text_chunks):
-                        chunks.append({
-                            'doc_id': self.doc_id,
-                            'chunk_id': f"{self.doc_id}_p{page_num}_col{column['column_num']}_chunk{idx}",
-                            'text': chunk_text,
-                            'metadata': {
-                                'doc_type': 'legislation',
-                                'page': page_num,
-                                'column': column['column_num'],
-                                'language': column['language'],
-                                'article_number': None,
-                                'word_count': len(chunk_text.split())
-                            }
-                        })
-                else:
-                    # Articles detected - chunk each article separately
-                    self._extract_article_content(column_text, articles)
-                    for article in articles:
-                        article_text = article['content']
-                        
-                        # If article is too long, use LangChain to split it
-                        if len(article_text.split()) > 500:
-                            sub_chunks = self.text_splitter.split_text(article_text)
-                            for sub_idx, sub_chunk in enumerate(sub_chunks):
-                                chunks.append({
-                                    'doc_id': self.doc_id,
-                                    'chunk_id': f"{self.doc_id}_p{page_num}_col{column['column_num']}_art{article['number']}_sub{sub_idx}",
-                                    'text': sub_chunk,
-                                    'metadata': {
-                                        'doc_type': 'legislation',
-                                        'page': page_num,
-                                        'column': column['column_num'],
-                                        'language': column['language'],
-                                        'article_number': article['number'],
-                                        'article_title': article.get('title', ''),
-                                        'sub_chunk': sub_idx,
-                                        'word_count': len(sub_chunk.split())
-                                    }
-                                })
+                # Detect article headers in the column
+                headers = self._detect_articles(column_text)
+                
+                # Text above the first header continues the open article, if any
+                lead = column_text[:headers[0]['start_pos'] if headers else len(column_text)].strip()
+                if lead:
+                    if column_num in open_articles:
+                        open_articles[column_num]['parts'].append((page_num, lead))
+                        open_articles[column_num]['page_end'] = page_num
+                    else:
+                        yield from self._fragment_chunks(lead, page_num, column_num, language, profiled is not None)
+                
+                for i, header in enumerate(headers):
+                    if column_num not in toc_checked:
+                        toc_checked.add(column_num)
+                        toc_entries[column_num] = []
+                    
+                    entries = toc_entries.get(column_num)
+                    end = headers[i + 1]['start_pos'] if i + 1 < len(headers) else len(column_text)
+                    if entries and int(header['number']) <= int(entries[0]['number']):
+                        # The last entry may already have been closed by a layout change
+                        last = open_articles.pop(column_num, None)
+                        held = entries + ([last] if last else [])
+                        del toc_entries[column_num]
+                        if self._is_toc(held, header, column_text[header['start_pos']:end]):
+                            # The held-back entries were a table of contents. Text carried
+                            # onto later pages by its last entry is the preamble of the
+                            # body, not part of the TOC.
+                            if last:
+                                entries.append({**last, 'parts': last['parts'][:1], 'page_end': last['page_start']})
+                            yield self._toc_chunk(entries)
+                            for part_page, text in (last['parts'][1:] if last else []):
+                                yield from self._fragment_chunks(text, part_page, column_num, language, profiled is not None)
                         else:
-                            # Article is manageable size - keep as single chunk
-                            chunks.append({
-                                'doc_id': self.doc_id,
-                                'chunk_id': f"{self.doc_id}_p{page_num}_col{column['column_num']}_art{article['number']}",
-                                'text': article_text,
-                                'metadata': {
-                                    'doc_type': 'legislation',
-                                    'page': page_num,
-                                    'column': column['column_num'],
-                                    'language': column['language'],
-                                    'article_number': article['number'],
-                                    'article_title': article.get('title', ''),
-                                    'word_count': len(article_text.split())
-                                }
-                            })
+                            # The next act of a bundled gazette starts over at Article 1:
+                            # the entries were short articles, and the new act may open
+                            # with a TOC of its own
+                            for article in held:
+                                yield from self._article_chunks(article)
+                            toc_entries[column_num] = []
+                    elif column_num in open_articles:
+                        yield from self._close_article(open_articles.pop(column_num), toc_entries)
+                    
+                    open_articles[column_num] = {
+                        'number': header['number'],
+                        'column': column_num,
+                        'language': language,
+                        'language_verified': profiled is not None,
+                        'page_start': page_num,
+                        'page_end': page_num,
+                        'parts': [(page_num, column_text[header['start_pos']:end].strip())],
+                        'layout': layout,
+                    }
         
-        return chunks
+        # Articles still open at the end of the document, then anything held back
+        # as a possible TOC that never turned out to be one
+        for column_num in sorted(open_articles):
+            yield from self._close_article(open_articles[column_num], toc_entries)
+        for column_num in sorted(toc_entries):
+            for held in toc_entries[column_num]:
+                yield from self._article_chunks(held)
+    
+    def _match_section(self, line: str):
+        """Return (number, title) if the line is a case law section header"""
+        line = line.strip()
+        # Roman numerals: "I. FACTS"
+        if match := re.match(r'^([IVX]+)\.\s+(.+?)$', line):
+            return match.group(1), match.group(2).strip()
+        # Capitalized headers: "FACTS:"
+        elif match := re.match(r'^([A-Z][A-Z\s]{2,}):?\s*$', line):
+            if len(line) > 3:
+                return None, match.group(1).strip()
+        return None
     
     def _detect_sections(self, text: str) -> List[Dict]:
         """Detect sections in case law (I. FACTS, II. LAW, etc.)"""
         sections = []
-        lines = text.split('\n')
         
-        for i, line in enumerate(lines):
-            line = line.strip()
-            # Roman numerals: "I. FACTS"
-            if match := re.match(r'^([IVX]+)\.\s+(.+?)$', line):
-                sections.append({'number': match.group(1), 'title': match.group(2).strip(), 'line_num': i})
-            # Capitalized headers: "FACTS:"
-            elif match := re.match(r'^([A-Z][A-Z\s]{2,}):?\s*$', line):
-                if len(line) > 3:
-                    sections.append({'number': None, 'title': match.group(1).strip(), 'line_num': i})
+        for i, line in enumerate(text.split('\n')):
+            if header := self._match_section(line):
+                sections.append({'number': header[0], 'title': header[1], 'line_num': i})
         
         return sections
     
-    def _chunk_by_sections(self, pages_data: List[Dict]) -> List[Dict]:
-        """Chunk case law by sections"""
-        chunks = []
-        full_text, page_line_map = [], []
+    def _section_chunk(self, section: Dict, index: int) -> Chunk:
+        """Build the chunk for one case law section (split to the token budget later)"""
+        section_text = '\n'.join(section['lines']).strip()
         
-        for page_data in pages_data:
-            page_text = ' '.join(word['text'] for word in page_data['words'] if 'text' in word)
-            for line in page_text.split('\n'):
-                full_text.append(line)
-                page_line_map.append(page_data['page_num'])
+        # Detect language
+        lang = classify_texts([section_text])[0] if len(section_text) > 20 else 'unknown'
         
-        full_text_str = '\n'.join(full_text)
-        sections = self._detect_sections(full_text_str)
+        return self._chunk(f"{self.doc_id}_section{index}", section_text, {
+            'page': section['page'],
+            'page_start': section['page'],
+            'page_end': section['page_end'],
+            'language': lang,
+            'section_title': section['title'],
+            'section_number': section['number'],
+        }, split_suffix='_part')
+    
+    def _page_chunks(self, pages: List[Tuple[int, str]]) -> Iterator[Chunk]:
+        """Page-based chunks for text outside any section, tagged with the document's
+        language (profiled from a sample of pages rather than classifying every page)"""
+        pages = [(page_num, text) for page_num, text in pages if text.strip()]
+        lang = profile_column_languages(([text] for _, text in pages), num_columns=1)[0]
+        lang = lang or 'unknown'
+        for page_num, page_text in pages:
+            yield self._chunk(f"{self.doc_id}_page{page_num}", page_text, {
+                'page': page_num,
+                'language': lang,
+            }, split_suffix='_part')
+    
+    def _chunk_by_sections(self, document: ParsedDocument) -> Iterator[Chunk]:
+        """Chunk case law by sections
         
-        if not sections:
-            # Fallback to page-based chunks
-            for page_data in pages_data:
-                page_text = ' '.join(word['text'] for word in page_data['words'] if 'text' in word)
-                lang = detect_language(page_data)[0] if detect_language(page_data) else 'unknown'
-                chunks.append({
-                    'doc_id': self.doc_id,
-                    'chunk_id': f"{self.doc_id}_page{page_data['page_num']}",
-                    'text': page_text,
-                    'metadata': {
-                        'doc_type': 'case_law',
-                        'page': page_data['page_num'],
-                        'language': lang,
-                        'word_count': len(page_text.split())
-                    }
-                })
-        else:
-            # Section-based chunks
-            full_text_lines = full_text_str.split('\n')
-            for i, section in enumerate(sections):
-                start = section['line_num']
-                end = sections[i + 1]['line_num'] if i + 1 < len(sections) else len(full_text_lines)
-                section_text = '\n'.join(full_text_lines[start:end]).strip()
-                
-                # Detect language
-                try:
-                    import langid
-                    langid.set_languages(['en', 'fr', 'rw'])
-                    lang = langid.classify(section_text)[0] if len(section_text) > 20 else 'unknown'
-                except:
-                    lang = 'unknown'
-                
-                chunks.append({
-                    'doc_id': self.doc_id,
-                    'chunk_id': f"{self.doc_id}_section{i}",
-                    'text': section_text,
-                    'metadata': {
-                        'doc_type': 'case_law',
-                        'page': page_line_map[start] if start < len(page_line_map) else 0,
-                        'language': lang,
-                        'section_title': section['title'],
-                        'section_number': section.get('number'),
-                        'word_count': len(section_text.split())
-                    }
-                })
+        Sections are found on the reading-order lines of each page. Pages are consumed
+        one at a time and a section is emitted as soon as the next header starts.
+        Text before the first header (head notes, summary) is kept per page and
+        emitted as page chunks - for the whole document when it has no sections.
+        Every chunk is split to the token budget afterwards (_split_to_budget).
+        """
+        preamble = []  # (page_num, text) before the first section header
+        section = None
+        section_index = 0
         
-        return chunks
-    
-    def create_chunks(self) -> List[Dict]:
-        """Create chunks from PDF"""
-        pages_data = parse_pdf_words(self.pdf_path)
-        if not pages_data:
-            return []
+        for page_num in range(*self._page_bounds(document)):
+            lines = []  # this page's lines before the first header
+            for line in document.page_text(page_num).split('\n'):
+                if header := self._match_section(line):
+                    if section:
+                        yield self._section_chunk(section, section_index)
+                        section_index += 1
+                    else:
+                        yield from self._page_chunks(preamble + [(page_num, '\n'.join(lines))])
+                    section = {'number': header[0], 'title': header[1], 'page': page_num, 'page_end': page_num,
+                               'lines': [line]}
+                elif section:
+                    section['lines'].append(line)
+                    section['page_end'] = page_num
+                else:
+                    lines.append(line)
+            
+            if section is None:
+                preamble.append((page_num, '\n'.join(lines)))
         
-        if self.doc_type == 'auto':
-            self.doc_type = self._detect_document_type(pages_data)
-            print(f"Auto-detected: {self.doc_type}")
+        if section:
+            yield self._section_chunk(section, section_index)
+        else:
+            yield from self._page_chunks(preamble)
+    
+    def iter_chunks(self, split: bool = True) -> Iterator[Chunk]:
+        """Stream chunks from the PDF, parsing and chunking one page at a time
         
-        chunks = self._chunk_by_articles(pages_data) if self.doc_type == 'legislation' else self._chunk_by_sections(pages_data)
+        Pages are only loaded when chunking reaches them, so stopping early
+        (e.g. islice for a preview) never parses the rest of the document.
+        split=False yields the chunks before _split_to_budget (still carrying split_suffix).
+        """
+        document = self.document or ParsedDocument(
+            self.pdf_path, max_cached_pages=STREAMING_CACHE_PAGES, workers=self.workers, data=self.data
+        )
+        try:
+            if not document.page_count:
+                return
+            
+            if self.doc_type == 'auto':
+                # Only the first pages are needed to decide; they stay cached for chunking
+                head = list(document.pages(0, 3))
+                self.doc_type = self._detect_document_type(head)
+                print(f"Auto-detected: {self.doc_type}")
+            self.document_metadata.setdefault('doc_type', self.doc_type)
+            
+            if self.doc_type == 'legislation':
+                chunks, splitter = self._chunk_by_articles(document), self.text_splitter
+            else:
+                chunks, splitter = self._chunk_by_sections(document), self.case_law_splitter
+            
+            # chunk_ids are used as vector store IDs, so they must be unique; a header
+            # repeated in one column (e.g. a misnumbered article) gets a suffix
+            seen_ids = Counter()
+            for chunk in self._split_to_budget(chunks, splitter) if split else chunks:
+                seen_ids[chunk.chunk_id] += 1
+                if seen_ids[chunk.chunk_id] > 1:
+                    chunk.chunk_id = f"{chunk.chunk_id}_dup{seen_ids[chunk.chunk_id] - 1}"
+                yield chunk
+        finally:
+            if document is not self.document:
+                document.close()
+    
+    def create_chunks(self, max_chunks: Optional[int] = None) -> List[Chunk]:
+        """Create chunks from PDF (only the first max_chunks if given)"""
+        chunks = list(islice(self.iter_chunks(), max_chunks))
         print(f"Created {len(chunks)} chunks")
         return chunks
 
 
-def create_chunks_from_pdf(pdf_path: str, doc_type: str = 'auto') -> List[Dict]:
-    """Create chunks from PDF - main entry point"""
-    return DocumentChunker(pdf_path, doc_type).create_chunks()
+def legacy_chunk_texts(chunks: Iterable[Chunk]) -> List[str]:
+    """Texts of unsplit chunks (iter_chunks(split=False)) cut with the old character settings:
+    fragments, and articles over LEGACY_ARTICLE_WORDS words, in LEGACY_CHUNK_SIZE-character
+    pieces; TOCs, pages and case-law sections whole"""
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+    splitter = RecursiveCharacterTextSplitter(
+        separators=LEGAL_SEPARATORS + [""],
+        chunk_size=LEGACY_CHUNK_SIZE,
+        chunk_overlap=LEGACY_CHUNK_OVERLAP,
+        length_function=len,
+        is_separator_regex=False,
+    )
+    texts = []
+    for chunk in chunks:
+        if chunk.split_suffix == '_chunk' or (chunk.split_suffix == '_sub'
+                                              and len(chunk.text.split()) > LEGACY_ARTICLE_WORDS):
+            texts.extend(splitter.split_text(chunk.text))
+        else:
+            texts.append(chunk.text)
+    return texts
+
+
+def create_chunks_from_pdf(pdf_path: str, doc_type: str = 'auto', document: Optional[ParsedDocument] = None,
+                           workers: int = 1, data=None, page_range: Optional[Tuple[int, int]] = None,
+                           max_chunks: Optional[int] = None, document_metadata: Optional[Dict] = None) -> List[Chunk]:
+    """Create chunks from PDF - main entry point
+    
+    Pass an already open ParsedDocument to re-use its parsed pages and layouts,
+    workers > 1 to spread page extraction and layout over a process pool, or
+    data (bytes / memoryview) to chunk a PDF held in memory without reading pdf_path.
+    page_range=(start, stop) limits chunking to those pages and max_chunks stops
+    after the first N chunks; either way only the pages actually needed are parsed.
+    document_metadata (doc_type, source_file, ...) is shared by all the chunks.
+    """
+    chunker = DocumentChunker(pdf_path, doc_type, document=document, workers=workers, data=data, page_range=page_range,
+                              document_metadata=document_metadata)
+    return chunker.create_chunks(max_chunks=max_chunks)
 
 
 if __name__ == '__main__':
@@ -316,7 +570,13 @@ if __name__ == '__main__':
             if article_chunks:
                 print(f"\n>>> DETECTED KINYARWANDA ARTICLES (Found {len(article_chunks)}):")
                 
-                # Filter for Article 1 specifically to show the difference between TOC and Real Content
+                # Table of contents pages are kept as one navigation record per column
+                toc_chunks = [c for c in chunks if c['metadata'].get('chunk_type') == 'toc']
+                for chunk in toc_chunks:
+                    print(f"\n[TOC] {chunk['chunk_id']} (Pages {chunk['metadata']['page_start']}-{chunk['metadata']['page_end']}, "
+                          f"{chunk['metadata']['articles_listed']} articles listed)")
+                
+                # Article 1 should now appear once per language column
                 art1_chunks = [c for c in article_chunks if c['metadata']['article_number'] == '1']
                 if art1_chunks:
                     print(f"\n--- FOCUS: Article 1 (Found {len(art1_chunks)} occurrences) ---")
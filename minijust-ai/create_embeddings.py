@@ -5,69 +5,239 @@ Uses LangChain and HuggingFace to generate embeddings and store them in FAISS.
 
 import sys
 import os
-from typing import List, Dict
-from langchain_huggingface import HuggingFaceEmbeddings
+import json
+import threading
+from typing import List, Dict, Optional
+
+import numpy as np
 from langchain_community.vectorstores import FAISS
 from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
 from create_chunks import create_chunks_from_pdf
+from article_groups import CANONICAL_LANGUAGES, GROUP_MODES, split_canonical
+from token_budget import EMBEDDING_MODEL
+from chunk_record import Chunk, DocumentMetadataStore
+from embedding_cache import CachedEmbeddings, EmbeddingCache, store_cache_dir
+from batch_embedding import EMBED_MAX_BATCH, BucketedEmbeddings
+from onnx_embeddings import OnnxEmbeddings, onnx_available
 
 # Constants
-EMBEDDING_MODEL = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
 VECTOR_STORE_PATH = "faiss_index"
+# How trilingual article groups (article_groups.py) are embedded: 'all',
+# 'canonical' (one language version per group) or 'pooled' (mean vector)
+EMBEDDING_GROUP_MODE = os.getenv("EMBEDDING_GROUP_MODE", "canonical")
+CANONICAL_LANGUAGE = os.getenv("CANONICAL_LANGUAGE", CANONICAL_LANGUAGES[0])
+# 'torch' (sentence-transformers) or 'onnx' (int8 ONNX Runtime, see onnx_embeddings.py)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+# Backend and model the index was embedded with, next to index.faiss
+EMBEDDING_INFO_FILE = "embedding_model.json"
+
+# Loaded transformers, one per model name for the whole process
+_MODELS: Dict[str, Embeddings] = {}
+_MODELS_LOCK = threading.Lock()
+
+
+class LazyEmbeddings(Embeddings):
+    """The HuggingFace model, loaded the first time text actually has to be embedded
+    (and then shared by every LazyEmbeddings of the process)"""
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL):
+        self.model_name = model_name
+
+    @property
+    def model(self) -> Embeddings:
+        model = _MODELS.get(self.model_name)
+        if model is None:
+            with _MODELS_LOCK:
+                model = _MODELS.get(self.model_name)
+                if model is None:
+                    # Imported here so the ONNX backend never loads torch
+                    from langchain_huggingface import HuggingFaceEmbeddings
+                    print(f"Loading embedding model: {self.model_name}...")
+                    # Batches come pre-sized by batch_embedding; do not split them again
+                    model = _MODELS[self.model_name] = HuggingFaceEmbeddings(
+                        model_name=self.model_name, encode_kwargs={'batch_size': EMBED_MAX_BATCH}
+                    )
+        return model
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.model.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.model.embed_query(text)
+
+
+def get_embedding_model(vector_store_path: str = VECTOR_STORE_PATH):
+    """The embedding model behind the vector store's persistent embedding cache (embedding_cache.py).
+    The transformer is only loaded once a text is not in the cache, so loading an
+    index, deleting a document or re-ingesting cached text never pays for it.
+    Cache misses are embedded in length-bucketed batches (batch_embedding.py).
+    EMBEDDING_BACKEND selects torch or the int8 ONNX model (cached under its own key)."""
+    cache_dir = store_cache_dir(vector_store_path)
+    if EMBEDDING_BACKEND == 'onnx':
+        if onnx_available(EMBEDDING_MODEL):
+            return CachedEmbeddings(BucketedEmbeddings(OnnxEmbeddings(EMBEDDING_MODEL)),
+                                    EmbeddingCache(f"{EMBEDDING_MODEL}-onnx-int8", cache_dir))
+        print("ONNX embedding model unavailable (install onnxruntime and run "
+              "'python onnx_embeddings.py export'); using torch", file=sys.stderr)
+    elif EMBEDDING_BACKEND != 'torch':
+        raise ValueError(f"Unknown embedding backend: {EMBEDDING_BACKEND}")
+    return CachedEmbeddings(BucketedEmbeddings(LazyEmbeddings(EMBEDDING_MODEL)), EmbeddingCache(EMBEDDING_MODEL, cache_dir))
+
+
+def embedding_key(embeddings) -> str:
+    """Model and backend of a get_embedding_model() result: its embedding cache key"""
+    return embeddings.cache.model_name
+
+
+def stored_embedding_key(vector_store_path: str) -> Optional[str]:
+    """Key the index at vector_store_path was embedded with (None without an index;
+    indexes from before EMBEDDING_INFO_FILE were built with the torch model)"""
+    if not os.path.exists(os.path.join(vector_store_path, "index.faiss")):
+        return None
+    try:
+        with open(os.path.join(vector_store_path, EMBEDDING_INFO_FILE), encoding='utf-8') as f:
+            return json.load(f)['key']
+    except (OSError, ValueError, KeyError):
+        return EMBEDDING_MODEL
+
+
+def embedding_mismatch(vector_store_path: str, embeddings) -> Optional[str]:
+    """Why embeddings cannot be mixed with the index at vector_store_path (None when they match)"""
+    stored = stored_embedding_key(vector_store_path)
+    if stored is None or stored == embedding_key(embeddings):
+        return None
+    return (f"vector store '{vector_store_path}' was embedded with {stored}, but {embedding_key(embeddings)} "
+            f"is configured (EMBEDDING_BACKEND={EMBEDDING_BACKEND}); rebuild the index or switch the backend back")
 
-def get_embedding_model():
-    """Initialize the embedding model"""
-    print(f"Loading embedding model: {EMBEDDING_MODEL}...")
-    embeddings = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
-    return embeddings
 
-def create_vector_store(chunks: List[Dict], save_path: str = VECTOR_STORE_PATH):
+def save_embedding_info(vector_store_path: str, embeddings):
+    """Record the backend and model next to the index"""
+    key = embedding_key(embeddings)
+    with open(os.path.join(vector_store_path, EMBEDDING_INFO_FILE), 'w', encoding='utf-8') as f:
+        json.dump({'key': key, 'model': EMBEDDING_MODEL,
+                   'backend': 'onnx' if key != EMBEDDING_MODEL else 'torch'}, f)
+
+
+def _to_document(chunk: Chunk) -> Document:
+    """LangChain Document for a chunk: its own metadata, chunk_id and source_file
+    (document-wide fields are stored once, in document_metadata.json)"""
+    return Document(page_content=chunk.text, metadata=chunk.document_metadata())
+
+
+def _group_vectors(chunks: List[Chunk], embeddings, group_mode: str):
+    """
+    Split chunks for a grouped index: (embedded chunks, their vectors, sibling chunks).
+    'canonical' embeds only one version per article group; 'pooled' embeds every
+    version and averages each canonical chunk with its siblings.
+    """
+    embedded, siblings, pairs = split_canonical(chunks, CANONICAL_LANGUAGE)
+    print(f"Embedding {len(embedded)} of {len(chunks)} chunks ({group_mode}, "
+          f"{len(siblings)} sibling-language chunks stored without vectors)...")
+    
+    texts = [chunk['text'] for chunk in embedded]
+    if group_mode == 'pooled':
+        sibling_texts = {chunk['chunk_id']: chunk['text'] for chunk in siblings}
+        texts += list(sibling_texts.values())
+    vectors = np.asarray(embeddings.embed_documents(texts), dtype=np.float32)
+    
+    if group_mode == 'pooled':
+        row = {chunk_id: len(embedded) + i for i, chunk_id in enumerate(sibling_texts)}
+        vectors = np.stack([
+            vectors[[i] + [row[s] for s in pairs.get(chunk['chunk_id'], [])]].mean(axis=0)
+            for i, chunk in enumerate(embedded)
+        ])
+    return embedded, vectors, siblings
+
+
+def create_vector_store(chunks: List[Chunk], save_path: str = VECTOR_STORE_PATH,
+                        group_mode: str = EMBEDDING_GROUP_MODE):
     """
     Convert dictionary chunks to LangChain Documents and create FAISS index
+    
+    With group_mode 'canonical' or 'pooled', chunks tagged with an article group
+    (article_groups.align_article_groups) get one vector per group; the other
+    language versions are kept in the docstore, reachable by chunk_id.
     """
     if not chunks:
         print("No chunks to process.")
         return None
+    if group_mode not in GROUP_MODES:
+        raise ValueError(f"Unknown embedding group mode: {group_mode}")
 
-    # Convert chunks to LangChain Document objects
-    documents = []
     print(f"Preparing {len(chunks)} documents for embedding...")
-    
-    for chunk in chunks:
-        # Create a clean text representation for the embedding content
-        # We might want to include the 'article_number' in the text if it exists to help with retrieval
-        page_content = chunk['text']
-        metadata = chunk['metadata']
-        
-        # Add the chunk_id to metadata so we can track it back
-        metadata['chunk_id'] = chunk['chunk_id']
-        
-        doc = Document(
-            page_content=page_content,
-            metadata=metadata
-        )
-        documents.append(doc)
+
+    # chunk_ids double as docstore IDs so chunks can be fetched directly
+    # (e.g. by the article index) without a similarity search
+    ids = [chunk['chunk_id'] for chunk in chunks]
 
     # Initialize embeddings
-    embeddings = get_embedding_model()
+    embeddings = get_embedding_model(save_path)
+    # Vectors of two backends in one index are not comparable
+    mismatch = embedding_mismatch(save_path, embeddings)
+    if mismatch:
+        raise ValueError(f"Cannot add to the index: {mismatch}")
+
+    if group_mode == 'all':
+        embedded, vectors, siblings = chunks, None, []
+    else:
+        embedded, vectors, siblings = _group_vectors(chunks, embeddings, group_mode)
+    documents = [_to_document(chunk) for chunk in embedded]
+    embedded_ids = [chunk['chunk_id'] for chunk in embedded]
+
+    def build(store=None):
+        if vectors is None:
+            if store is None:
+                return FAISS.from_documents(documents, embeddings, ids=embedded_ids)
+            store.add_documents(documents, ids=embedded_ids)
+            return store
+        text_embeddings = list(zip([doc.page_content for doc in documents], vectors.tolist()))
+        metadatas = [doc.metadata for doc in documents]
+        if store is None:
+            return FAISS.from_embeddings(text_embeddings, embeddings, metadatas=metadatas, ids=embedded_ids)
+        store.add_embeddings(text_embeddings, metadatas=metadatas, ids=embedded_ids)
+        return store
 
     if os.path.exists(save_path):
         try:
             print(f"Loading existing vector store from '{save_path}'...")
             vector_store = FAISS.load_local(save_path, embeddings, allow_dangerous_deserialization=True)
+            # Re-ingesting a document replaces its chunks instead of duplicating them
+            indexed = set(vector_store.index_to_docstore_id.values())
+            existing = [chunk_id for chunk_id in ids if chunk_id in indexed]
+            if existing:
+                vector_store.delete(existing)
+            stored_only = [chunk_id for chunk_id in ids if chunk_id in vector_store.docstore._dict]
+            if stored_only:
+                vector_store.docstore.delete(stored_only)
             print("Adding new documents to existing store...")
-            vector_store.add_documents(documents)
+            vector_store = build(vector_store)
         except Exception as e:
             print(f"Could not load existing index (Error: {e}). Creating new one.")
-            vector_store = FAISS.from_documents(documents, embeddings)
+            vector_store = build()
     else:
         # Create Vector Store
         print("Creating new vector store...")
-        vector_store = FAISS.from_documents(documents, embeddings)
+        vector_store = build()
+
+    # Sibling-language versions live in the docstore only
+    if siblings:
+        vector_store.docstore.add({chunk['chunk_id']: _to_document(chunk) for chunk in siblings})
 
     # Save to disk
     print(f"Saving vector store to '{save_path}'...")
     vector_store.save_local(save_path)
+    save_embedding_info(save_path, embeddings)
+    
+    # Shared document metadata, once per source file
+    documents_metadata = {chunk.metadata.shared.get('source_file'): chunk.metadata.shared for chunk in chunks}
+    documents_metadata.pop(None, None)
+    if documents_metadata:
+        document_store = DocumentMetadataStore.load(save_path)
+        for source_file, metadata in documents_metadata.items():
+            document_store.set(source_file, metadata)
+        document_store.save()
+    print(f"Embedding cache: {embeddings.hits} vectors reused, {embeddings.misses} computed")
     print("Success! Vector store updated.")
     
     return vector_store
@@ -4,46 +4,15 @@ Detects articles using pattern matching for multilingual legal documents.
 Supports English (Article), French (Article), and Kinyarwanda (Ingingo).
 """
 
-import re
-from parse_pdf import parse_pdf_words
 from collections import defaultdict
+from article_scanner import scan_articles
+from parsed_document import ParsedDocument
 
 
 def detect_articles(text):
   
-    articles = []
-    
-    # Patterns for article headers (multilingual)
-    patterns = [
-        # English: "Article 1", "Article One", "ARTICLE 1"
-        r'(?:Article|ARTICLE|Art\.?)\s+(\d+|[IVX]+|One|Two|Three|Four|Five|Six|Seven|Eight|Nine|Ten)',
-        
-        # French: "Article 1", "Article premier"
-        r'(?:Article|ARTICLE)\s+(\d+|premier|première)',
-        
-        # Kinyarwanda: "Ingingo ya mbere", "Ingingo ya 2"
-        r'Ingingo\s+ya\s+(\d+|mbere|kabiri|gatatu|kane|gatanu)',
-        
-        # Simple numbered format: "1.", "2.", "3." at line start
-        r'^(\d+)\.\s',
-    ]
-    
-    combined_pattern = '|'.join(f'({p})' for p in patterns)
-    
-    for match in re.finditer(combined_pattern, text, re.MULTILINE | re.IGNORECASE):
-        # Extract the article number from whichever group matched
-        article_num = None
-        for group in match.groups():
-            if group and not group.startswith(('Article', 'ARTICLE', 'Art', 'Ingingo')):
-                article_num = group
-                break
-        
-        if article_num:
-            articles.append({
-                'number': article_num,
-                'start_pos': match.start(),
-                'matched_text': match.group(0)
-            })
+    # Article headers (Ingingo ya / Article / Art.) found in one pass
+    articles = scan_articles(text)
     
     # Extract content for each article
     for i, article in enumerate(articles):
@@ -63,18 +32,17 @@ def detect_articles(text):
     return articles
 
 
-def detect_articles_from_pdf(pdf_path):
+def detect_articles_from_pdf(pdf_path, document=None):
+    """Detect articles page by page - pass an open ParsedDocument to avoid re-parsing"""
   
-    pages_data = parse_pdf_words(pdf_path)
-    
     result = defaultdict(list)
+    document = document or ParsedDocument(pdf_path, max_cached_pages=1)
     
-    for page_data in pages_data:
-        page_num = page_data['page_num']
-        words = page_data['words']
+    for page_data in document.pages():
+        page_num = page_data.page_num
         
         # Extract text from page
-        page_text = ' '.join(word['text'] for word in words if 'text' in word)
+        page_text = ' '.join(page_data.text)
         
         # Detect articles on this page
         articles = detect_articles(page_text)
@@ -1,66 +1,176 @@
-from parse_pdf import parse_pdf_words
+from itertools import islice
+
+import numpy as np
+from parse_pdf import iter_pdf_pages, as_page_words
+
+
+# Narrowest empty vertical strip (in points) accepted as a gutter between columns
+MIN_GUTTER_WIDTH = 4
+
+# Pages read at the start of a document to pick its layout template
+TEMPLATE_SAMPLE_PAGES = 4
+
+# Share of a page's words that may straddle a template boundary (signature
+# lines, table rows) before the page is treated as a different layout
+TEMPLATE_MAX_CROSSING = 0.1
+
+
+def _profile_gutters(words, page_width):
+    """Empty vertical strips of the page, widest first, as (start, stop) rows
+    
+    Builds the x-coverage projection profile of the word boxes at 1pt resolution
+    (a difference array + cumsum, no per-word loop) and returns the zero-coverage
+    runs whose center lies in the middle 20%-80% of the page.
+    """
+    num_bins = int(np.ceil(page_width)) + 1
+    starts = np.clip(np.floor(words.x0).astype(np.intp), 0, num_bins - 1)
+    stops = np.clip(np.ceil(words.x1).astype(np.intp), 0, num_bins - 1)
+    
+    delta = np.zeros(num_bins + 1, dtype=np.int32)
+    np.add.at(delta, starts, 1)
+    np.add.at(delta, stops, -1)
+    coverage = np.cumsum(delta)[:num_bins]
+    
+    empty = np.concatenate(([False], coverage == 0, [False]))
+    edges = np.flatnonzero(np.diff(empty.astype(np.int8)))
+    runs = edges.reshape(-1, 2)  # each row: first empty bin, first covered bin after it
+    
+    widths = runs[:, 1] - runs[:, 0]
+    centers = runs.sum(axis=1) / 2
+    keep = (widths >= MIN_GUTTER_WIDTH) & (centers > 0.2 * page_width) & (centers < 0.8 * page_width)
+    runs = runs[keep]
+    return runs[np.argsort(-widths[keep], kind='stable')]
+
+
+def _center_gap_boundaries(words, page_width):
+    """Two largest gaps between consecutive word centers in the middle of the page"""
+    
+    # Center x-coordinate of each word, sorted
+    word_centers = np.sort(words.centers()).astype(np.float64)
+    
+    # Gaps between consecutive word positions
+    gap_sizes = np.diff(word_centers)
+    gap_centers = (word_centers[:-1] + word_centers[1:]) / 2
+    
+    # Filter gaps that are in the middle portion of the page
+    # (not too close to edges - between 20% and 80% of page width)
+    middle = (gap_centers > 0.2 * page_width) & (gap_centers < 0.8 * page_width)
+    gap_sizes, gap_centers = gap_sizes[middle], gap_centers[middle]
+    
+    if len(gap_sizes) < 2:
+        return None
+    
+    # Take the 2 largest gaps (ties keep left-most) and order them left to right
+    largest = np.argsort(-gap_sizes, kind='stable')[:2]
+    boundary_1, boundary_2 = sorted(gap_centers[largest].tolist())
+    return (boundary_1, boundary_2)
 
 
 def detect_column_boundaries(page_data, num_columns=3):
     
-    words = page_data['words']
+    words = as_page_words(page_data['words'])
     page_width = page_data['width']
     
-    if not words:
-        # Fallback to equal division
-        if num_columns == 3:
-            return (page_width / 3, 2 * page_width / 3)
+    if num_columns != 3:
         return None
     
-    # Step 1: Get center x-coordinate of each word
-    word_centers = [(w['x0'] + w['x1']) / 2 for w in words]
-    word_centers.sort()
-    
-    # Step 2: Find gaps between consecutive word positions
-    gaps = []
-    for i in range(len(word_centers) - 1):
-        gap_size = word_centers[i + 1] - word_centers[i]
-        gap_center = (word_centers[i] + word_centers[i + 1]) / 2
-        gaps.append({
-            'size': gap_size,
-            'center': gap_center,
-            'left': word_centers[i],
-            'right': word_centers[i + 1]
-        })
-    
-    # Step 3: Sort gaps by size (largest first)
-    gaps.sort(key=lambda g: g['size'], reverse=True)
+    if not len(words):
+        # Fallback to equal division
+        return (page_width / 3, 2 * page_width / 3)
     
-    # For 3 columns, we need 2 boundaries
-    if num_columns == 3:
-        # Filter gaps that are in the middle portion of the page
-        # (not too close to edges - between 20% and 80% of page width)
-        middle_gaps = [g for g in gaps if 0.2 * page_width < g['center'] < 0.8 * page_width]
-        
-        if len(middle_gaps) >= 2:
-            # Take the 2 largest gaps in the middle section
-            # Sort them left to right so boundary_1 < boundary_2
-            selected_gaps = sorted(middle_gaps[:2], key=lambda g: g['center'])
-            boundary_1 = selected_gaps[0]['center']
-            boundary_2 = selected_gaps[1]['center']
-        else:
-            # Fallback to equal division if gaps aren't clear
-            boundary_1 = page_width / 3
-            boundary_2 = 2 * page_width / 3
-        
+    # Column gutters are the empty strips of the x-coverage profile
+    gutters = _profile_gutters(words, page_width)
+    if len(gutters) >= 2:
+        boundary_1, boundary_2 = sorted((gutters[:2].sum(axis=1) / 2).tolist())
         return (boundary_1, boundary_2)
     
-    return None
+    # No two clean gutters (sparse page, table, ragged layout) - use the largest
+    # gaps between word centers instead
+    boundaries = _center_gap_boundaries(words, page_width)
+    if boundaries:
+        return boundaries
+    
+    # Fallback to equal division if gaps aren't clear
+    return (page_width / 3, 2 * page_width / 3)
+
+
+def detect_layout_template(pages):
+    """
+    Column boundaries shared by the pages of a document.
+    
+    Taken from the page with the most words among the first TEMPLATE_SAMPLE_PAGES
+    pages that have two clean gutters. Returns None when no sampled page has a
+    three-column layout (case law, letters) - every page is then detected on its own.
+    """
+    template = None
+    best_count = 0
+    
+    for page_data in islice(pages, TEMPLATE_SAMPLE_PAGES):
+        words = as_page_words(page_data['words'])
+        if len(words) <= best_count:
+            continue
+        gutters = _profile_gutters(words, page_data['width'])
+        if len(gutters) < 2:
+            continue
+        boundary_1, boundary_2 = sorted((gutters[:2].sum(axis=1) / 2).tolist())
+        template = {'width': page_data['width'], 'boundaries': (boundary_1, boundary_2)}
+        best_count = len(words)
+    
+    return template
+
+
+def template_fits(page_data, template):
+    """Drift check: same page width and (almost) no word straddles a template boundary"""
+    
+    if abs(page_data['width'] - template['width']) > 1:
+        return False
+    
+    words = as_page_words(page_data['words'])
+    boundaries = np.array(template['boundaries'])
+    crossing = ((words.x0[:, None] < boundaries) & (words.x1[:, None] > boundaries)).any(axis=1)
+    return np.count_nonzero(crossing) <= TEMPLATE_MAX_CROSSING * len(words)
+
+
+def lines_fit(page_data, boundaries):
+    """No more than TEMPLATE_MAX_CROSSING of the page's text lines run across a column
+    boundary (a full-width table or annex page can pass the word-level drift check
+    when its word gaps happen to fall on the gutters)"""
+    
+    words = as_page_words(page_data['words'])
+    if not len(words):
+        return True
+    
+    # x-extent of each (block, line) of the page
+    _, line_of_word = np.unique(np.stack([words.block_no, words.line_no], axis=1), axis=0, return_inverse=True)
+    line_of_word = line_of_word.reshape(-1)
+    num_lines = int(line_of_word.max()) + 1
+    x0 = np.full(num_lines, np.inf)
+    x1 = np.full(num_lines, -np.inf)
+    np.minimum.at(x0, line_of_word, words.x0)
+    np.maximum.at(x1, line_of_word, words.x1)
+    
+    boundaries = np.array(boundaries)
+    crossing = ((x0[:, None] < boundaries) & (x1[:, None] > boundaries)).any(axis=1)
+    return np.count_nonzero(crossing) <= TEMPLATE_MAX_CROSSING * num_lines
 
 
-def detect_columns(page_data):
+def detect_columns(page_data, template=None):
+    """
+    Split a page into its 3 language columns.
     
-    if not page_data['words']:
+    When a layout template is given (see detect_layout_template) and the page
+    passes the drift check, its boundaries are reused as they are; otherwise the
+    page's own boundaries are detected.
+    """
+    
+    words = as_page_words(page_data['words'])
+    if not len(words):
         return []
     
     page_width = page_data['width']
-    page_height = page_data['height']
-    words = page_data['words']
+    
+    if template is not None and template_fits(page_data, template):
+        return build_columns(page_data, template['boundaries'])
     
     # Detect column boundaries using gap analysis
     boundaries = detect_column_boundaries(page_data, num_columns=3)
@@ -69,6 +179,15 @@ def detect_columns(page_data):
         # Fallback
         boundaries = (page_width / 3, 2 * page_width / 3)
     
+    return build_columns(page_data, boundaries)
+
+
+def build_columns(page_data, boundaries):
+    """Split a page's words into the 3 language columns delimited by boundaries"""
+    
+    words = as_page_words(page_data['words'])
+    page_width = page_data['width']
+    page_height = page_data['height']
     boundary_1, boundary_2 = boundaries
     
     # Define 3 columns with language assignments
@@ -79,17 +198,22 @@ def detect_columns(page_data):
         (boundary_2, page_width, 'fr', 'French')
     ]
     
+    # Assign every word to a column in one pass: edges are [0, b1, b2, width)
+    edges = np.array([0, boundary_1, boundary_2, page_width], dtype=np.float64)
+    column_of_word = np.searchsorted(edges, words.centers(), side='right') - 1
+    on_page = (column_of_word >= 0) & (column_of_word < len(column_defs))
+    word_ids = np.flatnonzero(on_page)
+    # Stable sort keeps page order inside each column
+    word_ids = word_ids[np.argsort(column_of_word[word_ids], kind='stable')]
+    counts = np.bincount(column_of_word[on_page], minlength=len(column_defs))
+    column_word_ids = np.split(word_ids, np.cumsum(counts)[:-1])
+    
     columns = []
     for i, (x0, x1, lang_code, lang_name) in enumerate(column_defs):
-        # Find all words in this column
-        words_in_column = []
-        for word in words:
-            word_center = (word['x0'] + word['x1']) / 2
-            if x0 <= word_center < x1:
-                words_in_column.append(word)
+        words_in_column = words.take(column_word_ids[i])
         
         # Get sample text (first 10 words)
-        sample_text = ' '.join(w['text'] for w in words_in_column[:10])
+        sample_text = ' '.join(words_in_column.text[:10])
         
         columns.append({
             'column_num': i,
@@ -101,77 +225,152 @@ def detect_columns(page_data):
             'language': lang_code,
             'language_name': lang_name,
             'sample_text': sample_text,
-            'words': words_in_column  # Include actual words for further processing
+            'words': words_in_column.words  # Include actual words for further processing
         })
     
     return columns
 
 
-def detect_columns_all_pages(pdf_path):
-    
-    # Step 1: Parse PDF to get words with coordinates for each page
-    pages_data = parse_pdf_words(pdf_path)
-    result = []
-    
-    for page_data in pages_data:
-        columns = detect_columns(page_data)
+def iter_columns_all_pages(pages, template=None):
+    """Run column detection page by page over any iterable of parsed pages"""
+    for page_data in pages:
+        columns = detect_columns(page_data, template)
         
-        result.append({
+        yield {
             'page_num': page_data['page_num'],
             'width': page_data['width'],
             'height': page_data['height'],
             'num_columns': len(columns),
             'columns': columns
-        })
+        }
+
+
+def detect_columns_all_pages(pdf_path):
     
-    return result
+    # Pick the document's layout template from its first pages, then parse
+    # page by page and detect the columns of each page
+    template = detect_layout_template(iter_pdf_pages(pdf_path, 0, TEMPLATE_SAMPLE_PAGES))
+    return list(iter_columns_all_pages(iter_pdf_pages(pdf_path), template))
 
 
-def group_words_by_line(words, line_height_threshold=5):
+def _sweep_line_indices(words, line_height_threshold=5):
+    """Line grouping by vertical position - one index array per line
     
-    if not words:
-        return []
+    Words are swept top to bottom and join the current line while they stay within
+    the threshold of its average y0. The average is kept as a running sum, so the
+    sweep is linear after sorting.
+    """
     
     # Sort by vertical position (y0) - from top to bottom
-    sorted_words = sorted(words, key=lambda w: w['y0'])
+    order = np.argsort(words.y0, kind='stable')
+    y0 = words.y0.tolist()
+    x0 = words.x0
     
     lines = []
-    current_line = [sorted_words[0]]
+    current_line = [order[0]]
+    line_sum = y0[order[0]]
     
-    for word in sorted_words[1:]:
-        # Calculate average y-position of current line for more robust comparison
-        avg_y = sum(w['y0'] for w in current_line) / len(current_line)
+    for idx in order[1:]:
+        # Average y-position of current line for more robust comparison
+        avg_y = line_sum / len(current_line)
         
-        if abs(word['y0'] - avg_y) <= line_height_threshold:
+        if abs(y0[idx] - avg_y) <= line_height_threshold:
             # Same line - word is close enough to the average position
-            current_line.append(word)
+            current_line.append(idx)
+            line_sum += y0[idx]
         else:
             # New line detected - finalize current line and start new one
             # Sort words left to right (by x0) for proper reading order
-            lines.append(sorted(current_line, key=lambda w: w['x0']))
-            current_line = [word]
+            line = np.asarray(current_line)
+            lines.append(line[np.argsort(x0[line], kind='stable')])
+            current_line = [idx]
+            line_sum = y0[idx]
     
     # Don't forget the last line
     if current_line:
-        lines.append(sorted(current_line, key=lambda w: w['x0']))
+        line = np.asarray(current_line)
+        lines.append(line[np.argsort(x0[line], kind='stable')])
     
     return lines
 
+
+def _native_line_indices(words, line_height_threshold=5):
+    """Line grouping from PyMuPDF's own (block_no, line_no) ids
+    
+    Native lines are ordered by their top and merged into visual lines (a
+    Kinyarwanda line and its neighbour from another block share a row). The result
+    is only used when it is unambiguous - every merged row spans at most the
+    threshold and rows are separated by more than the threshold - which is exactly
+    when the y0 sweep would produce the same lines. Returns None otherwise.
+    """
+    y0 = words.y0.astype(np.float64)
+    key = (words.block_no.astype(np.int64) << 32) | (words.line_no.astype(np.int64) & 0xFFFFFFFF)
+    _, line_of = np.unique(key, return_inverse=True)
+    num_lines = int(line_of.max()) + 1
+    
+    line_min = np.full(num_lines, np.inf)
+    line_max = np.full(num_lines, -np.inf)
+    np.minimum.at(line_min, line_of, y0)
+    np.maximum.at(line_max, line_of, y0)
+    
+    row_of_line = np.empty(num_lines, dtype=np.intp)
+    row = -1
+    row_min = row_max = 0.0
+    for line in np.argsort(line_min, kind='stable').tolist():
+        top, bottom = line_min[line], line_max[line]
+        if row < 0 or top - row_max > line_height_threshold:
+            # Clearly below the current row - start a new one
+            row += 1
+            row_min, row_max = top, bottom
+        else:
+            row_max = max(row_max, bottom)
+        if row_max - row_min > line_height_threshold:
+            return None
+        row_of_line[line] = row
+    
+    # Order words by row, then left to right (ties keep the sweep's y0 order)
+    row_of_word = row_of_line[line_of]
+    order = np.lexsort((np.arange(len(words)), y0, words.x0, row_of_word))
+    breaks = np.flatnonzero(np.diff(row_of_word[order])) + 1
+    return np.split(order, breaks)
+
+
+def _group_line_indices(words, line_height_threshold=5):
+    """Line grouping on a PageWords object - returns one index array per line"""
+    lines = _native_line_indices(words, line_height_threshold)
+    if lines is None:
+        lines = _sweep_line_indices(words, line_height_threshold)
+    return lines
+
+
+def group_words_by_line(words, line_height_threshold=5):
+    
+    words = as_page_words(words)
+    if not len(words):
+        return []
+    
+    view = words.words
+    return [
+        [view[i] for i in line]
+        for line in _group_line_indices(words, line_height_threshold)
+    ]
+
 def reconstruct_text_reading_order(column, line_height_threshold=5, add_line_breaks=True):
    
     if 'words' not in column or not column['words']:
         return ""
     
-    words = column['words']
+    words = as_page_words(column['words'])
     
     # Group words into lines
-    lines = group_words_by_line(words, line_height_threshold)
+    lines = _group_line_indices(words, line_height_threshold)
     
     # Reconstruct text line by line
+    text = words.text
     text_lines = []
     for line in lines:
         # Join words in this line with spaces
-        line_text = ' '.join(word['text'] for word in line)
+        line_text = ' '.join(text[i] for i in line)
         text_lines.append(line_text)
     
     # Join lines
@@ -194,12 +393,12 @@ if __name__ == "__main__":
     print(f"Analyzing PDF: {pdf_path}")
     print("=" * 80)
     
-    # Detect columns in all pages
-    result = detect_columns_all_pages(pdf_path)
+    from parsed_document import ParsedDocument
     
-    # Display results for each page
-    for page_info in result:
-        page_num = page_info['page_num']
+    # Detect columns page by page and display results for each page
+    document = ParsedDocument(pdf_path, max_cached_pages=1)
+    for page_num in range(document.page_count):
+        page_info = document.page_info(page_num)
         print(f"\n{'='*80}")
         print(f"PAGE {page_num}")
         print(f"{'='*80}")
@@ -214,7 +413,7 @@ if __name__ == "__main__":
             print(f"Word count: {col['word_count']}")
             
             # Reconstruct text in reading order
-            reconstructed_text = reconstruct_text_reading_order(col)
+            reconstructed_text = document.column_texts(page_num)[col['column_num']]
             
             print(f"\nReconstructed text:")
             print("-" * 40)
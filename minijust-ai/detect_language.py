@@ -1,14 +1,32 @@
 """
 Simple language detection for PDF files.
 Uses langid library which supports Kinyarwanda detection.
+
+Texts are classified in batches: langid's byte n-gram automaton is run over
+all windows of a page at once with NumPy and every window is scored against
+the en/fr/rw model in one pass, instead of one langid.classify call per window.
+Results are memoized by text.
+
+profile_column_languages samples a few windows per column across a document
+to find (or correct) the language of each column position once.
 """
 
+from collections import Counter, OrderedDict
+from functools import lru_cache
+from typing import List
+
 import langid
-from parse_pdf import parse_pdf_words
-from collections import Counter
+import langid.langid
+import numpy as np
+from parse_pdf import as_page_words
+
+LANGUAGES = ['en', 'fr', 'rw']
 
 # Configure langid to include Kinyarwanda
-langid.set_languages(['en', 'fr', 'rw'])
+langid.set_languages(LANGUAGES)
+
+# Memoized window classifications (least recently used are dropped)
+MAX_CACHED_TEXTS = 50000
 
 # Language name mapping
 LANGUAGE_NAMES = {
@@ -19,12 +37,174 @@ LANGUAGE_NAMES = {
 }
 
 
+class BatchLanguageIdentifier:
+    """
+    langid's model restricted to LANGUAGES, scoring many texts at once.
+    
+    langid walks a byte-level automaton over the text, and each state it enters
+    adds the log-probabilities of the n-grams ending there. Here the per-state
+    class scores are precomputed (states x languages), so a text's score is just
+    the sum of the rows of the states it visits.
+    
+    The automaton state after a byte only depends on the last max_depth bytes
+    (the longest n-gram), so the states of every byte of every text are found
+    with max_depth vectorized table lookups instead of a Python loop per byte.
+    """
+
+    def __init__(self, identifier):
+        self.classes = list(identifier.nb_classes)
+        self.class_priors = identifier.nb_pc.astype(np.float64)
+        self.nextmove = np.array(identifier.tk_nextmove, dtype=np.intp)
+        num_states = len(self.nextmove) >> 8
+        
+        # Class scores added each time the automaton enters a state
+        feature_probs = identifier.nb_ptc.astype(np.float64)
+        outputs = [(state, feature) for state, features in identifier.tk_output.items() for feature in features]
+        output_states, output_features = np.array(outputs, dtype=np.intp).reshape(-1, 2).T
+        self.state_scores = np.zeros((num_states, len(self.classes)))
+        np.add.at(self.state_scores, output_states, feature_probs[output_features])
+        
+        self.max_depth = self._automaton_depth(num_states)
+
+    def _automaton_depth(self, num_states):
+        """Length of the longest n-gram: breadth-first distance from the start state"""
+        transitions = self.nextmove.reshape(num_states, 256)
+        seen = np.zeros(num_states, dtype=bool)
+        seen[0] = True
+        frontier = np.array([0])
+        depth = 0
+        while True:
+            reached = np.zeros(num_states, dtype=bool)
+            reached[transitions[frontier].ravel()] = True
+            frontier = np.flatnonzero(reached & ~seen)
+            if not len(frontier):
+                return depth
+            seen[frontier] = True
+            depth += 1
+
+    def scores(self, texts: List[str]) -> np.ndarray:
+        """Unnormalized log-probability of each text in each class, shape (texts, classes)"""
+        encoded = [text.encode('utf8') for text in texts]
+        lengths = np.fromiter((len(b) for b in encoded), dtype=np.intp, count=len(encoded))
+        data = np.frombuffer(b''.join(encoded), dtype=np.uint8).astype(np.intp)
+        
+        # Byte offset where the text of each byte starts - the automaton restarts there
+        text_starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+        positions = np.arange(len(data))
+        
+        # State after each byte: replay the last max_depth bytes from the start state
+        states = np.zeros(len(data), dtype=np.intp)
+        for back in range(self.max_depth - 1, -1, -1):
+            source = positions - back
+            inside = source >= text_starts
+            states[inside] = self.nextmove[(states[inside] << 8) + data[source[inside]]]
+        
+        text_of_byte = np.repeat(np.arange(len(texts)), lengths)
+        byte_scores = self.state_scores[states]
+        totals = np.stack([
+            np.bincount(text_of_byte, weights=byte_scores[:, c], minlength=len(texts))
+            for c in range(len(self.classes))
+        ], axis=1)
+        return totals + self.class_priors
+
+    def classify(self, texts: List[str]) -> List[str]:
+        """Most likely language of each text (same as langid.classify(text)[0])"""
+        if not texts:
+            return []
+        return [self.classes[i] for i in self.scores(texts).argmax(axis=1)]
+
+
+_identifier = None
+_text_cache = OrderedDict()
+
+
+def classify_texts(texts: List[str]) -> List[str]:
+    """Language code of each text, classified in one batch and memoized by text"""
+    global _identifier
+    
+    missing = list(dict.fromkeys(text for text in texts if text not in _text_cache))
+    if missing:
+        if _identifier is None:
+            _identifier = BatchLanguageIdentifier(langid.langid.identifier)
+        for text, lang in zip(missing, _identifier.classify(missing)):
+            _text_cache[text] = lang
+    
+    results = []
+    for text in texts:
+        _text_cache.move_to_end(text)
+        results.append(_text_cache[text])
+    
+    while len(_text_cache) > MAX_CACHED_TEXTS:
+        _text_cache.popitem(last=False)
+    return results
+
+
+# Document language profiling: windows sampled from each column of a page,
+# and when the per-column votes count as settled
+PROFILE_WINDOWS_PER_TEXT = 2
+PROFILE_MIN_WINDOWS = 6
+PROFILE_AGREEMENT = 0.8
+PROFILE_MAX_PAGES = 12
+
+
+def _sample_windows(text, count=PROFILE_WINDOWS_PER_TEXT, size=40):
+    """A few evenly spaced windows of size words, skipping the very start (running headers)"""
+    word_list = text.split()
+    if len(word_list) <= size:
+        return [text] if len(text.strip()) >= 10 else []
+    starts = np.linspace(0, len(word_list) - size, count + 2)[1:-1].astype(int)
+    return [' '.join(word_list[start:start + size]) for start in starts]
+
+
+def profile_column_languages(pages_texts, num_columns=3):
+    """
+    Document-level language of each column position.
+    
+    Samples a few windows per column per page (all classified in one batch per
+    page) and stops as soon as every column that has text has at least
+    PROFILE_MIN_WINDOWS votes, PROFILE_AGREEMENT of them for one language,
+    or after PROFILE_MAX_PAGES pages.
+    
+    Args:
+        pages_texts: Iterable of per-page lists of column texts (e.g.
+            ParsedDocument.column_texts for each page); pages without columns
+            may be empty lists
+        num_columns: Number of column positions
+    
+    Returns:
+        list: Majority language code of each column, None where a column had no text
+    """
+    votes = [Counter() for _ in range(num_columns)]
+    
+    for page_num, column_texts in enumerate(pages_texts):
+        if page_num >= PROFILE_MAX_PAGES:
+            break
+        
+        windows, owners = [], []
+        for column_num, text in enumerate(column_texts[:num_columns]):
+            sampled = _sample_windows(text)
+            windows.extend(sampled)
+            owners.extend([column_num] * len(sampled))
+        for column_num, lang in zip(owners, classify_texts(windows)):
+            votes[column_num][lang] += 1
+        
+        counted = [column_votes for column_votes in votes if column_votes]
+        if counted and all(
+            sum(column_votes.values()) >= PROFILE_MIN_WINDOWS
+            and column_votes.most_common(1)[0][1] >= PROFILE_AGREEMENT * sum(column_votes.values())
+            for column_votes in counted
+        ):
+            break
+    
+    return [column_votes.most_common(1)[0][0] if column_votes else None for column_votes in votes]
+
+
 def detect_language(page_data):
     """
     Detect all languages present in a page by analyzing text chunks.
     
     Args:
-        page_data (dict): Page data with 'words' key containing word dictionaries
+        page_data (PageWords | dict): Parsed page (or legacy dict with a 'words' list)
     
     Returns:
         list: List of detected language codes (e.g., ['en', 'fr', 'rw'])
@@ -32,18 +212,31 @@ def detect_language(page_data):
     if not page_data or 'words' not in page_data:
         return ['unknown']
     
-    words = page_data['words']
-    if not words:
+    words = as_page_words(page_data['words'])
+    if not len(words):
         return ['unknown']
     
     # Extract all text
-    all_text = ' '.join(word['text'] for word in words if 'text' in word)
+    return detect_text_languages(' '.join(words.text))
+
+
+def detect_text_languages(all_text):
+    """
+    Same window-voting detection as detect_language, on already joined page text.
     
-    if len(all_text.strip()) < 10:
-        return ['unknown']
+    Args:
+        all_text (str): Space-joined words of a page
     
-    # Count language detections per chunk
-    language_count = Counter()
+    Returns:
+        list: List of detected language codes (e.g., ['en', 'fr', 'rw'])
+    """
+    return list(_text_languages(all_text))
+
+
+@lru_cache(maxsize=256)
+def _text_languages(all_text):
+    if len(all_text.strip()) < 10:
+        return ('unknown',)
     
     # Split into chunks of ~40 words
     word_list = all_text.split()
@@ -51,29 +244,18 @@ def detect_language(page_data):
     
     if len(word_list) < chunk_size:
         # If page is small, analyze as single chunk
-        try:
-            lang, confidence = langid.classify(all_text)
-            return [lang]
-        except Exception:
-            return ['unknown']
-    
-    # Analyze chunks
-    for i in range(0, len(word_list), chunk_size):
-        chunk = ' '.join(word_list[i:i + chunk_size])
-        
-        if len(chunk.strip()) < 10:
-            continue
-        
-        try:
-            lang, confidence = langid.classify(chunk)
-            language_count[lang] += 1
-        except Exception:
-            continue
+        return tuple(classify_texts([all_text]))
+    
+    chunks = [' '.join(word_list[i:i + chunk_size]) for i in range(0, len(word_list), chunk_size)]
+    chunks = [chunk for chunk in chunks if len(chunk.strip()) >= 10]
+    
+    # Count language detections per chunk, all chunks classified in one batch
+    language_count = Counter(classify_texts(chunks))
     
     # Get languages that appear in at least 15% of chunks
     total_chunks = len(language_count)
     if total_chunks == 0:
-        return ['unknown']
+        return ('unknown',)
     
     threshold = max(1, total_chunks * 0.15)  # At least 15% of chunks
     
@@ -82,7 +264,7 @@ def detect_language(page_data):
         if count >= threshold
     ]
     
-    return sorted(detected_languages) if detected_languages else ['unknown']
+    return tuple(sorted(detected_languages)) if detected_languages else ('unknown',)
 
 
 if __name__ == "__main__":
@@ -97,13 +279,12 @@ if __name__ == "__main__":
     print(f"Detecting languages in: {pdf_path}")
     print("=" * 80)
     
-    # Parse PDF
-    pages_data = parse_pdf_words(pdf_path)
+    from parsed_document import ParsedDocument
     
-    # Detect languages for each page
-    for page_data in pages_data:
-        page_num = page_data['page_num']
-        languages = detect_language(page_data)
+    # Parse the PDF once and detect languages for each page
+    document = ParsedDocument(pdf_path, max_cached_pages=1)
+    for page_num in range(document.page_count):
+        languages = document.languages(page_num)
         
         # Format language names
         lang_names = [LANGUAGE_NAMES.get(lang, lang) for lang in languages]
@@ -0,0 +1,215 @@
+"""
+Persistent, content-addressed cache of chunk embeddings.
+
+Vectors are keyed by the embedding model and a hash of the whitespace-
+normalized text, so re-ingesting a document, rebuilding the FAISS index or
+restoring a deleted document reads vectors from disk instead of running the
+transformer again.
+
+Each vector store has its own cache (store_cache_dir), so compacting one
+store never drops vectors another store still uses. Inside it each model has
+one directory holding a small JSON manifest and one append-only file of
+fixed-size records:
+
+    manifest.json    model name, dimension, dtype
+    vectors.bin      (key uint64, vector dtype[dim]) records, little-endian
+
+The file is read back with np.memmap; a sorted copy of the keys is the lookup
+index, so a batch of texts is resolved with one np.searchsorted. New vectors
+are appended with a single write per batch; a partly written last record (e.g.
+after a crash) is ignored. Keys are the first 8 bytes of a BLAKE2b digest.
+"""
+
+import hashlib
+import json
+import os
+import re
+import unicodedata
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", "embedding_cache")
+# float16 halves the file at a small precision cost
+EMBEDDING_CACHE_DTYPE = os.getenv("EMBEDDING_CACHE_DTYPE", "float32")
+
+MANIFEST = "manifest.json"
+VECTORS_FILE = "vectors.bin"
+
+
+def normalize_text(text: str) -> str:
+    """Text as it is keyed: NFC, whitespace runs collapsed, stripped"""
+    return ' '.join(unicodedata.normalize('NFC', text).split())
+
+
+def store_cache_dir(vector_store_path: str, cache_dir: Optional[str] = None) -> str:
+    """Cache directory of one vector store (its name plus a hash of its absolute path)"""
+    path = os.path.abspath(vector_store_path)
+    digest = hashlib.blake2b(path.encode('utf-8'), digest_size=4).hexdigest()
+    name = re.sub(r'[^\w.-]+', '_', os.path.basename(path))
+    return os.path.join(cache_dir or EMBEDDING_CACHE_DIR, f"{name}-{digest}")
+
+
+def text_keys(texts: Sequence[str]) -> np.ndarray:
+    """uint64 cache key of each text"""
+    return np.array([
+        int.from_bytes(hashlib.blake2b(normalize_text(text).encode('utf-8'), digest_size=8).digest(), 'little')
+        for text in texts
+    ], dtype=np.uint64)
+
+
+class EmbeddingCache:
+    """Append-only vector file for one embedding model"""
+
+    def __init__(self, model_name: str, cache_dir: str = EMBEDDING_CACHE_DIR,
+                 dtype: str = EMBEDDING_CACHE_DTYPE):
+        self.model_name = model_name
+        self.dtype = np.dtype(dtype).newbyteorder('<')
+        self.entry_dir = os.path.join(cache_dir, re.sub(r'[^\w.-]+', '_', model_name) + f"-{np.dtype(dtype).name}")
+        self.path = os.path.join(self.entry_dir, VECTORS_FILE)
+        self.dim = None
+        self._records = None  # memmap of the records read so far
+        self._size = 0  # bytes of vectors.bin covered by _records
+        self._sorted_keys = np.zeros(0, dtype=np.uint64)
+        self._order = np.zeros(0, dtype=np.intp)
+
+        try:
+            with open(os.path.join(self.entry_dir, MANIFEST)) as f:
+                self.dim = json.load(f)['dim']
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def __len__(self):
+        self._refresh()
+        return 0 if self._records is None else len(self._records)
+
+    def _record_dtype(self) -> np.dtype:
+        return np.dtype([('key', '<u8'), ('vector', self.dtype, (self.dim,))])
+
+    def _refresh(self):
+        """Map records appended since the last look (by this or another process)"""
+        if self.dim is None:
+            return
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return
+        record_dtype = self._record_dtype()
+        size -= size % record_dtype.itemsize
+        if size == self._size:
+            return
+        self._records = np.memmap(self.path, dtype=record_dtype, mode='r', shape=(size // record_dtype.itemsize,))
+        keys = np.asarray(self._records['key'])
+        self._order = np.argsort(keys, kind='stable')
+        self._sorted_keys = keys[self._order]
+        self._size = size
+
+    def lookup(self, keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(row of each key in the file, found mask) for a batch of keys"""
+        self._refresh()
+        if not len(self._sorted_keys):
+            return np.zeros(len(keys), dtype=np.intp), np.zeros(len(keys), dtype=bool)
+        positions = np.minimum(np.searchsorted(self._sorted_keys, keys), len(self._sorted_keys) - 1)
+        found = self._sorted_keys[positions] == keys
+        return self._order[positions], found
+
+    def get(self, texts: Sequence[str]) -> Tuple[Optional[np.ndarray], np.ndarray]:
+        """(float32 vectors with rows for cached texts, found mask); vectors is None if nothing was cached"""
+        rows, found = self.lookup(text_keys(texts))
+        if not found.any():
+            return None, found
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        vectors[found] = self._records['vector'][rows[found]]
+        return vectors, found
+
+    def put(self, texts: Sequence[str], vectors) -> None:
+        """Append vectors for texts (already cached or repeated texts are skipped)"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if not len(texts):
+            return
+        if self.dim is None:
+            self.dim = int(vectors.shape[1])
+            os.makedirs(self.entry_dir, exist_ok=True)
+            with open(os.path.join(self.entry_dir, MANIFEST), 'w') as f:
+                json.dump({'model': self.model_name, 'dim': self.dim, 'dtype': self.dtype.name}, f)
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match the cache ({self.dim})")
+
+        keys = text_keys(texts)
+        _, found = self.lookup(keys)
+        _, first = np.unique(keys, return_index=True)
+        new = np.zeros(len(keys), dtype=bool)
+        new[first] = True
+        new &= ~found
+        if not new.any():
+            return
+
+        records = np.zeros(int(new.sum()), dtype=self._record_dtype())
+        records['key'] = keys[new]
+        records['vector'] = vectors[new]
+        with open(self.path, 'ab') as f:
+            f.write(records.tobytes())
+
+    def compact(self, keep_texts: Sequence[str]) -> int:
+        """
+        Rewrite the file with only the vectors of keep_texts (and no duplicate
+        records); returns the number of records dropped. The new file replaces
+        the old one atomically. Meant for a single writer: vectors appended by
+        another process while compacting are lost (and simply recomputed later).
+        """
+        self._refresh()
+        if self._records is None:
+            return 0
+        keys = np.asarray(self._records['key'])
+        keep = np.isin(keys, text_keys(keep_texts))
+        _, first = np.unique(keys, return_index=True)
+        unique = np.zeros(len(keys), dtype=bool)
+        unique[first] = True
+        keep &= unique
+        dropped = len(keys) - int(keep.sum())
+        if not dropped:
+            return 0
+
+        tmp_path = f"{self.path}.tmp-{os.getpid()}"
+        with open(tmp_path, 'wb') as f:
+            f.write(np.ascontiguousarray(self._records[keep]).tobytes())
+        self._records = None
+        self._size = 0
+        self._sorted_keys = np.zeros(0, dtype=np.uint64)
+        self._order = np.zeros(0, dtype=np.intp)
+        os.replace(tmp_path, self.path)
+        self._refresh()
+        return dropped
+
+
+class CachedEmbeddings(Embeddings):
+    """LangChain Embeddings that consult an EmbeddingCache before the wrapped model"""
+
+    def __init__(self, model: Embeddings, cache: EmbeddingCache):
+        self.model = model
+        self.cache = cache
+        self.hits = 0
+        self.misses = 0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        vectors, found = self.cache.get(texts)
+        missing = np.flatnonzero(~found)
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+        if len(missing):
+            # Each distinct missing text is embedded once
+            unique_texts = list(dict.fromkeys(texts[i] for i in missing))
+            new_vectors = np.asarray(self.model.embed_documents(unique_texts), dtype=np.float32)
+            self.cache.put(unique_texts, new_vectors)
+            if vectors is None:
+                vectors = np.zeros((len(texts), new_vectors.shape[1]), dtype=np.float32)
+            row = {text: i for i, text in enumerate(unique_texts)}
+            vectors[missing] = new_vectors[[row[texts[i]] for i in missing]]
+        return vectors.tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        # Queries are one-off; they go straight to the model
+        return self.model.embed_query(text)
@@ -0,0 +1,183 @@
+"""
+ONNX Runtime backend for the embedding model, quantized to int8.
+
+paraphrase-multilingual-MiniLM-L12-v2 is an XLM-R transformer followed by
+mean pooling. The transformer is exported once to ONNX and its weights
+quantized with dynamic int8 quantization (onnxruntime.quantization); at run
+time texts are tokenized with the tokenizers library, run through an
+onnxruntime CPU session and mean-pooled in numpy. Neither torch nor
+sentence-transformers is imported, which keeps each process (a Streamlit
+server, an ingestion worker) small and query embedding fast on CPU.
+
+    python onnx_embeddings.py export                  # needs torch + transformers, once
+    python onnx_embeddings.py compare file.pdf ...    # parity and throughput against torch
+
+Select the backend with EMBEDDING_BACKEND=onnx. int8 vectors are close to,
+but not identical with, the torch ones: they are cached under their own key
+(embedding_cache.py), and each index records the backend it was built with
+(create_embeddings.EMBEDDING_INFO_FILE): adding to it with the other backend
+is refused and querying it warns until it is rebuilt.
+"""
+
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Sequence
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from token_budget import EMBEDDING_MODEL, MAX_SEQ_LENGTH
+
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", "onnx_models")
+ONNX_MODEL_FILE = "model-int8.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+# The int8 model must agree with torch at least this well on every chunk
+PARITY_MIN_COSINE = 0.98
+
+
+def onnx_model_path(model_name: str = EMBEDDING_MODEL, model_dir: str = ONNX_MODEL_DIR) -> str:
+    """Directory of the exported model"""
+    return os.path.join(model_dir, model_name.replace('/', '_'))
+
+
+def onnx_available(model_name: str = EMBEDDING_MODEL, model_dir: str = ONNX_MODEL_DIR) -> bool:
+    """onnxruntime is installed and the model has been exported"""
+    import importlib.util
+    path = onnx_model_path(model_name, model_dir)
+    return (importlib.util.find_spec('onnxruntime') is not None
+            and os.path.exists(os.path.join(path, ONNX_MODEL_FILE))
+            and os.path.exists(os.path.join(path, TOKENIZER_FILE)))
+
+
+def export_onnx(model_name: str = EMBEDDING_MODEL, model_dir: str = ONNX_MODEL_DIR) -> str:
+    """Export the transformer to ONNX, quantize it to int8 and save the tokenizer; returns the directory"""
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from transformers import AutoModel, AutoTokenizer
+
+    path = onnx_model_path(model_name, model_dir)
+    os.makedirs(path, exist_ok=True)
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name, use_fast=True)
+    # Truncation and padding as sentence-transformers applies them, stored in the tokenizer file
+    backend = tokenizer.backend_tokenizer
+    backend.enable_truncation(max_length=MAX_SEQ_LENGTH)
+    backend.enable_padding(pad_id=tokenizer.pad_token_id, pad_token=tokenizer.pad_token)
+    backend.save(os.path.join(path, TOKENIZER_FILE))
+
+    model = AutoModel.from_pretrained(model_name).eval()
+    # A padded batch, so the traced graph keeps the attention mask
+    sample = tokenizer(["Ingingo ya 1", "Ingingo ya 2: Icyo iri tegeko rigamije"], padding=True, return_tensors='pt')
+    fp32_path = os.path.join(path, "model.onnx")
+    dynamic = {0: 'batch', 1: 'sequence'}
+    with torch.no_grad():
+        torch.onnx.export(
+            model, (sample['input_ids'], sample['attention_mask']), fp32_path,
+            input_names=['input_ids', 'attention_mask'], output_names=['last_hidden_state'],
+            dynamic_axes={'input_ids': dynamic, 'attention_mask': dynamic, 'last_hidden_state': dynamic},
+            opset_version=14,
+        )
+    quantize_dynamic(fp32_path, os.path.join(path, ONNX_MODEL_FILE), weight_type=QuantType.QInt8)
+    os.remove(fp32_path)
+    return path
+
+
+def mean_pool(hidden: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+    """Mean of the token vectors over the unpadded tokens (the model's pooling layer)"""
+    mask = attention_mask[..., None].astype(np.float32)
+    return (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+
+
+# Loaded sessions and tokenizers, one per model directory for the whole process
+_RUNTIMES: Dict[str, tuple] = {}
+_RUNTIMES_LOCK = threading.Lock()
+
+
+class OnnxEmbeddings(Embeddings):
+    """LangChain Embeddings running the exported int8 model with onnxruntime (loaded on first use)"""
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL, model_dir: str = ONNX_MODEL_DIR):
+        self.model_name = model_name
+        self.path = onnx_model_path(model_name, model_dir)
+
+    def _runtime(self):
+        runtime = _RUNTIMES.get(self.path)
+        if runtime is None:
+            with _RUNTIMES_LOCK:
+                runtime = _RUNTIMES.get(self.path)
+                if runtime is None:
+                    import onnxruntime
+                    from tokenizers import Tokenizer
+
+                    print(f"Loading ONNX embedding model: {self.path}...")
+                    options = onnxruntime.SessionOptions()
+                    # Ingestion workers pin OMP_NUM_THREADS (batch_embedding.py); 0 uses every core
+                    options.intra_op_num_threads = int(os.getenv("OMP_NUM_THREADS", "0"))
+                    session = onnxruntime.InferenceSession(
+                        os.path.join(self.path, ONNX_MODEL_FILE), options, providers=['CPUExecutionProvider']
+                    )
+                    tokenizer = Tokenizer.from_file(os.path.join(self.path, TOKENIZER_FILE))
+                    runtime = _RUNTIMES[self.path] = (session, tokenizer)
+        return runtime
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        session, tokenizer = self._runtime()
+        # Same input as HuggingFaceEmbeddings gives the torch model
+        encodings = tokenizer.encode_batch([text.replace('\n', ' ') for text in texts])
+        input_ids = np.array([encoding.ids for encoding in encodings], dtype=np.int64)
+        attention_mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+        hidden = session.run(None, {'input_ids': input_ids, 'attention_mask': attention_mask})[0]
+        return mean_pool(hidden, attention_mask).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+def cosine_agreement(a, b) -> np.ndarray:
+    """Cosine similarity of each row of a with the same row of b"""
+    a = np.asarray(a, dtype=np.float32)
+    b = np.asarray(b, dtype=np.float32)
+    norms = np.maximum(np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1), 1e-12)
+    return (a * b).sum(axis=1) / norms
+
+
+def compare_backends(texts: Sequence[str], model_name: str = EMBEDDING_MODEL, model_dir: str = ONNX_MODEL_DIR) -> Dict:
+    """Embed texts with the torch and the ONNX int8 backends: cosine agreement and chunks/sec of each"""
+    from batch_embedding import BucketedEmbeddings
+    from create_embeddings import LazyEmbeddings
+
+    report = {'chunks': len(texts)}
+    vectors = {}
+    for name, model in (('torch', LazyEmbeddings(model_name)), ('onnx', OnnxEmbeddings(model_name, model_dir))):
+        model.embed_query(texts[0])  # load outside the timing
+        start = time.perf_counter()
+        vectors[name] = BucketedEmbeddings(model, workers=1).embed_documents(list(texts))
+        report[f'{name}_chunks_per_sec'] = len(texts) / (time.perf_counter() - start)
+
+    cosines = cosine_agreement(vectors['torch'], vectors['onnx'])
+    report['min_cosine'] = float(cosines.min())
+    report['mean_cosine'] = float(cosines.mean())
+    report['parity'] = report['min_cosine'] >= PARITY_MIN_COSINE
+    return report
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == 'export':
+        print(f"Exported int8 model to {export_onnx()}")
+    elif len(sys.argv) > 2 and sys.argv[1] == 'compare':
+        from create_chunks import create_chunks_from_pdf
+
+        texts = [chunk['text'] for path in sys.argv[2:] for chunk in create_chunks_from_pdf(path)]
+        report = compare_backends(texts)
+        print(f"{report['chunks']} chunks: torch {report['torch_chunks_per_sec']:.1f} chunks/sec, "
+              f"onnx int8 {report['onnx_chunks_per_sec']:.1f} chunks/sec "
+              f"({report['onnx_chunks_per_sec'] / report['torch_chunks_per_sec']:.1f}x)")
+        print(f"Cosine agreement: min {report['min_cosine']:.4f}, mean {report['mean_cosine']:.4f} "
+              f"({'ok' if report['parity'] else f'below {PARITY_MIN_COSINE}'})")
+        sys.exit(0 if report['parity'] else 1)
+    else:
+        print("Usage: python onnx_embeddings.py export | compare <pdf_path> [...]")
@@ -0,0 +1,248 @@
+"""
+On-disk cache of parsed PDF pages, column boundaries and column text.
+
+Entries are keyed by the SHA-256 of the PDF bytes plus PARSER_VERSION, so a
+re-run or re-upload of the same file skips PyMuPDF entirely. Each entry is a
+directory of flat little-endian binary arrays (read back with np.memmap) and
+a small JSON manifest:
+
+    coords.f32        (words, 4)   x0, y0, x1, y1
+    ids.i32           (words, 3)   block_no, line_no, word_no
+    words.txt         word strings joined by '\\n' per page (words never contain whitespace)
+    word_bytes.i64    (pages + 1)  byte offsets of each page in words.txt
+    pages.f64         (pages, 4)   width, height, boundary_1, boundary_2 (NaN = no columns)
+    page_words.i64    (pages + 1)  word offsets per page
+    columns.txt       reading-order column texts, utf-8, concatenated
+    column_text.i64   (pages * 3 + 1) byte offsets into columns.txt
+
+The least recently used entries are evicted once the cache directory grows
+past max_bytes.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from parse_pdf import PageWords
+from detect_column import build_columns
+
+# Bump whenever parse_pdf / detect_column change what they produce,
+# so stale entries are ignored instead of served.
+PARSER_VERSION = 3
+
+PAGE_CACHE_DIR = os.getenv("PAGE_CACHE_DIR", "page_cache")
+PAGE_CACHE_MAX_BYTES = int(os.getenv("PAGE_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+COLUMNS_PER_PAGE = 3
+MANIFEST = "manifest.json"
+
+
+def hash_bytes(data) -> str:
+    """SHA-256 of in-memory PDF bytes (bytes, bytearray or memoryview, no copy)"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(pdf_path: str, block_size: int = 1 << 20) -> str:
+    """SHA-256 of a file, read in blocks"""
+    digest = hashlib.sha256()
+    with open(pdf_path, 'rb') as f:
+        while block := f.read(block_size):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class CachedPages:
+    """Read side of one cache entry - arrays are memory-mapped, not loaded"""
+
+    def __init__(self, entry_dir: str, manifest: Dict):
+        self.entry_dir = entry_dir
+        self.page_count = manifest['page_count']
+        self.coords = self._map('coords.f32', np.float32, (-1, 4))
+        self.ids = self._map('ids.i32', np.int32, (-1, 3))
+        self.words_blob = self._map('words.txt', np.uint8)
+        self.pages = self._map('pages.f64', np.float64, (-1, 4))
+        self.page_words = self._map('page_words.i64', np.int64)
+        self.columns_blob = self._map('columns.txt', np.uint8)
+        self.word_bytes = self._map('word_bytes.i64', np.int64)
+        self.column_text = self._map('column_text.i64', np.int64)
+
+    def _map(self, name, dtype, shape=None):
+        path = os.path.join(self.entry_dir, name)
+        if os.path.getsize(path) == 0:
+            array = np.zeros(0, dtype=dtype)
+        else:
+            array = np.memmap(path, dtype=dtype, mode='r')
+        return array.reshape(shape) if shape else array
+
+    def page(self, page_num: int) -> PageWords:
+        start, stop = int(self.page_words[page_num]), int(self.page_words[page_num + 1])
+        width, height = (float(v) for v in self.pages[page_num, :2])
+        byte_start, byte_stop = int(self.word_bytes[page_num]), int(self.word_bytes[page_num + 1])
+        text = self.words_blob[byte_start:byte_stop].tobytes().decode('utf-8').split('\n') if stop > start else []
+        ids = self.ids[start:stop]
+        return PageWords(
+            page_num, width, height, self.coords[start:stop], text,
+            ids[:, 0], ids[:, 1], ids[:, 2]
+        )
+
+    def columns(self, page: PageWords) -> List[Dict]:
+        boundaries = self.pages[page.page_num, 2:]
+        if np.isnan(boundaries).any():
+            return []
+        return build_columns(page, (float(boundaries[0]), float(boundaries[1])))
+
+    def column_texts(self, page_num: int) -> List[str]:
+        offsets = self.column_text[page_num * COLUMNS_PER_PAGE:(page_num + 1) * COLUMNS_PER_PAGE + 1]
+        if np.isnan(self.pages[page_num, 2]):
+            return []
+        return [
+            self.columns_blob[offsets[i]:offsets[i + 1]].tobytes().decode('utf-8')
+            for i in range(COLUMNS_PER_PAGE)
+        ]
+
+
+class PageCacheWriter:
+    """Appends pages in order to a temporary entry, published when the last page arrives"""
+
+    def __init__(self, cache: 'PageCache', key: str, page_count: int):
+        self.cache = cache
+        self.key = key
+        self.page_count = page_count
+        self.next_page = 0
+        self.tmp_dir = os.path.join(cache.cache_dir, f".tmp-{key}-{os.getpid()}")
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        self._files = {
+            name: open(os.path.join(self.tmp_dir, name), 'wb')
+            for name in ('coords.f32', 'ids.i32', 'words.txt', 'pages.f64', 'columns.txt')
+        }
+        self._page_words = [0]
+        self._word_bytes = [0]
+        self._column_text = [0]
+
+    def add(self, page: PageWords, columns: List[Dict], column_texts: List[str]) -> bool:
+        """Record the next page; returns False (and gives up) if pages arrive out of order"""
+        if page.page_num != self.next_page:
+            self.abort()
+            return False
+
+        f = self._files
+        f['coords.f32'].write(np.ascontiguousarray(page.coords, dtype='<f4').tobytes())
+        ids = np.stack([page.block_no, page.line_no, page.word_no], axis=1)
+        f['ids.i32'].write(np.ascontiguousarray(ids, dtype='<i4').tobytes())
+        words = '\n'.join(page.text).encode('utf-8')
+        f['words.txt'].write(words)
+
+        if columns:
+            boundary_1, boundary_2 = columns[1]['x0'], columns[2]['x0']
+        else:
+            boundary_1 = boundary_2 = np.nan
+        f['pages.f64'].write(np.array([page.width, page.height, boundary_1, boundary_2], dtype='<f8').tobytes())
+
+        texts = column_texts if columns else [''] * COLUMNS_PER_PAGE
+        for text in texts:
+            encoded = text.encode('utf-8')
+            f['columns.txt'].write(encoded)
+            self._column_text.append(self._column_text[-1] + len(encoded))
+
+        self._page_words.append(self._page_words[-1] + len(page))
+        self._word_bytes.append(self._word_bytes[-1] + len(words))
+        self.next_page += 1
+
+        if self.next_page == self.page_count:
+            self._publish()
+        return True
+
+    def _publish(self):
+        for handle in self._files.values():
+            handle.close()
+        np.array(self._page_words, dtype='<i8').tofile(os.path.join(self.tmp_dir, 'page_words.i64'))
+        np.array(self._word_bytes, dtype='<i8').tofile(os.path.join(self.tmp_dir, 'word_bytes.i64'))
+        np.array(self._column_text, dtype='<i8').tofile(os.path.join(self.tmp_dir, 'column_text.i64'))
+        with open(os.path.join(self.tmp_dir, MANIFEST), 'w') as f:
+            json.dump({
+                'parser_version': PARSER_VERSION,
+                'page_count': self.page_count,
+                'created': time.time(),
+            }, f)
+
+        entry_dir = self.cache.entry_dir(self.key)
+        try:
+            os.replace(self.tmp_dir, entry_dir)
+        except OSError:
+            # Another process published the same document first
+            shutil.rmtree(self.tmp_dir, ignore_errors=True)
+        self.cache.evict()
+
+    def abort(self):
+        for handle in self._files.values():
+            handle.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+
+class PageCache:
+    """Content-hash keyed cache directory with size-based LRU eviction"""
+
+    def __init__(self, cache_dir: str = PAGE_CACHE_DIR, max_bytes: int = PAGE_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def key(content_hash: str) -> str:
+        return f"{content_hash}-v{PARSER_VERSION}"
+
+    def entry_dir(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def get(self, content_hash: str) -> Optional[CachedPages]:
+        """Open the entry for this content hash, or None on a miss"""
+        entry_dir = self.entry_dir(self.key(content_hash))
+        manifest_path = os.path.join(entry_dir, MANIFEST)
+        try:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            cached = CachedPages(entry_dir, manifest)
+        except (OSError, ValueError, KeyError):
+            return None
+        # Mark as recently used for eviction
+        os.utime(manifest_path)
+        return cached
+
+    def writer(self, content_hash: str, page_count: int) -> PageCacheWriter:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        return PageCacheWriter(self, self.key(content_hash), page_count)
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            entry_dir = os.path.join(self.cache_dir, name)
+            manifest_path = os.path.join(entry_dir, MANIFEST)
+            if name.startswith('.') or not os.path.exists(manifest_path):
+                continue
+            size = sum(entry.stat().st_size for entry in os.scandir(entry_dir))
+            entries.append((os.path.getmtime(manifest_path), size, entry_dir))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry_dir in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total -= size
+
+
+_default_cache = None
+
+
+def default_page_cache() -> Optional[PageCache]:
+    """Cache configured by PAGE_CACHE_DIR / PAGE_CACHE_MAX_BYTES (empty dir disables it)"""
+    global _default_cache
+    if not PAGE_CACHE_DIR:
+        return None
+    if _default_cache is None:
+        _default_cache = PageCache()
+    return _default_cache
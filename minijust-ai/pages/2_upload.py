@@ -2,6 +2,7 @@ import streamlit as st
 import os
 import json
 import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from utils import process_and_store_document, delete_document_from_store
 
@@ -61,6 +62,18 @@ def get_doc_id(filepath):
     """Generate unique document ID from filepath"""
     return hashlib.md5(filepath.encode()).hexdigest()[:12]
 
+def save_upload(path, buffer):
+    """Persist the original upload (runs in the background while it is processed);
+    a failed write removes the partial file and raises"""
+    os.makedirs("data", exist_ok=True)
+    try:
+        with open(path, "wb") as f:
+            f.write(buffer)
+    except Exception:
+        if os.path.isfile(path):
+            os.remove(path)
+        raise
+
 # Basic ingestion metadata (used for filtering later)
 doc_type = st.selectbox("Document type", options=["Legislation", "Case Law", "Other"], index=0)
 jurisdiction = st.text_input("Jurisdiction (optional)", value="Rwanda")
@@ -85,10 +98,11 @@ if uploaded_file is not None:
         except Exception as e:
             st.warning(f"Could not remove old version: {e}")
     
-    # Save file
-    os.makedirs("data", exist_ok=True)
-    with open(save_path, "wb") as f:
-        f.write(uploaded_file.getbuffer())
+    # Save the file in the background - ingestion reads straight from the upload buffer.
+    # The future keeps the write's exception for the check below.
+    file_buffer = uploaded_file.getbuffer()
+    save_pool = ThreadPoolExecutor(max_workers=1)
+    save_future = save_pool.submit(save_upload, save_path, file_buffer)
 
     st.info(f"📄 Processing {uploaded_file.name}...")
     
@@ -107,6 +121,7 @@ if uploaded_file is not None:
                 save_path,
                 uploaded_file.name,
                 doc_type=doc_type,
+                data=file_buffer,
                 extra_metadata={
                     "doc_id": doc_id,
                     "jurisdiction": jurisdiction.strip(),
@@ -117,6 +132,16 @@ if uploaded_file is not None:
             
             status.update(label="✅ Processing complete!", state="complete", expanded=False)
         
+        # Only a document whose original is on disk is registered; otherwise take it
+        # back out of the index so delete / re-upload never meet a missing file
+        save_error = save_future.exception()
+        if save_error is not None:
+            try:
+                delete_document_from_store(uploaded_file.name)
+            except Exception as e:
+                st.warning(f"Could not remove {uploaded_file.name} from the index: {e}")
+            raise RuntimeError(f"Could not save {uploaded_file.name} to {save_path}: {save_error}")
+        
         # Update registry with document metadata
         registry[uploaded_file.name] = {
             "doc_id": doc_id,
@@ -165,6 +190,9 @@ if uploaded_file is not None:
         3. Ensure the `faiss_index` directory has write permissions
         4. For large PDFs, processing may take a few minutes
         """)
+    finally:
+        # Wait for the write whether or not processing succeeded
+        save_pool.shutdown(wait=True)
 
 # Show existing documents
 st.divider()
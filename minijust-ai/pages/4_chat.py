@@ -3,7 +3,7 @@ import os
 import json
 from typing import List, Dict
 from dotenv import load_dotenv
-from utils import load_vector_store, search_documents
+from utils import load_vector_store, lookup_article_chunks, search_documents
 from groq import Groq
 
 load_dotenv()
@@ -114,20 +114,31 @@ def retrieve_chunks(search_terms: str, selected_files: List[str] = None, top_k:
     documents = search_documents(search_terms, k=top_k, filter_dict=filter_dict)
     
     # Convert to chunk format
-    chunks = []
-    for doc in documents:
-        chunks.append({
-            "text": doc.page_content,
-            "source_file": doc.metadata.get("source_file", "Unknown"),
-            "doc_type": doc.metadata.get("doc_type", "Unknown"),
-            "language": doc.metadata.get("language", "en"),
-            "page": doc.metadata.get("page", 0),
-            "article_number": doc.metadata.get("article_number", ""),
-            "unit_header": doc.metadata.get("article_title", ""),
-            "distance": 0.0,  # FAISS uses similarity, not distance in our abstraction
-        })
-    
-    return chunks
+    return [document_to_chunk(doc) for doc in documents]
+
+
+def retrieve_article_chunks(user_question: str, selected_files: List[str] = None) -> List[Dict]:
+    """
+    Exact-article shortcut: chunks of the articles the question names
+    ("Ingingo ya 91", "Article 12"), looked up in the article index.
+    Empty when the question names no indexed article.
+    """
+    documents = lookup_article_chunks(user_question, selected_files or None, vector_store=vector_store)
+    return [document_to_chunk(doc) for doc in documents]
+
+
+def document_to_chunk(doc) -> Dict:
+    """Chunk dict used by the prompt and the sources list"""
+    return {
+        "text": doc.page_content,
+        "source_file": doc.metadata.get("source_file", "Unknown"),
+        "doc_type": doc.metadata.get("doc_type", "Unknown"),
+        "language": doc.metadata.get("language", "en"),
+        "page": doc.metadata.get("page", 0),
+        "article_number": doc.metadata.get("article_number", ""),
+        "unit_header": doc.metadata.get("article_title", ""),
+        "distance": 0.0,  # FAISS uses similarity, not distance in our abstraction
+    }
 
 
 def format_retrieved_data(chunks: List[Dict]) -> str:
@@ -216,7 +227,8 @@ Provide a complete answer with the actual legal content, not just references to
 st.title("🏛️ Legal Document Chat")
 st.write("Ask questions about your indexed Rwandan legal documents")
 
-# Check if FAISS index exists
+# Check if FAISS index exists (the loaded index and embedding model are shared
+# by all sessions of the process; see store_registry.py)
 vector_store = load_vector_store()
 if not vector_store:
     st.warning("⚠️ No documents indexed yet. Please upload documents in the **Upload** page first.")
@@ -265,20 +277,25 @@ if prompt := st.chat_input("Ask a legal question..."):
                 # Initialize Groq client
                 groq_client = get_groq_client()
                 
-                # Phase 1: Scout - Extract search terms
                 with st.status("Processing your question...", expanded=True) as status:
-                    st.write("🔎 Phase 1: Identifying relevant legal categories...")
-                    search_terms = scout_phase(prompt, groq_client)
-                    st.write(f"**Search terms identified**: {search_terms}")
-                    
-                    # Phase 2: Retrieve relevant chunks from FAISS
-                    st.write("📚 Phase 2: Retrieving relevant documents from FAISS index...")
-                    chunks = retrieve_chunks(
-                        search_terms, 
-                        st.session_state.selected_files,
-                        top_k=5
-                    )
-                    st.write(f"**Retrieved**: {len(chunks)} document chunks")
+                    # Questions naming an article are answered from the article index
+                    chunks = retrieve_article_chunks(prompt, st.session_state.selected_files)
+                    if chunks:
+                        st.write(f"📑 Article reference found - {len(chunks)} chunks read from the article index")
+                    else:
+                        # Phase 1: Scout - Extract search terms
+                        st.write("🔎 Phase 1: Identifying relevant legal categories...")
+                        search_terms = scout_phase(prompt, groq_client)
+                        st.write(f"**Search terms identified**: {search_terms}")
+                        
+                        # Phase 2: Retrieve relevant chunks from FAISS
+                        st.write("📚 Phase 2: Retrieving relevant documents from FAISS index...")
+                        chunks = retrieve_chunks(
+                            search_terms, 
+                            st.session_state.selected_files,
+                            top_k=5
+                        )
+                        st.write(f"**Retrieved**: {len(chunks)} document chunks")
                     
                     # Phase 3: Generate answer
                     st.write("💡 Phase 3: Generating answer with Groq LLM...")
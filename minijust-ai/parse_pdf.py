@@ -1,35 +1,214 @@
 """
 Parse PDF → words with coordinates per page.
+
+Each page is returned as a compact PageWords object: word coordinates live in
+one float32 array, word strings in a separate table, and PyMuPDF's
+block/line/word numbers are kept alongside. page['words'] still gives the old
+list-of-dicts view for scripts that expect it.
 """
 import fitz  # PyMuPDF
+import numpy as np
 
 
-def parse_pdf_words(pdf_path):
-   
-    doc = fitz.open(pdf_path)
-    pages_data = []
-    
-    for page_num in range(len(doc)):
-        page = doc.load_page(page_num)
-        words = page.get_text("words")
-        
-        page_data = {
-            'page_num': page_num,
-            'width': page.rect.width,
-            'height': page.rect.height,
-            'words': [
-                {
-                    'text': w[4],
-                    'x0': w[0],
-                    'y0': w[1],
-                    'x1': w[2],
-                    'y1': w[3],
-                    'bbox': (w[0], w[1], w[2], w[3])
-                }
-                for w in words
-            ]
+class WordsView:
+    """Read-only sequence of word dicts backed by a PageWords object"""
+
+    __slots__ = ('page',)
+
+    def __init__(self, page):
+        self.page = page
+
+    def __len__(self):
+        return len(self.page)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.page.word(i) for i in range(*index.indices(len(self.page)))]
+        if index < 0:
+            index += len(self.page)
+        if not 0 <= index < len(self.page):
+            raise IndexError('word index out of range')
+        return self.page.word(index)
+
+    def __iter__(self):
+        for i in range(len(self.page)):
+            yield self.page.word(i)
+
+
+class PageWords:
+    """Words of one PDF page stored as arrays instead of one dict per word"""
+
+    __slots__ = ('page_num', 'width', 'height', 'coords', 'text', 'block_no', 'line_no', 'word_no')
+
+    def __init__(self, page_num, width, height, coords, text, block_no, line_no, word_no):
+        self.page_num = page_num
+        self.width = width
+        self.height = height
+        self.coords = coords        # float32 array, shape (n, 4): x0, y0, x1, y1
+        self.text = text            # list of word strings, same order as coords
+        self.block_no = block_no    # int32 arrays from page.get_text("words")
+        self.line_no = line_no
+        self.word_no = word_no
+
+    @classmethod
+    def from_fitz_words(cls, page_num, width, height, words):
+        """Build from the tuples returned by page.get_text("words")"""
+        n = len(words)
+        coords = np.array([w[:4] for w in words], dtype=np.float32).reshape(n, 4)
+        ids = np.array([w[5:8] for w in words], dtype=np.int32).reshape(n, 3)
+        return cls(
+            page_num, width, height, coords, [w[4] for w in words],
+            ids[:, 0].copy(), ids[:, 1].copy(), ids[:, 2].copy()
+        )
+
+    @classmethod
+    def from_word_dicts(cls, words, page_num=0, width=0.0, height=0.0):
+        """Build from the legacy list of word dicts (text, x0, y0, x1, y1)"""
+        n = len(words)
+        coords = np.array([(w['x0'], w['y0'], w['x1'], w['y1']) for w in words], dtype=np.float32).reshape(n, 4)
+        ids = np.array(
+            [(w.get('block_no', 0), w.get('line_no', i), w.get('word_no', 0)) for i, w in enumerate(words)],
+            dtype=np.int32
+        ).reshape(n, 3)
+        return cls(
+            page_num, width, height, coords, [w['text'] for w in words],
+            ids[:, 0].copy(), ids[:, 1].copy(), ids[:, 2].copy()
+        )
+
+    def __len__(self):
+        return len(self.text)
+
+    @property
+    def x0(self):
+        return self.coords[:, 0]
+
+    @property
+    def y0(self):
+        return self.coords[:, 1]
+
+    @property
+    def x1(self):
+        return self.coords[:, 2]
+
+    @property
+    def y1(self):
+        return self.coords[:, 3]
+
+    def centers(self):
+        """Horizontal center of every word"""
+        return (self.coords[:, 0] + self.coords[:, 2]) / 2
+
+    def take(self, indices):
+        """New PageWords holding only the words at the given indices (in that order)"""
+        indices = np.asarray(indices, dtype=np.intp)
+        return PageWords(
+            self.page_num, self.width, self.height,
+            self.coords[indices], [self.text[i] for i in indices],
+            self.block_no[indices], self.line_no[indices], self.word_no[indices]
+        )
+
+    def word(self, i):
+        """Legacy dict for a single word"""
+        x0, y0, x1, y1 = (float(v) for v in self.coords[i])
+        return {
+            'text': self.text[i],
+            'x0': x0,
+            'y0': y0,
+            'x1': x1,
+            'y1': y1,
+            'bbox': (x0, y0, x1, y1),
+            'block_no': int(self.block_no[i]),
+            'line_no': int(self.line_no[i]),
+            'word_no': int(self.word_no[i]),
         }
-        pages_data.append(page_data)
-    
-    doc.close()
-    return pages_data
\ No newline at end of file
+
+    @property
+    def words(self):
+        return WordsView(self)
+
+    # Mapping-style access so page['page_num'], page['words'] etc. keep working
+    def __getitem__(self, key):
+        if key in ('page_num', 'width', 'height', 'words'):
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in ('page_num', 'width', 'height', 'words')
+
+
+def as_page_words(words):
+    """Accept a PageWords, a WordsView or a legacy list of word dicts"""
+    if isinstance(words, PageWords):
+        return words
+    if isinstance(words, WordsView):
+        return words.page
+    return PageWords.from_word_dicts(list(words))
+
+
+def open_pdf(source):
+    """Open a PDF from a path, or zero-copy from in-memory bytes / memoryview"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return fitz.open(stream=source, filetype="pdf")
+    return fitz.open(source)
+
+
+def split_page_ranges(start, stop, size):
+    """Split [start, stop) into consecutive (start, stop) ranges of at most size pages"""
+    return [(a, min(a + size, stop)) for a in range(start, stop, size)]
+
+
+def extract_page_range(source, start, stop):
+    """Open the PDF (path or bytes) and parse pages [start, stop) - runs inside pool workers"""
+
+    doc = open_pdf(source)
+    try:
+        pages = []
+        for page_num in range(start, min(stop, len(doc))):
+            page = doc.load_page(page_num)
+            pages.append(PageWords.from_fitz_words(page_num, page.rect.width, page.rect.height, page.get_text("words")))
+        return pages
+    finally:
+        doc.close()
+
+
+def iter_pdf_pages(source, start=0, stop=None):
+    """Yield one PageWords at a time so only the current page is held in memory.
+    Only pages [start, stop) are loaded."""
+
+    doc = open_pdf(source)
+    try:
+        stop = len(doc) if stop is None else min(stop, len(doc))
+        for page_num in range(start, stop):
+            page = doc.load_page(page_num)
+            words = page.get_text("words")
+
+            yield PageWords.from_fitz_words(page_num, page.rect.width, page.rect.height, words)
+    finally:
+        doc.close()
+
+
+def parse_pdf_words(pdf_path, workers=1, pages_per_task=8, start=0, stop=None):
+    """
+    Pages [start, stop) as a list (all pages by default) - use iter_pdf_pages for
+    large documents. pdf_path may also be the PDF bytes (or a memoryview of them).
+
+    With workers > 1 the page ranges are split across a process pool; each
+    worker opens its own fitz document and results come back in page order.
+    """
+    if workers <= 1:
+        return list(iter_pdf_pages(pdf_path, start, stop))
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with open_pdf(pdf_path) as doc:
+        stop = len(doc) if stop is None else min(stop, len(doc))
+
+    if isinstance(pdf_path, memoryview):
+        pdf_path = pdf_path.tobytes()  # memoryviews cannot be pickled to the workers
+
+    ranges = split_page_ranges(start, stop, pages_per_task)
+    pages_data = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for pages in pool.map(extract_page_range, [pdf_path] * len(ranges), *zip(*ranges)):
+            pages_data.extend(pages)
+    return pages_data
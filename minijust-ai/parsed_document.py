@@ -0,0 +1,304 @@
+"""
+ParsedDocument - one parse of a PDF shared by every pipeline stage.
+
+Pages, column layouts, reading-order column text and page languages are
+computed the first time they are asked for and memoized, so chunking, language
+detection and the CLIs never open and extract the same PDF twice.
+
+With workers > 1, extraction and layout analysis (columns + reading order)
+run in a process pool over fixed page ranges, a few ranges ahead of the reader,
+so chunking the current pages overlaps with parsing the next ones.
+
+Column boundaries come from a layout template picked once from the first pages
+(detect_column.detect_layout_template) and reused on every page that passes
+the drift check, so serial and pooled runs split pages identically.
+
+Results are also written to the on-disk page cache (page_cache.py); opening
+the same PDF content again reads pages, columns and column text from there
+without touching PyMuPDF.
+"""
+
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional
+
+from parse_pdf import PageWords, extract_page_range, open_pdf
+from detect_column import (
+    TEMPLATE_SAMPLE_PAGES, detect_columns, detect_layout_template, reconstruct_text_reading_order
+)
+from detect_language import PROFILE_MAX_PAGES, detect_language, profile_column_languages
+from page_cache import default_page_cache, hash_bytes, hash_file
+
+# PDF source and layout template of the current pool worker, set once by the
+# pool initializer so in-memory uploads are not re-sent with every page range
+_worker_source = None
+_worker_template = None
+
+
+def _init_worker(source, template=None):
+    global _worker_source, _worker_template
+    _worker_source = source
+    _worker_template = template
+
+
+def _analyze_page_range(start: int, stop: int) -> List[Dict]:
+    """Pool worker: words, columns and column text for pages [start, stop)"""
+    entries = []
+    for page in extract_page_range(_worker_source, start, stop):
+        columns = detect_columns(page, _worker_template)
+        entries.append({
+            'words': page,
+            'columns': columns,
+            'column_texts': [reconstruct_text_reading_order(col) for col in columns],
+        })
+    return entries
+
+
+class ParsedDocument:
+    """Lazily parsed PDF with memoized per-page results"""
+
+    def __init__(self, pdf_path: str, max_cached_pages: Optional[int] = None,
+                 workers: int = 1, pages_per_task: int = 8, cache=True, data=None):
+        """
+        Args:
+            pdf_path: Path of the PDF to parse (only used as a name when data is given)
+            max_cached_pages: Keep results for at most this many pages (least recently
+                used are dropped). None keeps every page, which suits small documents
+                and interactive use; streaming ingestion passes a small number so
+                memory depends on page size rather than document length.
+            workers: Number of worker processes for page extraction and layout
+                analysis. 1 keeps everything in this process.
+            pages_per_task: Pages handed to a worker at a time
+            cache: True for the default on-disk page cache, False/None to disable
+                it, or a PageCache instance
+            data: PDF content already in memory (bytes or memoryview, e.g. an
+                upload buffer). It is opened with fitz.open(stream=...) and hashed
+                in place, so the file never has to be written and read back.
+        """
+        self.pdf_path = pdf_path
+        self._source = data if data is not None else pdf_path
+        self.workers = workers
+        self.pages_per_task = pages_per_task
+        self._pages = OrderedDict()  # page_num -> dict of memoized results
+        self._pool = None
+        self._pending = {}  # page range index -> Future from the pool
+        self._doc = None
+        self._cached = None
+        self._writer = None
+        self._template = None
+        self._template_ready = False
+        self._column_languages = None
+        
+        if cache is True:
+            cache = default_page_cache()
+        if not cache:
+            self.content_hash = None
+        elif data is not None:
+            self.content_hash = hash_bytes(data)
+        else:
+            self.content_hash = hash_file(pdf_path)
+        if cache:
+            self._cached = cache.get(self.content_hash)
+        
+        if self._cached is not None:
+            self._page_count = self._cached.page_count
+        else:
+            self._doc = open_pdf(self._source)
+            self._page_count = len(self._doc)
+            if cache and self._page_count:
+                self._writer = cache.writer(self.content_hash, self._page_count)
+        
+        # A whole page range is stored at once, so it must fit in the cache
+        if max_cached_pages is not None and workers > 1:
+            max_cached_pages = max(max_cached_pages, pages_per_task)
+        self.max_cached_pages = max_cached_pages
+
+    @property
+    def page_count(self) -> int:
+        return self._page_count
+
+    @property
+    def from_cache(self) -> bool:
+        """True when pages are served from the on-disk cache instead of PyMuPDF"""
+        return self._cached is not None
+
+    @property
+    def layout_template(self) -> Optional[Dict]:
+        """Column boundaries shared by this document's pages, or None"""
+        if not self._template_ready:
+            if self._doc is not None:
+                self._template = detect_layout_template(self._sample_pages())
+            self._template_ready = True
+        return self._template
+
+    def _sample_pages(self) -> Iterator[PageWords]:
+        """First pages of the document, memoized for the reads that follow (they reach
+        the cache writer when they are read, once the template is known)"""
+        for page_num in range(min(TEMPLATE_SAMPLE_PAGES, self.page_count)):
+            yield self._entry(page_num, record=False)['words']
+
+    def __len__(self):
+        return self.page_count
+
+    def _entry(self, page_num: int, record: bool = True) -> Dict:
+        """Memoized results of one page; record=False parses it serially without
+        passing it to the cache writer yet (layout template samples)"""
+        entry = self._pages.get(page_num)
+        if entry is not None:
+            self._pages.move_to_end(page_num)
+            if record and entry.pop('unrecorded', False):
+                self._record(entry)
+            return entry
+
+        if self._cached is not None:
+            page = self._cached.page(page_num)
+            entry = {
+                'words': page,
+                'columns': self._cached.columns(page),
+                'column_texts': self._cached.column_texts(page_num),
+            }
+            self._store(page_num, entry)
+            return entry
+
+        if self.workers > 1 and record:
+            self._load_from_pool(page_num)
+            return self._pages[page_num]
+
+        page = self._doc.load_page(page_num)
+        entry = {'words': PageWords.from_fitz_words(page_num, page.rect.width, page.rect.height, page.get_text("words"))}
+        self._store(page_num, entry)
+        if record:
+            self._record(entry)
+        else:
+            entry['unrecorded'] = True
+        return entry
+
+    def _record(self, entry: Dict):
+        """Pass a freshly parsed page to the cache writer (pages must arrive in order)"""
+        if self._writer is None:
+            return
+        if 'columns' not in entry:
+            entry['columns'] = detect_columns(entry['words'], self.layout_template)
+        if 'column_texts' not in entry:
+            entry['column_texts'] = [reconstruct_text_reading_order(col) for col in entry['columns']]
+        if not self._writer.add(entry['words'], entry['columns'], entry['column_texts']):
+            self._writer = None
+        elif self._writer.next_page == self._page_count:
+            self._writer = None
+
+    def _store(self, page_num: int, entry: Dict):
+        self._pages[page_num] = entry
+        if self.max_cached_pages is not None:
+            while len(self._pages) > self.max_cached_pages:
+                self._pages.popitem(last=False)
+
+    def _load_from_pool(self, page_num: int):
+        """Wait for the page range holding page_num, keeping the next ranges in flight"""
+        if self._pool is None:
+            from concurrent.futures import ProcessPoolExecutor
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_worker,
+                initargs=(self._source, self.layout_template)
+            )
+
+        size = self.pages_per_task
+        first = page_num // size
+        last = min(first + self.workers, -(-self.page_count // size))
+        for index in range(first, last):
+            if index not in self._pending:
+                start, stop = index * size, min((index + 1) * size, self.page_count)
+                self._pending[index] = self._pool.submit(_analyze_page_range, start, stop)
+
+        for entry in self._pending.pop(first).result():
+            stored = self._pages.get(entry['words'].page_num)
+            if stored is None or stored.get('unrecorded'):
+                self._store(entry['words'].page_num, entry)
+                self._record(entry)
+
+    def page(self, page_num: int) -> PageWords:
+        """Words of one page"""
+        return self._entry(page_num)['words']
+
+    def pages(self, start: int = 0, stop: Optional[int] = None) -> Iterator[PageWords]:
+        """Iterate pages in order"""
+        stop = self.page_count if stop is None else min(stop, self.page_count)
+        for page_num in range(start, stop):
+            yield self.page(page_num)
+
+    def columns(self, page_num: int) -> List[Dict]:
+        """Column layout of one page (see detect_column.detect_columns)"""
+        entry = self._entry(page_num)
+        if 'columns' not in entry:
+            entry['columns'] = detect_columns(entry['words'], self.layout_template)
+        return entry['columns']
+
+    def column_texts(self, page_num: int) -> List[str]:
+        """Reading-order text of each column of one page"""
+        entry = self._entry(page_num)
+        if 'column_texts' not in entry:
+            entry['column_texts'] = [reconstruct_text_reading_order(col) for col in self.columns(page_num)]
+        return entry['column_texts']
+
+    def page_text(self, page_num: int) -> str:
+        """Reading-order text of the whole page, one line per text line (single-column documents)"""
+        entry = self._entry(page_num)
+        if 'page_text' not in entry:
+            entry['page_text'] = reconstruct_text_reading_order({'words': entry['words']})
+        return entry['page_text']
+
+    def page_info(self, page_num: int) -> Dict:
+        """Same shape as the entries yielded by detect_column.iter_columns_all_pages"""
+        page = self.page(page_num)
+        columns = self.columns(page_num)
+        return {
+            'page_num': page_num,
+            'width': page.width,
+            'height': page.height,
+            'num_columns': len(columns),
+            'columns': columns
+        }
+
+    def languages(self, page_num: int) -> List[str]:
+        """Languages detected on one page (see detect_language.detect_language)"""
+        entry = self._entry(page_num)
+        if 'languages' not in entry:
+            entry['languages'] = detect_language(entry['words'])
+        return entry['languages']
+
+    @property
+    def column_languages(self) -> List[Optional[str]]:
+        """
+        Language of each column position, profiled once from the first pages
+        (see detect_language.profile_column_languages); None where a column never
+        had text. Verifies or corrects the positional rw/en/fr assignment.
+        """
+        if self._column_languages is None:
+            # Keep every profiled page, so the chunking pass that follows reuses
+            # them instead of parsing (and re-recording) the first pages again
+            max_cached_pages = self.max_cached_pages
+            if max_cached_pages is not None:
+                self.max_cached_pages = max(max_cached_pages, PROFILE_MAX_PAGES)
+            try:
+                self._column_languages = profile_column_languages(
+                    self.column_texts(page_num) for page_num in range(min(self.page_count, PROFILE_MAX_PAGES))
+                )
+            finally:
+                self.max_cached_pages = max_cached_pages
+        return self._column_languages
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+            self._pending.clear()
+        if self._writer is not None:
+            self._writer.abort()
+            self._writer = None
+        self._pages.clear()
+        if self._doc is not None:
+            self._doc.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
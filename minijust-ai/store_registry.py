@@ -0,0 +1,89 @@
+"""
+Process-wide registry of loaded vector stores.
+
+Loading a FAISS index (and the embedding model behind it) takes seconds, so
+it is done once per process and shared by every query and every Streamlit
+session. Each store directory is keyed by the version of its files on disk
+(mtime and size of index.faiss, index.pkl, the article index and the
+document metadata); a lookup costs a few stat calls and the store is only
+reloaded after another writer (an upload, a deletion, another process) has
+changed it.
+
+Shared stores are read-only: code that modifies a store loads its own copy,
+saves it, and calls invalidate() so the next lookup picks up the new files.
+"""
+
+import os
+import threading
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+from article_index import ARTICLE_INDEX_FILE
+from chunk_record import DOCUMENT_METADATA_FILE
+
+STORE_FILES = ("index.faiss", "index.pkl", ARTICLE_INDEX_FILE, DOCUMENT_METADATA_FILE)
+# A load that races a writer (files changed while reading) is retried this many times
+LOAD_ATTEMPTS = 3
+
+
+def store_version(path: str, files: Sequence[str] = STORE_FILES) -> Optional[Tuple]:
+    """(mtime_ns, size) of each store file, or None when the index itself is missing"""
+    version = []
+    for name in files:
+        try:
+            stat = os.stat(os.path.join(path, name))
+            version.append((stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            version.append(None)
+    return tuple(version) if version[0] is not None else None
+
+
+class StoreRegistry:
+    """Loaded objects per store directory, reloaded when the directory's files change"""
+
+    def __init__(self, loader: Callable[[str], object], files: Sequence[str] = STORE_FILES):
+        self.loader = loader
+        self.files = tuple(files)
+        self.loads = 0
+        self._entries: Dict[str, Tuple[Tuple, object]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _path_lock(self, path: str) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(path, threading.Lock())
+
+    def get(self, path: str):
+        """The loaded store at path (None when there is none); shared, do not modify"""
+        path = os.path.abspath(path)
+        version = store_version(path, self.files)
+        entry = self._entries.get(path)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+
+        # One thread loads; the others wait and reuse its result
+        with self._path_lock(path):
+            for _ in range(LOAD_ATTEMPTS):
+                version = store_version(path, self.files)
+                entry = self._entries.get(path)
+                if entry is not None and entry[0] == version:
+                    return entry[1]
+                if version is None:
+                    self._entries.pop(path, None)
+                    return None
+                loaded = self.loader(path)
+                self.loads += 1
+                if loaded is None:
+                    return None
+                if store_version(path, self.files) == version:
+                    self._entries[path] = (version, loaded)
+                    return loaded
+            # Still being rewritten: serve this copy without caching it
+            return loaded
+
+    def invalidate(self, path: Optional[str] = None):
+        """Forget the store at path (every store when path is None)"""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(os.path.abspath(path), None)
@@ -0,0 +1,83 @@
+"""
+Test the persistent article index used for exact-article questions
+"""
+
+import tempfile
+
+from article_groups import align_article_groups, split_canonical
+from article_index import ArticleIndex, preferred_versions
+
+
+def make_chunk(chunk_id, number, language, page_start, page_end=None, source_file='order.pdf'):
+    return {
+        'chunk_id': chunk_id,
+        'metadata': {
+            'source_file': source_file,
+            'language': language,
+            'article_number': number,
+            'page': page_start,
+            'page_start': page_start,
+            'page_end': page_start if page_end is None else page_end,
+            'column': {'rw': 0, 'en': 1, 'fr': 2}[language],
+        }
+    }
+
+
+def test_lookup_round_trip():
+    """Sub-chunks of one article share an entry; lookups survive a save / load"""
+    with tempfile.TemporaryDirectory() as store:
+        index = ArticleIndex.load(store)
+        index.add_chunks([
+            make_chunk('a_p3_col0_art12_sub0', '12', 'rw', 3, 4),
+            make_chunk('a_p3_col0_art12_sub1', '12', 'rw', 3, 4),
+            make_chunk('a_p3_col1_art12', '12', 'en', 3),
+            make_chunk('b_p1_col0_art12', '12', 'rw', 1, source_file='law.pdf'),
+            {'chunk_id': 'a_p0_col0_chunk0', 'metadata': {'source_file': 'order.pdf', 'article_number': None}},
+        ])
+        index.save()
+
+        index = ArticleIndex.load(store)
+        rw = index.lookup('12', 'rw', ['order.pdf'])
+        assert len(rw) == 1
+        assert rw[0]['chunk_ids'] == ['a_p3_col0_art12_sub0', 'a_p3_col0_art12_sub1']
+        assert (rw[0]['page_start'], rw[0]['page_end']) == (3, 4)
+        assert len(index.lookup('12')) == 3
+        assert index.lookup('13') == []
+
+        versions = preferred_versions(index.lookup('12'))
+        assert [(e['source_file'], e['language']) for e in versions] == [('order.pdf', 'en'), ('law.pdf', 'rw')]
+
+        assert index.remove_source('order.pdf') == 2
+        assert [e['source_file'] for e in index.lookup('12')] == ['law.pdf']
+
+    print("✅ Article index lookups")
+
+
+def test_article_groups():
+    """The rw/en/fr versions of an article form one group with one embedded version"""
+    chunks = [
+        make_chunk('a_p3_col0_art12_sub0', '12', 'rw', 3, 4),
+        make_chunk('a_p3_col0_art12_sub1', '12', 'rw', 3, 4),
+        make_chunk('a_p3_col1_art12', '12', 'en', 3),
+        make_chunk('a_p4_col2_art12', '12', 'fr', 4),
+        make_chunk('a_p9_col1_art12', '12', 'en', 9),  # same number, far away: not a sibling
+        {'chunk_id': 'a_p0_col0_chunk0', 'text': '', 'metadata': {'article_number': None}},
+    ]
+    assert align_article_groups(chunks) == 1
+
+    group = {c['chunk_id'] for c in chunks if c['metadata'].get('article_group') == 'a_p3_art12_grp'}
+    assert group == {'a_p3_col0_art12_sub0', 'a_p3_col0_art12_sub1', 'a_p3_col1_art12', 'a_p4_col2_art12'}
+    assert chunks[2]['metadata']['sibling_chunk_ids'] == ['a_p3_col0_art12_sub0', 'a_p3_col0_art12_sub1', 'a_p4_col2_art12']
+    assert 'article_group' not in chunks[4]['metadata']
+
+    embedded, siblings, pairs = split_canonical(chunks, 'en')
+    assert sorted(c['chunk_id'] for c in embedded) == ['a_p0_col0_chunk0', 'a_p3_col1_art12', 'a_p9_col1_art12']
+    assert len(siblings) == 3
+    assert pairs['a_p3_col1_art12'] == ['a_p3_col0_art12_sub0', 'a_p4_col2_art12']
+
+    print("✅ Trilingual article groups")
+
+
+if __name__ == '__main__':
+    test_lookup_round_trip()
+    test_article_groups()
@@ -0,0 +1,193 @@
+"""
+Test the shared article header scanner
+"""
+
+import fitz
+
+from article_scanner import scan_articles
+from create_chunks import DocumentChunker
+from detect_article import detect_articles
+from parsed_document import ParsedDocument
+
+
+def test_number_words():
+    """Kinyarwanda ordinals, 'premier', English words and roman numerals become digits"""
+    cases = {
+        'Ingingo ya mbere': '1',
+        'Ingingo ya cumi na rimwe': '11',
+        'Ingingo ya makumyabiri na gatanu': '25',
+        'INGINGO YA MIRONGO ITATU NA KABIRI': '32',
+        'Ingingo ya ijana na icumi na umunani': '118',
+        'Ingingo ya ijana na mbere: Ivanwaho': '101',
+        'Article premier': '1',
+        'Article One': '1',
+        'Art. XIV': '14',
+    }
+    for text, number in cases.items():
+        articles = scan_articles(text)
+        assert [a['number'] for a in articles] == [number], (text, articles)
+
+    print("✅ Article numbers normalized")
+
+
+def test_line_headers():
+    """Column text only splits on headers that open a line"""
+    text = (
+        "Article 2: Interpretation\n"
+        "The terms used in this Order, as defined in\n"
+        "Article 3; have the following meanings.\n"
+        "Article 3 : Scope of application\n"
+    )
+    assert [a['number'] for a in scan_articles(text, line_start=True)] == ['2', '3']
+    assert [a['number'] for a in scan_articles(text)] == ['2', '3', '3']
+
+    articles = detect_articles("Ingingo ya mbere: Icyo aya mabwiriza agamije Ingingo ya 2: Isobanura")
+    assert [(a['number'], a['language']) for a in articles] == [('1', 'rw'), ('2', 'rw')]
+    assert articles[0]['content'] == 'Ingingo ya mbere: Icyo aya mabwiriza agamije'
+
+    print("✅ Line-anchored headers")
+
+
+def make_gazette(pages):
+    """In-memory three-column PDF; pages is a list of (rw, en, fr) column line lists
+    (or a list of lines, written across the whole page)"""
+    pdf = fitz.open()
+    for columns in pages:
+        page = pdf.new_page(width=842, height=595)
+        for x, lines in zip((40, 320, 600), columns if isinstance(columns, tuple) else (columns,)):
+            for i, line in enumerate(lines):
+                page.insert_text((x, 60 + 14 * i), line, fontsize=9)
+    return pdf.tobytes()
+
+
+def test_articles_across_pages():
+    """An article continued on the next page is emitted once with its page span"""
+    data = make_gazette([
+        (["Ingingo ya mbere: Icyo iri teka", "rigamije"], ["Article One: Purpose", "of this Order"],
+         ["Article premier : Objet", "du présent arrêté"]),
+        (["rikomeza kuri paji", "Ingingo ya 2: Isobanura"], ["continued here", "Article 2: Interpretation"],
+         ["suite ici", "Article 2 : Interprétation"]),
+    ])
+    document = ParsedDocument("gazette.pdf", data=data, cache=False)
+    chunks = list(DocumentChunker("gazette.pdf", 'legislation', document=document).iter_chunks())
+
+    spans = {(c['metadata']['column'], c['metadata']['article_number']): (c['metadata']['page_start'], c['metadata']['page_end'])
+             for c in chunks}
+    assert spans == {(0, '1'): (0, 1), (1, '1'): (0, 1), (2, '1'): (0, 1),
+                     (0, '2'): (1, 1), (1, '2'): (1, 1), (2, '2'): (1, 1)}
+    first = next(c for c in chunks if c['metadata']['column'] == 1 and c['metadata']['article_number'] == '1')
+    assert first['text'].endswith('continued here')
+    assert all(c['metadata']['article_number'] for c in chunks)
+
+    print("✅ Articles assembled across pages")
+
+
+def test_table_of_contents():
+    """TOC entries become one navigation record per column, not duplicate articles"""
+    toc = ["Ingingo ya mbere: Icyo iri teka", "Ingingo ya 2: Isobanura", "2"]
+    body = ["Ingingo ya mbere: Icyo iri teka", "Iri teka rigena uburyo", "Ingingo ya 2: Isobanura", "Muri iri teka"]
+    data = make_gazette([
+        (toc, [line.replace('Ingingo ya mbere', 'Article One').replace('Ingingo ya', 'Article') for line in toc],
+         [line.replace('Ingingo ya mbere', 'Article premier').replace('Ingingo ya', 'Article') for line in toc]),
+        (body, ["Article One: Purpose", "This Order determines", "Article 2: Interpretation", "In this Order"],
+         ["Article premier : Objet", "Le présent arrêté", "Article 2 : Interprétation", "Dans le présent"]),
+    ])
+    document = ParsedDocument("gazette.pdf", data=data, cache=False)
+    chunks = list(DocumentChunker("gazette.pdf", 'legislation', document=document).iter_chunks())
+
+    tocs = [c for c in chunks if c['metadata'].get('chunk_type') == 'toc']
+    assert [(c['metadata']['column'], c['metadata']['articles_listed']) for c in tocs] == [(0, 2), (1, 2), (2, 2)]
+    articles = [(c['metadata']['column'], c['metadata']['article_number'], c['metadata']['page']) for c in chunks
+                if c['metadata']['article_number']]
+    assert sorted(articles) == [(col, n, 1) for col in range(3) for n in ('1', '2')]
+
+    print("✅ Table of contents stored as a navigation record")
+
+
+def test_bundled_short_orders():
+    """Two back-to-back orders of short articles are articles, not a TOC"""
+    orders = [
+        ["Ingingo ya mbere: Icyo iri teka rigamije", "Iri teka rishyiraho komite.",
+         "Ingingo ya 2: Igihe iri teka ritangira gukurikizwa", "Iri teka ritangira gukurikizwa."],
+        ["Ingingo ya mbere: Ishyirwaho ry'umuyobozi", "Ashyizwe ku mwanya w'umuyobozi.",
+         "Ingingo ya 2: Igihe iri teka ritangira gukurikizwa", "Iri teka ritangira gukurikizwa."],
+    ]
+    column = orders[0] + orders[1]
+    data = make_gazette([(column, [line.replace('Ingingo ya mbere', 'Article One').replace('Ingingo ya', 'Article')
+                                   for line in column],
+                          [line.replace('Ingingo ya mbere', 'Article premier').replace('Ingingo ya', 'Article')
+                           for line in column])])
+    document = ParsedDocument("gazette.pdf", data=data, cache=False)
+    chunks = list(DocumentChunker("gazette.pdf", 'legislation', document=document).iter_chunks())
+
+    assert not [c for c in chunks if c['metadata'].get('chunk_type') == 'toc']
+    articles = [(c['metadata']['column'], c['metadata']['article_number']) for c in chunks
+                if c['metadata']['article_number']]
+    assert sorted(articles) == sorted((col, n) for col in range(3) for n in ('1', '2', '1', '2'))
+
+    print("✅ Short articles of bundled orders kept as articles")
+
+
+def test_annex_after_last_article():
+    """Signature, annex and full-width pages after the last article are not part of it"""
+    last = (["Ingingo ya 2: Gutangira gukurikizwa", "Iri teka ritangira gukurikizwa", "ku munsi ritangarijweho."],
+            ["Article 2: Entry into force", "This Order comes into force", "on the date of its publication."],
+            ["Article 2 : Entrée en vigueur", "Le présent arrêté entre en vigueur", "le jour de sa publication."])
+    signed_annex = [
+        last,
+        (["Kigali, 25/08/2025", "Bibonywe", "Seen", "Vu", "Minisitiri"], ["(sé)", "Dr MUGENZI Patrice"], []),
+        (["UMUGEREKA W'ITEKA RYA MINISITIRI", "1. Ipikipiki FRW 16.638"],
+         ["ANNEX TO MINISTERIAL ORDER", "1. Motorcycles FRW 16,638"],
+         ["ANNEXE À L'ARRÊTÉ MINISTÉRIEL", "1. Motocycles 16.638 FRW"]),
+    ]
+    # A full-width table with no annex heading: the page layout alone ends the articles
+    full_width = [last, ["2. Vehicles used for the transport of persons, with an authorized maximum weight of "
+                         "three and half tons FRW 34,940 Within two weeks from first visit"] * 6]
+
+    for pages in (signed_annex, full_width):
+        document = ParsedDocument("gazette.pdf", data=make_gazette(pages), cache=False)
+        chunks = list(DocumentChunker("gazette.pdf", 'legislation', document=document).iter_chunks())
+
+        articles = {c['metadata']['column']: c for c in chunks if c['metadata']['article_number']}
+        assert sorted(articles) == [0, 1, 2]
+        assert all(c['metadata']['page_end'] == 0 for c in articles.values())
+        assert [c['text'].split('\n')[-1] for c in articles.values()] == [column[-1] for column in last]
+        fragments = [c for c in chunks if not c['metadata']['article_number']]
+        assert {c['metadata']['page'] for c in fragments} == set(range(1, len(pages)))
+
+    print("✅ Annex and signature split off the last article")
+
+
+def test_case_law_sections():
+    """Judgment sections are found on reading-order lines and long ones are split"""
+    pdf = fitz.open()
+    paragraphs = [f"[{n}] Urukiko rusanga umusoro ku nyongeragaciro waciwe SUGIRA Ltd ukuweho." for n in range(1, 40)]
+    body = ["Incamake y'ikibazo: uru rubanza rukomoka ku kutumvikana", "I. IMITERERE Y'URUBANZA"] + paragraphs
+    for start in range(0, len(body), 30):
+        page = pdf.new_page(width=595, height=842)
+        for i, line in enumerate(body[start:start + 30]):
+            page.insert_text((60, 60 + 20 * i), line, fontsize=10)
+    document = ParsedDocument("judgment.pdf", data=pdf.tobytes(), cache=False)
+    chunker = DocumentChunker("judgment.pdf", 'case_law', document=document)
+    chunks = list(chunker.iter_chunks())
+
+    assert chunks[0]['chunk_id'].endswith('_page0') and chunks[0]['text'].startswith("Incamake")
+    sections = [c for c in chunks if c['metadata'].get('section_number') == 'I']
+    assert len(sections) > 1 and sections[0]['chunk_id'].endswith('_section0_part0')
+    assert (sections[0]['metadata']['page_start'], sections[0]['metadata']['page_end']) == (0, 1)
+    assert all(c['text'].startswith('[') for c in sections[1:])
+    assert max(c['metadata']['word_count'] for c in chunks) < 100
+    # The case-law splitter is chosen per run; the chunker keeps its legal splitter
+    assert chunker.text_splitter.separators[0] == "\n\nIngingo ya"
+
+    print("✅ Case law sections")
+
+
+if __name__ == '__main__':
+    test_number_words()
+    test_line_headers()
+    test_articles_across_pages()
+    test_table_of_contents()
+    test_bundled_short_orders()
+    test_annex_after_last_article()
+    test_case_law_sections()
@@ -0,0 +1,64 @@
+"""
+Test length-bucketed batch embedding
+"""
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from batch_embedding import BucketedEmbeddings, padded_lengths, plan_batches
+
+
+class RecordingModel(Embeddings):
+    """Deterministic stand-in for the transformer that records its batches"""
+
+    def __init__(self):
+        self.batches = []
+
+    def embed_documents(self, texts):
+        self.batches.append(list(texts))
+        return [[float(len(text)), float(sum(map(ord, text)) % 97)] for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+TEXTS = ["Ingingo ya 1: Icyo iri tegeko rigamije"] * 3 + ["Article " + "word " * n for n in range(1, 200, 7)]
+
+
+def test_plan_batches():
+    """Batches cover every text once, longest first, within the padded token budget"""
+    lengths = padded_lengths(TEXTS)
+    assert lengths.max() <= 128
+    batches = plan_batches(lengths, batch_tokens=512, max_batch=8)
+    indices = np.concatenate(batches)
+    assert sorted(indices.tolist()) == list(range(len(TEXTS)))
+    assert all(len(batch) * lengths[batch].max() <= 512 or len(batch) == 1 for batch in batches)
+    assert all(len(batch) <= 8 for batch in batches)
+    assert lengths[batches[0][0]] == lengths.max()
+    print(f"✅ {len(TEXTS)} texts in {len(batches)} batches")
+
+
+def test_bucketed_embeddings():
+    """Vectors come back in input order; short texts share batches"""
+    model = RecordingModel()
+    embeddings = BucketedEmbeddings(model, workers=1, batch_tokens=512, max_batch=8)
+    vectors = embeddings.embed_documents(TEXTS)
+    assert vectors == RecordingModel().embed_documents(TEXTS)
+    assert max(len(batch) for batch in model.batches) == 8
+    assert embeddings.stats['chunks'] == len(TEXTS)
+    assert embeddings.stats['chunks_per_sec'] > 0
+    print(f"✅ Bucketed vectors match ({embeddings.stats['padding']:.0%} padding)")
+
+
+def test_worker_pool():
+    """A process pool returns the same vectors as a single process"""
+    embeddings = BucketedEmbeddings(RecordingModel(), workers=2, threads_per_worker=1, batch_tokens=512, max_batch=4)
+    assert embeddings.embed_documents(TEXTS) == RecordingModel().embed_documents(TEXTS)
+    assert embeddings.stats['workers'] == 2
+    print("✅ Pooled embedding matches")
+
+
+if __name__ == '__main__':
+    test_plan_batches()
+    test_bucketed_embeddings()
+    test_worker_pool()
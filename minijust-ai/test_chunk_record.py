@@ -0,0 +1,40 @@
+"""
+Test compact chunk records and the shared document metadata
+"""
+
+import pickle
+import sys
+import tempfile
+
+from chunk_record import Chunk, ChunkMetadata, DocumentMetadataStore
+
+
+def test_shared_metadata():
+    """Document fields are stored once and seen through every chunk"""
+    shared = {'doc_type': 'Legislation', 'source_file': 'order.pdf', 'jurisdiction': 'Rwanda'}
+    first = Chunk('d', 'd_p1_col0_art1', 'Ingingo ya mbere', ChunkMetadata({'page': 1, 'language': 'rw'}, shared))
+    second = first.replace('d_p1_col0_art1_sub0', 'Ingingo', sub_chunk=0)
+
+    assert first['metadata']['doc_type'] == 'Legislation' and second['metadata']['page'] == 1
+    assert second.metadata.shared is first.metadata.shared
+    assert ChunkMetadata({'language': ''.join(['r', 'w'])})['language'] is sys.intern('rw')
+    assert dict(second['metadata']) == {'page': 1, 'language': 'rw', 'sub_chunk': 0, **shared}
+
+    # The docstore keeps only the chunk's own fields (plus its ID and document)
+    assert first.document_metadata() == {'page': 1, 'language': 'rw', 'chunk_id': 'd_p1_col0_art1', 'source_file': 'order.pdf'}
+
+    restored = pickle.loads(pickle.dumps([first, second]))
+    assert restored == [first, second] and restored[0].metadata.shared is restored[1].metadata.shared
+
+    with tempfile.TemporaryDirectory() as store:
+        documents = DocumentMetadataStore.load(store)
+        documents.set('order.pdf', shared)
+        documents.save()
+        merged = DocumentMetadataStore.load(store).merged(first.document_metadata())
+        assert merged == {**dict(first.metadata), 'chunk_id': 'd_p1_col0_art1'}
+
+    print("✅ Shared chunk metadata")
+
+
+if __name__ == '__main__':
+    test_shared_metadata()
@@ -75,7 +75,7 @@ def analyze_chunks(pdf_path: str, doc_type: str = 'auto'):
     for i, chunk in enumerate(chunks[:3], 1):
         print(f"\n  --- Chunk {i} ---")
         print(f"  Chunk ID: {chunk['chunk_id']}")
-        print(f"  Metadata: {json.dumps(chunk['metadata'], indent=4)}")
+        print(f"  Metadata: {json.dumps(dict(chunk['metadata']), indent=4)}")
         text_preview = chunk['text'][:150].replace('\n', ' ')
         print(f"  Text preview: {text_preview}...")
         print(f"  Full text length: {len(chunk['text'])} characters")
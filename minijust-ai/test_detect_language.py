@@ -0,0 +1,48 @@
+"""
+Test that batched language identification agrees with langid.classify
+"""
+
+import langid
+from detect_language import classify_texts, detect_text_languages, profile_column_languages
+
+
+SAMPLES = [
+    "Ingingo ya mbere: Icyo aya mabwiriza agamije. Aya mabwiriza agena uburyo bwo gutuza abantu",
+    "Article One: Purpose of these Instructions. These Instructions determine the modalities of settling persons",
+    "Article premier : Objet des présentes instructions. Les présentes instructions déterminent les modalités",
+    "",
+    "Kigali",
+]
+
+
+def test_batch_matches_langid():
+    """Every text gets the language langid would give it on its own"""
+    expected = [langid.classify(text)[0] for text in SAMPLES]
+    assert classify_texts(SAMPLES) == expected
+    # Memoized results stay the same
+    assert classify_texts(list(reversed(SAMPLES))) == list(reversed(expected))
+
+    print("✅ Batch language ID matches langid")
+
+
+def test_page_windows():
+    """Pages are voted over 40-word windows"""
+    page_text = ' '.join(SAMPLES[0].split() * 6 + SAMPLES[1].split() * 6)
+    assert detect_text_languages(page_text) == ['en', 'rw']
+    assert detect_text_languages('short') == ['unknown']
+
+    print("✅ Page languages from windows")
+
+
+def test_column_profile():
+    """Swapped columns get their real languages; an empty column stays unknown"""
+    page = [SAMPLES[2] * 3, SAMPLES[0] * 3, '']
+    assert profile_column_languages([page] * 20) == ['fr', 'rw', None]
+
+    print("✅ Column languages profiled per document")
+
+
+if __name__ == '__main__':
+    test_batch_matches_langid()
+    test_page_windows()
+    test_column_profile()
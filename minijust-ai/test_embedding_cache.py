@@ -0,0 +1,63 @@
+"""
+Test the persistent embedding cache
+"""
+
+import tempfile
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from embedding_cache import CachedEmbeddings, EmbeddingCache
+
+
+class CountingModel(Embeddings):
+    """Deterministic stand-in for the transformer that counts the texts it embeds"""
+
+    def __init__(self):
+        self.embedded = []
+
+    def embed_documents(self, texts):
+        self.embedded.extend(texts)
+        return [[float(len(text)), float(sum(map(ord, text)) % 97), 1.0] for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def test_cache_round_trip():
+    """Texts are embedded once; later calls (and other processes) read them from disk"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        model = CountingModel()
+        embeddings = CachedEmbeddings(model, EmbeddingCache('test/model', cache_dir))
+        first = embeddings.embed_documents(["Ingingo ya 1", "Article 1", "Ingingo ya 1"])
+        assert model.embedded == ["Ingingo ya 1", "Article 1"]
+
+        # A fresh cache object (as after a restart) sees the stored vectors;
+        # whitespace differences do not change the key
+        model = CountingModel()
+        embeddings = CachedEmbeddings(model, EmbeddingCache('test/model', cache_dir))
+        again = embeddings.embed_documents(["Article 1", "Ingingo  ya 1\n", "Article 2"])
+        assert model.embedded == ["Article 2"]
+        assert again[:2] == [first[1], first[0]]
+        assert (embeddings.hits, embeddings.misses) == (2, 1)
+        assert len(EmbeddingCache('test/model', cache_dir)) == 3
+
+        # float16 files are separate and close to the float32 vectors
+        half = CachedEmbeddings(CountingModel(), EmbeddingCache('test/model', cache_dir, dtype='float16'))
+        half.embed_documents(["Article 1"])
+        vectors, found = half.cache.get(["Article 1"])
+        assert found.all() and np.allclose(vectors[0], first[1], rtol=1e-3)
+
+        # Compaction keeps only the vectors of live text
+        cache = EmbeddingCache('test/model', cache_dir)
+        assert cache.compact(["Article 2", "Ingingo ya 1"]) == 1
+        model = CountingModel()
+        embeddings = CachedEmbeddings(model, EmbeddingCache('test/model', cache_dir))
+        assert embeddings.embed_documents(["Article 2", "Ingingo ya 1"]) == [again[2], first[0]]
+        assert model.embedded == []
+
+    print("✅ Embedding cache")
+
+
+if __name__ == '__main__':
+    test_cache_round_trip()
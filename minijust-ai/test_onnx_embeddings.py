@@ -0,0 +1,39 @@
+"""
+Test the ONNX embedding backend helpers (the export itself needs torch, transformers and onnxruntime)
+"""
+
+import tempfile
+
+import numpy as np
+
+from onnx_embeddings import cosine_agreement, mean_pool, onnx_available
+
+
+def test_mean_pool():
+    """Padded tokens do not count towards the mean"""
+    hidden = np.array([[[1.0, 2.0], [3.0, 4.0], [100.0, 100.0]],
+                       [[5.0, 6.0], [100.0, 100.0], [100.0, 100.0]]], dtype=np.float32)
+    attention_mask = np.array([[1, 1, 0], [1, 0, 0]], dtype=np.int64)
+    assert np.allclose(mean_pool(hidden, attention_mask), [[2.0, 3.0], [5.0, 6.0]])
+    print("✅ Mean pooling ignores padding")
+
+
+def test_cosine_agreement():
+    """Rows are compared pairwise and scale does not matter"""
+    a = np.array([[1.0, 0.0], [1.0, 1.0], [0.0, 2.0]])
+    b = np.array([[2.0, 0.0], [1.0, -1.0], [0.0, -1.0]])
+    assert np.allclose(cosine_agreement(a, b), [1.0, 0.0, -1.0])
+    print("✅ Cosine agreement")
+
+
+def test_onnx_unavailable():
+    """Without an export the torch backend is used"""
+    with tempfile.TemporaryDirectory() as model_dir:
+        assert not onnx_available(model_dir=model_dir)
+    print("✅ Missing ONNX export detected")
+
+
+if __name__ == '__main__':
+    test_mean_pool()
+    test_cosine_agreement()
+    test_onnx_unavailable()
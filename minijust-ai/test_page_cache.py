@@ -0,0 +1,107 @@
+"""
+Test the on-disk page cache - a second open must be served without PyMuPDF
+"""
+
+import os
+import tempfile
+
+import detect_language
+from detect_column import TEMPLATE_SAMPLE_PAGES
+from create_chunks import STREAMING_CACHE_PAGES, create_chunks_from_pdf
+from page_cache import PageCache
+from parsed_document import ParsedDocument
+
+PDF_PATH = os.path.join(os.path.dirname(__file__), 'data', "IKIGO CYIMISORO N'AMAHORO v. SUGIRA LTD.pdf")
+GAZETTE_PATH = os.path.join(os.path.dirname(__file__), 'data',
+                            "MINISTERIAL INSTRUCTIONS No 001_07.01 OF 30_06_2025 RELATING TO THE SETTLING OF PERSONS (1).pdf")
+
+
+def read_all(document):
+    return [
+        (document.page(n).text, document.page(n).coords.tolist(), document.column_texts(n))
+        for n in range(document.page_count)
+    ]
+
+
+def test_cache_round_trip():
+    """Pages, columns and column text from the cache match a fresh parse"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = PageCache(cache_dir)
+
+        with ParsedDocument(PDF_PATH, cache=cache) as document:
+            assert not document.from_cache
+            fresh = read_all(document)
+
+        with ParsedDocument(PDF_PATH, cache=cache) as document:
+            assert document.from_cache
+            cached = read_all(document)
+            assert [c['x0'] for c in document.columns(0)] == [c['x0'] for c in ParsedDocument(PDF_PATH, cache=False).columns(0)]
+
+        assert cached == fresh
+        print(f"✅ {len(fresh)} pages served from cache")
+
+
+def test_eviction():
+    """Entries beyond max_bytes are evicted, least recently used first"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        with ParsedDocument(PDF_PATH, cache=PageCache(cache_dir, max_bytes=1)) as document:
+            read_all(document)
+
+        assert not [name for name in os.listdir(cache_dir) if not name.startswith('.')]
+        print("✅ Oversized cache evicted")
+
+
+def test_long_profile_streaming():
+    """A language profile longer than the streaming page LRU neither re-parses
+    the first pages nor loses the page cache entry"""
+    agreement = detect_language.PROFILE_AGREEMENT
+    detect_language.PROFILE_AGREEMENT = 1.1  # never settles: PROFILE_MAX_PAGES pages are read
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = PageCache(cache_dir)
+            document = ParsedDocument(GAZETTE_PATH, max_cached_pages=STREAMING_CACHE_PAGES, cache=cache)
+            parsed = []
+            entry = document._entry
+
+            def counting_entry(page_num, record=True):
+                if page_num not in document._pages:
+                    parsed.append(page_num)
+                return entry(page_num, record)
+
+            document._entry = counting_entry
+            with document:
+                create_chunks_from_pdf(GAZETTE_PATH, 'legislation', document=document)
+
+            assert parsed == list(range(document.page_count)), "a page was parsed twice"
+            with ParsedDocument(GAZETTE_PATH, cache=cache) as cached:
+                assert cached.from_cache
+    finally:
+        detect_language.PROFILE_AGREEMENT = agreement
+    print(f"✅ {len(parsed)} pages parsed once and cached after a {detect_language.PROFILE_MAX_PAGES}-page profile")
+
+
+def test_template_pages_memoized():
+    """The pages sampled for the layout template are parsed once and still reach the cache"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = PageCache(cache_dir)
+        with ParsedDocument(GAZETTE_PATH, cache=cache) as document:
+            assert document.layout_template is not None
+            sampled = set(document._pages)
+            assert sampled == set(range(TEMPLATE_SAMPLE_PAGES))
+
+            parse = document._doc.load_page
+            parsed = []
+            document._doc.load_page = lambda page_num: parsed.append(page_num) or parse(page_num)
+            fresh = read_all(document)
+            assert not sampled & set(parsed)
+
+        with ParsedDocument(GAZETTE_PATH, cache=cache) as cached:
+            assert cached.from_cache and read_all(cached) == fresh
+    print(f"✅ {len(sampled)} template pages parsed once")
+
+
+if __name__ == '__main__':
+    test_cache_round_trip()
+    test_eviction()
+    test_long_profile_streaming()
+    test_template_pages_memoized()
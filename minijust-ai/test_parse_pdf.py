@@ -0,0 +1,89 @@
+"""
+Test the compact page representation returned by parse_pdf_words
+"""
+
+from parse_pdf import PageWords, as_page_words
+from detect_column import (
+    detect_column_boundaries, detect_columns, detect_layout_template, reconstruct_text_reading_order
+)
+
+
+def make_page():
+    """Two lines of three words each, one word per column"""
+    words = [
+        (10.0, 100.0, 60.0, 110.0, 'Ingingo', 0, 0, 0),
+        (250.0, 100.0, 300.0, 110.0, 'Article', 1, 0, 0),
+        (450.0, 100.0, 500.0, 110.0, 'Article', 2, 0, 0),
+        (10.0, 120.0, 60.0, 130.0, 'ya', 0, 1, 0),
+        (250.0, 120.0, 300.0, 130.0, 'One', 1, 1, 0),
+        (450.0, 120.0, 500.0, 130.0, 'premier', 2, 1, 0),
+    ]
+    return PageWords.from_fitz_words(0, 612.0, 792.0, words)
+
+
+def test_dict_view():
+    """page['words'] must keep behaving like the old list of dicts"""
+    page = make_page()
+
+    assert page['page_num'] == 0
+    assert 'words' in page
+    assert len(page['words']) == 6
+
+    first = page['words'][0]
+    assert first['text'] == 'Ingingo'
+    assert first['bbox'] == (first['x0'], first['y0'], first['x1'], first['y1'])
+    assert (first['block_no'], first['line_no'], first['word_no']) == (0, 0, 0)
+    assert [w['text'] for w in page['words'][-2:]] == ['One', 'premier']
+
+    print("✅ Dict view matches legacy API")
+
+
+def test_round_trip_and_columns():
+    """Legacy dicts convert back to arrays and columns keep page order"""
+    page = make_page()
+    rebuilt = as_page_words(list(page['words']))
+    assert rebuilt.text == page.text
+    assert (rebuilt.coords == page.coords).all()
+
+    columns = detect_columns(page)
+    assert [c['word_count'] for c in columns] == [2, 2, 2]
+    assert reconstruct_text_reading_order(columns[0]) == 'Ingingo\nya'
+    assert reconstruct_text_reading_order(columns[2], add_line_breaks=False) == 'Article premier'
+
+    print("✅ Columns built from compact pages")
+
+
+def test_profile_boundaries():
+    """Boundaries sit in the middle of the empty gutters between columns"""
+    page = make_page()
+    assert detect_column_boundaries(page) == (155.0, 375.0)
+
+    # No words at all: equal thirds
+    empty = PageWords.from_fitz_words(1, 600.0, 800.0, [])
+    assert detect_column_boundaries(empty) == (200.0, 400.0)
+
+    print("✅ Column gutters found from the x-coverage profile")
+
+
+def test_layout_template():
+    """Sparse pages reuse the document's boundaries; a different layout is re-detected"""
+    template = detect_layout_template([make_page()])
+    assert template == {'width': 612.0, 'boundaries': (155.0, 375.0)}
+
+    # One English word just right of the first gutter - alone, the page would be cut in thirds
+    sparse = PageWords.from_fitz_words(1, 612.0, 792.0, [(160.0, 100.0, 200.0, 110.0, 'Annex', 1, 0, 0)])
+    assert [c['word_count'] for c in detect_columns(sparse, template)] == [0, 1, 0]
+    assert [c['word_count'] for c in detect_columns(sparse)] == [1, 0, 0]
+
+    # A full-width line straddles both boundaries, so the drift check rejects the template
+    wide = PageWords.from_fitz_words(2, 612.0, 792.0, [(10.0, 100.0, 600.0, 110.0, 'Heading', 0, 0, 0)])
+    assert detect_columns(wide, template)[0]['x1'] == 204.0
+
+    print("✅ Layout template reused across pages")
+
+
+if __name__ == '__main__':
+    test_dict_view()
+    test_round_trip_and_columns()
+    test_profile_boundaries()
+    test_layout_template()
@@ -0,0 +1,70 @@
+"""
+Test the process-wide vector store registry
+"""
+
+import os
+import tempfile
+import threading
+import time
+
+from store_registry import StoreRegistry, store_version
+
+
+def _write(path, text):
+    with open(path, 'w') as f:
+        f.write(text)
+
+
+def test_reload_on_change():
+    """A store is loaded once and reloaded only after its files change on disk"""
+    with tempfile.TemporaryDirectory() as store_dir:
+        registry = StoreRegistry(lambda path: open(os.path.join(path, 'index.faiss')).read())
+        assert registry.get(store_dir) is None
+        assert store_version(store_dir) is None
+
+        _write(os.path.join(store_dir, 'index.faiss'), 'v1')
+        _write(os.path.join(store_dir, 'index.pkl'), 'docs')
+        first = registry.get(store_dir)
+        assert first == 'v1'
+        assert registry.get(store_dir) is first
+        assert registry.loads == 1
+        print("✅ Unchanged store is served from memory")
+
+        _write(os.path.join(store_dir, 'index.faiss'), 'v2 longer')
+        assert registry.get(store_dir) == 'v2 longer'
+        assert registry.loads == 2
+
+        registry.invalidate(store_dir)
+        assert registry.get(store_dir) == 'v2 longer'
+        assert registry.loads == 3
+        print("✅ Changed or invalidated store is reloaded")
+
+        os.remove(os.path.join(store_dir, 'index.faiss'))
+        assert registry.get(store_dir) is None
+        print("✅ Deleted store is dropped")
+
+
+def test_concurrent_get():
+    """Sessions asking at the same time share a single load"""
+    with tempfile.TemporaryDirectory() as store_dir:
+        _write(os.path.join(store_dir, 'index.faiss'), 'v1')
+
+        def slow_load(path):
+            time.sleep(0.05)
+            return object()
+
+        registry = StoreRegistry(slow_load)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(registry.get(store_dir))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert registry.loads == 1
+        assert all(result is results[0] for result in results)
+        print("✅ Concurrent lookups load the store once")
+
+
+if __name__ == '__main__':
+    test_reload_on_change()
+    test_concurrent_get()
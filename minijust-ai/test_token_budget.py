@@ -0,0 +1,59 @@
+"""
+Test token-budgeted splitting for the embedding model
+"""
+
+from chunk_record import Chunk, ChunkMetadata
+from create_chunks import LEGACY_CHUNK_SIZE, legacy_chunk_texts
+from token_budget import TokenBudgetSplitter, token_counts, truncation_report
+
+
+def test_split_within_budget():
+    """Pieces fit the budget, prefer the legal separators and cover the whole text"""
+    article = "Ingingo ya 3: Inshingano\n" + "\n".join(
+        f"{n}° umukozi agomba kubahiriza amategeko agenga umurimo we wa buri munsi;" for n in range(1, 30)
+    )
+    splitter = TokenBudgetSplitter(["\nIngingo ya", "\n", " "], chunk_tokens=60, overlap_tokens=10)
+    pieces, short = splitter.split_texts([article, "Ingingo ya 4: Igihe"])
+
+    assert short == ["Ingingo ya 4: Igihe"]
+    assert len(pieces) > 1
+    assert max(token_counts(pieces)) <= 60
+    assert all(piece.split('\n')[0].split()[0].rstrip('°').isdigit() for piece in pieces[1:])
+    assert pieces[0].startswith("Ingingo ya 3") and pieces[-1].endswith("29° " + article.split("29° ")[1])
+
+    # A run with no separators is cut between tokens
+    words = TokenBudgetSplitter(["\n"], chunk_tokens=20, overlap_tokens=5).split_text("a" * 400)
+    assert len(words) > 1 and max(token_counts(words)) <= 20
+
+    print("✅ Token-budgeted splitting")
+
+
+def test_truncation_report():
+    report = truncation_report(["kimwe", "ijambo " * 300], max_tokens=50)
+    assert report['chunks'] == 2 and report['truncated_chunks'] == 1
+    assert report['dropped_tokens'] == report['tokens'] - token_counts(["kimwe"])[0] - 50
+
+    print("✅ Truncation report")
+
+
+def test_legacy_chunk_texts():
+    """The old settings: fragments cut at 1500 characters, articles only past 500 words, pages whole"""
+    def chunk(text, suffix):
+        return Chunk('doc', 'doc_p0', text, ChunkMetadata({}, {}), split_suffix=suffix)
+
+    fragment = "Iteka rya Minisitiri. " * 100
+    short_article = "Ingingo ya 1: Icyo iri teka rigamije\n" + "amategeko " * 400
+    page = "urubanza " * 2000
+    texts = legacy_chunk_texts([chunk(fragment, '_chunk'), chunk(short_article, '_sub'), chunk(page, '_part')])
+
+    assert all(len(text) <= LEGACY_CHUNK_SIZE for text in texts[:-2])
+    assert len(texts) > 3 and texts[-2:] == [short_article, page]
+    assert truncation_report(texts)['dropped_tokens'] > 0
+
+    print("✅ Old-settings chunks for comparison")
+
+
+if __name__ == '__main__':
+    test_split_within_budget()
+    test_truncation_report()
+    test_legacy_chunk_texts()
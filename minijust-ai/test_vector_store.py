@@ -0,0 +1,155 @@
+"""
+Test deleting and re-uploading documents in the FAISS vector store (needs faiss)
+"""
+
+import json
+import os
+import tempfile
+import time
+
+import pytest
+
+pytest.importorskip("faiss")
+pytest.importorskip("langchain_community")
+
+import create_embeddings
+import embedding_cache
+from article_groups import align_article_groups
+from chunk_record import Chunk, ChunkMetadata
+from token_budget import EMBEDDING_MODEL
+from utils import compact_vector_store, delete_document_from_store, load_vector_store
+
+
+class HashModel:
+    """Deterministic stand-in for the transformer (no download) that counts the texts it embeds"""
+
+    def __init__(self):
+        self.embedded = 0
+
+    def embed_documents(self, texts):
+        self.embedded += len(texts)
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        return [float((hash(text) >> shift) % 97) for shift in range(0, 64, 8)]
+
+
+def make_document(source_file, articles=40):
+    """Chunks of a trilingual gazette: every article in rw/en/fr plus a preamble fragment"""
+    shared = {'source_file': source_file, 'doc_type': 'Legislation'}
+    doc_id = source_file.replace('.pdf', '')
+    chunks = [Chunk(doc_id, f"{doc_id}_p0_col0_chunk0", f"Preamble of {source_file}",
+                    ChunkMetadata({'page': 0, 'column': 0, 'language': 'rw', 'article_number': None}, shared))]
+    for n in range(1, articles + 1):
+        for column, language in enumerate(('rw', 'en', 'fr')):
+            chunks.append(Chunk(doc_id, f"{doc_id}_p{n}_col{column}_art{n}", f"{source_file} article {n} ({language})",
+                                ChunkMetadata({'page': n, 'page_start': n, 'page_end': n, 'column': column,
+                                               'language': language, 'article_number': str(n)}, shared)))
+    align_article_groups(chunks)
+    return chunks
+
+
+def test_delete_and_reupload():
+    """Deleting a document removes its vectors and docstore entries in place; re-uploading it re-uses the cache"""
+    model = HashModel()
+    cache_dir = embedding_cache.EMBEDDING_CACHE_DIR
+    previous = create_embeddings._MODELS.get(EMBEDDING_MODEL)
+    create_embeddings._MODELS[EMBEDDING_MODEL] = model
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            embedding_cache.EMBEDDING_CACHE_DIR = os.path.join(tmp, 'embedding_cache')
+            store = os.path.join(tmp, 'faiss_index')
+            first, second = make_document('first.pdf'), make_document('second.pdf')
+            create_embeddings.create_vector_store(first, store, group_mode='canonical')
+            create_embeddings.create_vector_store(second, store, group_mode='canonical')
+            vector_store = load_vector_store(store, shared=False)
+            before = vector_store.index.ntotal
+            assert len(vector_store.docstore._dict) == len(first) + len(second)
+            embedded = model.embedded
+
+            start = time.perf_counter()
+            delete_document_from_store('first.pdf', store)
+            seconds = time.perf_counter() - start
+
+            vector_store = load_vector_store(store, shared=False)
+            ids = list(vector_store.index_to_docstore_id.values())
+            assert vector_store.index.ntotal == len(ids) == before // 2
+            assert sorted(vector_store.index_to_docstore_id) == list(range(len(ids)))
+            assert all(doc_id.startswith('second_') for doc_id in ids)
+            assert set(vector_store.docstore._dict) == {chunk.chunk_id for chunk in second}
+            assert all(vector_store.docstore.search(doc_id).metadata['chunk_id'] == doc_id for doc_id in ids)
+            hits = vector_store.similarity_search("second.pdf article 7 (en)", k=1)
+            assert hits[0].metadata['chunk_id'] == 'second_p7_col1_art7'
+            print(f"✅ Deleted {len(first)} chunks in place ({seconds * 1000:.0f} ms)")
+
+            create_embeddings.create_vector_store(first, store, group_mode='canonical')
+            vector_store = load_vector_store(store, shared=False)
+            assert vector_store.index.ntotal == before
+            assert len(vector_store.docstore._dict) == len(first) + len(second)
+            assert model.embedded == embedded
+            print("✅ Re-upload served from the embedding cache")
+    finally:
+        embedding_cache.EMBEDDING_CACHE_DIR = cache_dir
+        if previous is None:
+            create_embeddings._MODELS.pop(EMBEDDING_MODEL, None)
+        else:
+            create_embeddings._MODELS[EMBEDDING_MODEL] = previous
+
+
+def test_compaction_per_store():
+    """Compacting one store leaves the cached vectors of another store alone"""
+    cache_dir = embedding_cache.EMBEDDING_CACHE_DIR
+    previous = create_embeddings._MODELS.get(EMBEDDING_MODEL)
+    create_embeddings._MODELS[EMBEDDING_MODEL] = HashModel()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            embedding_cache.EMBEDDING_CACHE_DIR = os.path.join(tmp, 'embedding_cache')
+            stores = [os.path.join(tmp, 'index_a'), os.path.join(tmp, 'index_b')]
+            for store in stores:
+                create_embeddings.create_vector_store(make_document('first.pdf', 5), store)
+                create_embeddings.create_vector_store(make_document('second.pdf', 5), store)
+            delete_document_from_store('first.pdf', stores[0])
+            compact_vector_store(stores[0])
+
+            caches = [load_vector_store(store, shared=False).embedding_function.cache for store in stores]
+            assert len(caches[0]) == load_vector_store(stores[0], shared=False).index.ntotal
+            assert len(caches[1]) == load_vector_store(stores[1], shared=False).index.ntotal
+            print("✅ Compaction is per store")
+    finally:
+        embedding_cache.EMBEDDING_CACHE_DIR = cache_dir
+        if previous is None:
+            create_embeddings._MODELS.pop(EMBEDDING_MODEL, None)
+        else:
+            create_embeddings._MODELS[EMBEDDING_MODEL] = previous
+
+
+def test_backend_mismatch():
+    """An index records its embedding backend; adding vectors of another backend is refused"""
+    cache_dir = embedding_cache.EMBEDDING_CACHE_DIR
+    previous = create_embeddings._MODELS.get(EMBEDDING_MODEL)
+    create_embeddings._MODELS[EMBEDDING_MODEL] = HashModel()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            embedding_cache.EMBEDDING_CACHE_DIR = os.path.join(tmp, 'embedding_cache')
+            store = os.path.join(tmp, 'faiss_index')
+            create_embeddings.create_vector_store(make_document('first.pdf', 5), store)
+            assert create_embeddings.stored_embedding_key(store) == EMBEDDING_MODEL
+
+            with open(os.path.join(store, create_embeddings.EMBEDDING_INFO_FILE), 'w') as f:
+                json.dump({'key': f"{EMBEDDING_MODEL}-onnx-int8"}, f)
+            with pytest.raises(ValueError):
+                create_embeddings.create_vector_store(make_document('second.pdf', 5), store)
+            assert load_vector_store(store, shared=False).index.ntotal > 0
+            print("✅ Mixing embedding backends in one index is refused")
+    finally:
+        embedding_cache.EMBEDDING_CACHE_DIR = cache_dir
+        if previous is None:
+            create_embeddings._MODELS.pop(EMBEDDING_MODEL, None)
+        else:
+            create_embeddings._MODELS[EMBEDDING_MODEL] = previous
+
+
+if __name__ == '__main__':
+    test_delete_and_reupload()
+    test_compaction_per_store()
+    test_backend_mismatch()
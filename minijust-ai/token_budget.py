@@ -0,0 +1,178 @@
+"""
+Token-budgeted text splitting for the embedding model.
+
+paraphrase-multilingual-MiniLM-L12-v2 reads at most 128 word pieces per input
+([CLS] and [SEP] included) and silently drops the rest, so chunk sizes are
+measured in the model's own tokens rather than characters or words.
+
+Texts are tokenized once, in batch, with the model's fast tokenizer; the
+character offsets of the tokens then give the token count of any span with
+two binary searches, so the recursive separator split never re-tokenizes.
+Without the tokenizer (transformers missing, or the model not downloaded and
+no network) token offsets are approximated from the text.
+"""
+
+import re
+import sys
+from functools import lru_cache
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+EMBEDDING_MODEL = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+MAX_SEQ_LENGTH = 128  # word pieces the model reads, special tokens included
+SPECIAL_TOKENS = 2  # [CLS] ... [SEP]
+CHUNK_TOKENS = MAX_SEQ_LENGTH - SPECIAL_TOKENS
+CHUNK_OVERLAP_TOKENS = 16
+
+# Fallback word-piece estimate: every run of up to 4 letters/digits and every
+# punctuation mark counts as one token (close to the model's sentencepiece
+# vocabulary on Kinyarwanda, slightly pessimistic on English/French)
+APPROX_TOKEN = re.compile(r'\w{1,4}|[^\w\s]')
+
+
+@lru_cache(maxsize=1)
+def get_tokenizer():
+    """The embedding model's fast tokenizer, or None when it cannot be loaded"""
+    try:
+        from transformers import AutoTokenizer
+        return AutoTokenizer.from_pretrained(EMBEDDING_MODEL, use_fast=True)
+    except Exception as e:
+        print(f"Tokenizer for {EMBEDDING_MODEL} unavailable ({e}); approximating token counts", file=sys.stderr)
+        return None
+
+
+def token_offsets(texts: Sequence[str]) -> List[np.ndarray]:
+    """(tokens, 2) arrays of character spans, one per text, from one batched tokenizer call"""
+    if not texts:
+        return []
+    tokenizer = get_tokenizer()
+    if tokenizer is None:
+        return [
+            np.array([match.span() for match in APPROX_TOKEN.finditer(text)], dtype=np.int64).reshape(-1, 2)
+            for text in texts
+        ]
+    encoded = tokenizer(list(texts), add_special_tokens=False, return_offsets_mapping=True)
+    return [np.array(offsets, dtype=np.int64).reshape(-1, 2) for offsets in encoded['offset_mapping']]
+
+
+def token_counts(texts: Sequence[str]) -> np.ndarray:
+    """Number of model tokens (without special tokens) of each text"""
+    return np.array([len(offsets) for offsets in token_offsets(texts)], dtype=np.int64)
+
+
+def truncation_report(texts: Sequence[str], max_tokens: int = CHUNK_TOKENS) -> Dict:
+    """How much of each text the embedding model never sees"""
+    counts = token_counts(texts)
+    dropped = np.maximum(counts - max_tokens, 0)
+    total = int(counts.sum())
+    return {
+        'chunks': len(counts),
+        'tokens': total,
+        'dropped_tokens': int(dropped.sum()),
+        'dropped_fraction': float(dropped.sum() / total) if total else 0.0,
+        'truncated_chunks': int((dropped > 0).sum()),
+        'max_tokens': int(counts.max()) if len(counts) else 0,
+        'exact': get_tokenizer() is not None,
+    }
+
+
+class TokenBudgetSplitter:
+    """
+    Recursive separator splitter (like LangChain's RecursiveCharacterTextSplitter)
+    whose chunk size and overlap are model tokens. Separators are tried in order
+    and kept at the start of the piece they open; a piece with no separator left
+    is cut between tokens.
+    """
+
+    def __init__(self, separators: Sequence[str], chunk_tokens: int = CHUNK_TOKENS,
+                 overlap_tokens: int = CHUNK_OVERLAP_TOKENS):
+        if overlap_tokens >= chunk_tokens:
+            raise ValueError("overlap_tokens must be smaller than chunk_tokens")
+        self.separators = [sep for sep in separators if sep]
+        self.chunk_tokens = chunk_tokens
+        self.overlap_tokens = overlap_tokens
+
+    def split_texts(self, texts: Sequence[str]) -> List[List[str]]:
+        """Split several texts, tokenizing them in one batch"""
+        results = []
+        for text, offsets in zip(texts, token_offsets(texts)):
+            spans = self._split(text, offsets[:, 0], offsets[:, 1], 0, len(text), 0)
+            results.append([piece for piece in (text[a:b].strip() for a, b in spans) if piece])
+        return results
+
+    def split_text(self, text: str) -> List[str]:
+        return self.split_texts([text])[0]
+
+    @staticmethod
+    def _count(starts: np.ndarray, ends: np.ndarray, a: int, b: int) -> int:
+        """Tokens lying entirely inside text[a:b]"""
+        return max(0, int(np.searchsorted(ends, b, side='right')) - int(np.searchsorted(starts, a, side='left')))
+
+    def _split(self, text: str, starts: np.ndarray, ends: np.ndarray, a: int, b: int,
+               level: int) -> List[Tuple[int, int]]:
+        count = lambda p, q: self._count(starts, ends, p, q)
+        if count(a, b) <= self.chunk_tokens:
+            return [(a, b)]
+
+        cuts = []
+        while level < len(self.separators) and not cuts:
+            separator = self.separators[level]
+            cuts = [m.start() for m in re.finditer(re.escape(separator), text[a + 1:b])]
+            level += 1
+        if not cuts:
+            return self._split_tokens(starts, ends, a, b)
+
+        bounds = [a] + [a + 1 + cut for cut in cuts] + [b]
+        spans = []
+        current = []  # pieces of the chunk being filled
+        for p, q in zip(bounds, bounds[1:]):
+            if count(p, q) > self.chunk_tokens:
+                if current:
+                    spans.append((current[0][0], current[-1][1]))
+                    current = []
+                spans.extend(self._split(text, starts, ends, p, q, level))
+                continue
+            if current and count(current[0][0], q) > self.chunk_tokens:
+                spans.append((current[0][0], current[-1][1]))
+                # Carry the tail of the previous chunk over as overlap
+                while current and (count(current[0][0], current[-1][1]) > self.overlap_tokens
+                                   or count(current[0][0], q) > self.chunk_tokens):
+                    current.pop(0)
+            current.append((p, q))
+        if current:
+            spans.append((current[0][0], current[-1][1]))
+        return spans
+
+    def _split_tokens(self, starts: np.ndarray, ends: np.ndarray, a: int, b: int) -> List[Tuple[int, int]]:
+        """Cut text[a:b] every chunk_tokens tokens (overlapping by overlap_tokens)"""
+        first = int(np.searchsorted(starts, a, side='left'))
+        last = int(np.searchsorted(ends, b, side='right'))
+        step = self.chunk_tokens - self.overlap_tokens
+        spans = []
+        for i in range(first, last, step):
+            j = min(i + self.chunk_tokens, last)
+            spans.append((int(starts[i]), int(ends[j - 1])))
+            if j == last:
+                break
+        return spans
+
+
+if __name__ == '__main__':
+    # Token budget report for the chunks of a PDF, against the old character settings:
+    # python token_budget.py file.pdf [doc_type]
+    from create_chunks import LEGACY_CHUNK_SIZE, DocumentChunker, legacy_chunk_texts
+
+    if len(sys.argv) > 1:
+        doc_type = sys.argv[2] if len(sys.argv) > 2 else 'auto'
+        unsplit = list(DocumentChunker(sys.argv[1], doc_type).iter_chunks(split=False))
+        new_texts = [chunk.text for chunk in DocumentChunker(sys.argv[1], doc_type).iter_chunks()]
+        for name, texts in ((f"Old settings ({LEGACY_CHUNK_SIZE} characters)", legacy_chunk_texts(unsplit)),
+                            (f"Token budget ({CHUNK_TOKENS} tokens)", new_texts)):
+            report = truncation_report(texts)
+            print(f"{name}: {report['chunks']} chunks, {report['tokens']} tokens "
+                  f"({'exact' if report['exact'] else 'approximate'}), longest {report['max_tokens']}")
+            print(f"  Dropped by the {MAX_SEQ_LENGTH}-token limit: {report['dropped_tokens']} tokens "
+                  f"({report['dropped_fraction']:.1%}) in {report['truncated_chunks']} chunks")
+    else:
+        print("Usage: python token_budget.py <pdf_path> [doc_type]")
@@ -6,21 +6,33 @@ This file just coordinates them for the chat interface.
 """
 
 import os
-from typing import Dict, Optional, List, Any
+import sys
+from typing import Dict, Optional, List, Any, NamedTuple
 
 from dotenv import load_dotenv
 from langchain_community.vectorstores import FAISS
-from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_core.documents import Document
 
 # Import ALL functionality from our well-implemented standalone modules
 from create_chunks import create_chunks_from_pdf
-from create_embeddings import get_embedding_model, create_vector_store
+from create_embeddings import EMBEDDING_GROUP_MODE, embedding_mismatch, get_embedding_model, create_vector_store
+from article_groups import align_article_groups
+from article_index import ArticleIndex, preferred_versions
+from chunk_record import DocumentMetadataStore
+from article_scanner import scan_articles
+from store_registry import StoreRegistry
 
 load_dotenv()
 
 DOC_TYPES = ("Legislation", "Case Law", "Other")
 VECTOR_STORE_PATH = "faiss_index"
+# Worker processes for PDF extraction and layout analysis during ingestion
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "1"))
+# Compact once the embedding cache holds this many times more vectors than the store has embedded texts
+COMPACT_RATIO = float(os.getenv("COMPACT_RATIO", "2.0"))
+# Documents an article reference is answered from; when more documents have the
+# article, they are ranked by similarity to the question
+ARTICLE_LOOKUP_MAX_DOCUMENTS = int(os.getenv("ARTICLE_LOOKUP_MAX_DOCUMENTS", "2"))
 
 
 def process_and_store_document(
@@ -32,6 +44,8 @@ def process_and_store_document(
     vector_store_path: str = VECTOR_STORE_PATH,
     chunk_size: int = 1500,
     chunk_overlap: int = 200,
+    workers: int = INGEST_WORKERS,
+    data: Optional[Any] = None,
 ) -> int:
     """
     Simplified ingestion pipeline using standalone modules.
@@ -43,11 +57,18 @@ def process_and_store_document(
        - Language detection (detect_language.py)
        - Article detection and chunking (create_chunks.py)
     
-    2. create_vector_store() from create_embeddings.py handles:
-       - Embedding generation
+    2. align_article_groups() from article_groups.py links the language
+       versions of each article
+    
+    3. create_vector_store() from create_embeddings.py handles:
+       - Embedding generation (one vector per article group by default)
        - FAISS vector store creation/update
     
     No logic duplication - just orchestration!
+    
+    Pass data (bytes or a memoryview such as an upload buffer) to ingest straight
+    from memory; file_path is then only used as the document name and does not
+    need to exist yet.
     """
     if doc_type not in DOC_TYPES:
         doc_type = "Other"
@@ -57,34 +78,84 @@ def process_and_store_document(
     # Use the sophisticated chunking from create_chunks.py
     # It handles everything: parsing, columns, language, articles, chunking
     doc_type_for_chunker = 'legislation' if doc_type == 'Legislation' else 'case_law'
-    chunks = create_chunks_from_pdf(file_path, doc_type=doc_type_for_chunker)
+    # Document-wide metadata is shared by all chunks (stored once per document)
+    document_metadata = {
+        "source": extra_metadata.get("source", "amategeko.gov.rw"),
+        "source_file": source_file_name,
+        "doc_type": doc_type,
+        **extra_metadata,
+    }
+    chunks = create_chunks_from_pdf(
+        file_path, doc_type=doc_type_for_chunker, workers=workers, data=data, document_metadata=document_metadata
+    )
     
     if not chunks:
         return 0
 
-    # Enrich chunks with additional metadata before storing
-    for chunk in chunks:
-        chunk['metadata'].update({
-            "source": extra_metadata.get("source", "amategeko.gov.rw"),
-            "source_file": source_file_name,
-            "doc_type": doc_type,
-            **extra_metadata,
-        })
+    # Tie the rw/en/fr versions of each article together (siblings are
+    # expanded at retrieval; see create_embeddings.EMBEDDING_GROUP_MODE)
+    align_article_groups(chunks)
 
     # Use create_embeddings.py to handle FAISS storage
     # This function handles loading existing index, adding new documents, and saving
     create_vector_store(chunks, save_path=vector_store_path)
 
+    # Record the document's articles for exact-article lookups
+    article_index = ArticleIndex.load(vector_store_path)
+    article_index.remove_source(source_file_name)
+    article_index.add_chunks(chunks)
+    article_index.save()
+    STORE_REGISTRY.invalidate(vector_store_path)
+
     return len(chunks)
 
 
-def load_vector_store(vector_store_path: str = VECTOR_STORE_PATH) -> Optional[FAISS]:
-    """Load existing FAISS vector store"""
+class LoadedStore(NamedTuple):
+    """A vector store with the JSON files kept next to it"""
+    vector_store: FAISS
+    document_store: DocumentMetadataStore
+    article_index: ArticleIndex
+
+
+def _load_store(vector_store_path: str) -> Optional[LoadedStore]:
+    vector_store = _load_faiss(vector_store_path)
+    if not vector_store:
+        return None
+    return LoadedStore(vector_store, DocumentMetadataStore.load(vector_store_path),
+                       ArticleIndex.load(vector_store_path))
+
+
+# Stores loaded once per process and shared by all queries and chat sessions
+STORE_REGISTRY = StoreRegistry(_load_store)
+
+
+def get_loaded_store(vector_store_path: str = VECTOR_STORE_PATH) -> Optional[LoadedStore]:
+    """The shared, read-only store at vector_store_path (reloaded only when it changes on disk)"""
+    return STORE_REGISTRY.get(vector_store_path)
+
+
+def load_vector_store(vector_store_path: str = VECTOR_STORE_PATH, shared: bool = True) -> Optional[FAISS]:
+    """
+    Load existing FAISS vector store
+    
+    The shared store comes from STORE_REGISTRY and must not be modified;
+    pass shared=False for a private copy to change and save.
+    """
+    if shared:
+        loaded = get_loaded_store(vector_store_path)
+        return loaded.vector_store if loaded else None
+    return _load_faiss(vector_store_path)
+
+
+def _load_faiss(vector_store_path: str) -> Optional[FAISS]:
     if not os.path.exists(vector_store_path):
         return None
     
     try:
-        embeddings = get_embedding_model()
+        embeddings = get_embedding_model(vector_store_path)
+        mismatch = embedding_mismatch(vector_store_path, embeddings)
+        if mismatch:
+            print(f"Warning: {mismatch}", file=sys.stderr)
         vector_store = FAISS.load_local(
             vector_store_path, 
             embeddings, 
@@ -96,65 +167,192 @@ def load_vector_store(vector_store_path: str = VECTOR_STORE_PATH) -> Optional[FA
         return None
 
 
+def expand_article_groups(documents: List[Document], vector_store: FAISS) -> List[Document]:
+    """
+    Follow each hit with its sibling-language versions (article_groups.py),
+    read from the docstore by ID. A group already in the list is not repeated,
+    so three translations of one article count as one result.
+    """
+    expanded = []
+    seen_groups = set()
+    seen_ids = set()
+    for doc in documents:
+        group_id = doc.metadata.get('article_group')
+        if group_id is not None:
+            if group_id in seen_groups:
+                continue
+            seen_groups.add(group_id)
+        
+        for chunk_id in [doc.metadata.get('chunk_id')] + list(doc.metadata.get('sibling_chunk_ids') or []):
+            sibling = doc if chunk_id == doc.metadata.get('chunk_id') else vector_store.docstore.search(chunk_id)
+            if isinstance(sibling, Document) and chunk_id not in seen_ids:
+                seen_ids.add(chunk_id)
+                expanded.append(sibling)
+    return expanded
+
+
+def with_document_metadata(documents: List[Document], vector_store_path: str = VECTOR_STORE_PATH) -> List[Document]:
+    """Copies of docstore documents with their document's shared metadata merged in"""
+    loaded = get_loaded_store(vector_store_path)
+    document_store = loaded.document_store if loaded else DocumentMetadataStore.load(vector_store_path)
+    return [Document(page_content=doc.page_content, metadata=document_store.merged(doc.metadata)) for doc in documents]
+
+
+def _distinct_groups(documents: List[Document]) -> int:
+    """Number of results once the language versions of an article count as one"""
+    return len({doc.metadata.get('article_group') or id(doc) for doc in documents})
+
+
 def search_documents(
     query: str,
     k: int = 5,
     filter_dict: Optional[Dict[str, Any]] = None,
-    vector_store_path: str = VECTOR_STORE_PATH
+    vector_store_path: str = VECTOR_STORE_PATH,
+    expand_siblings: bool = True
 ) -> List[Document]:
     """
     Search documents in FAISS vector store
     
     Args:
         query: Search query text
-        k: Number of results to return
+        k: Number of results to return (an article and its translations count once)
         filter_dict: Optional metadata filters (e.g., {"doc_type": "Legislation"})
         vector_store_path: Path to FAISS index
+        expand_siblings: Follow each article hit with its other language versions
     
     Returns:
         List of relevant Document objects with metadata
     """
-    vector_store = load_vector_store(vector_store_path)
-    if not vector_store:
+    loaded = get_loaded_store(vector_store_path)
+    if not loaded:
         return []
+    vector_store, document_store = loaded.vector_store, loaded.document_store
     
+    def metadata_matches(doc: Document) -> bool:
+        metadata = document_store.merged(doc.metadata) if filter_dict else doc.metadata
+        for key, value in (filter_dict or {}).items():
+            doc_value = metadata.get(key)
+            if isinstance(value, (list, tuple, set)):
+                if doc_value not in value:
+                    return False
+            else:
+                if doc_value != value:
+                    return False
+        return True
+
+    def top_k(results: List[Document]) -> List[Document]:
+        kept = []
+        groups = set()
+        for doc in results:
+            group_id = doc.metadata.get('article_group') or id(doc)
+            if group_id not in groups:
+                if len(groups) == k:
+                    break
+                groups.add(group_id)
+            kept.append(doc)
+        if expand_siblings:
+            kept = expand_article_groups(kept, vector_store)
+        return [Document(page_content=doc.page_content, metadata=document_store.merged(doc.metadata)) for doc in kept]
+
     try:
-        if filter_dict:
-            # FAISS doesn't support metadata filtering natively.
-            # We over-fetch and filter manually, increasing fetch size progressively
-            # so selected-file searches still return results in large mixed indexes.
-            def metadata_matches(doc: Document) -> bool:
-                for key, value in filter_dict.items():
-                    doc_value = doc.metadata.get(key)
-                    if isinstance(value, (list, tuple, set)):
-                        if doc_value not in value:
-                            return False
-                    else:
-                        if doc_value != value:
-                            return False
-                return True
-
-            total_docs = getattr(vector_store.index, "ntotal", k)
-            initial_fetch = min(max(k * 10, 50), total_docs)
-            fetch_k = max(initial_fetch, k)
-            max_fetch = total_docs
-
-            while True:
-                results = vector_store.similarity_search(query, k=fetch_k)
-                filtered = [doc for doc in results if metadata_matches(doc)]
-
-                if len(filtered) >= k or fetch_k >= max_fetch:
-                    return filtered[:k]
-
-                # Increase retrieval window and try again
-                fetch_k = min(fetch_k * 2, max_fetch)
-        else:
-            return vector_store.similarity_search(query, k=k)
+        # FAISS doesn't support metadata filtering natively, and an unexpanded
+        # index may return several translations of one article.
+        # We over-fetch and filter manually, increasing fetch size progressively
+        # so selected-file searches still return results in large mixed indexes.
+        total_docs = getattr(vector_store.index, "ntotal", k)
+        fetch_k = min(max(k * 10, 50), total_docs) if filter_dict else min(k * 3, total_docs)
+        fetch_k = max(fetch_k, k)
+        max_fetch = total_docs
+
+        while True:
+            results = vector_store.similarity_search(query, k=fetch_k)
+            filtered = [doc for doc in results if metadata_matches(doc)]
+
+            if _distinct_groups(filtered) >= k or fetch_k >= max_fetch:
+                return top_k(filtered)
+
+            # Increase retrieval window and try again
+            fetch_k = min(fetch_k * 2, max_fetch)
     except Exception as e:
         print(f"Error searching documents: {e}")
         return []
 
 
+def _rank_sources(query: str, sources: List[str], vector_store: FAISS, limit: int) -> List[str]:
+    """The limit documents among sources whose chunks are closest to the query (one similarity search)"""
+    total = getattr(vector_store.index, "ntotal", 0)
+    if not total:
+        return []
+    try:
+        results = vector_store.similarity_search(
+            query, k=min(total, limit * 10), filter={"source_file": sources},
+            fetch_k=min(total, max(50, len(sources) * 20))
+        )
+    except Exception as e:
+        print(f"Error ranking documents: {e}")
+        return []
+    return list(dict.fromkeys(doc.metadata.get("source_file") for doc in results))[:limit]
+
+
+def lookup_article_chunks(
+    query: str,
+    source_files: Optional[List[str]] = None,
+    vector_store: Optional[FAISS] = None,
+    vector_store_path: str = VECTOR_STORE_PATH,
+    max_documents: int = ARTICLE_LOOKUP_MAX_DOCUMENTS
+) -> List[Document]:
+    """
+    Chunks of the articles a query names explicitly ("Ingingo ya 91", "Article 12")
+    
+    References are resolved through the article index and the chunks read from the
+    docstore by ID. A reference without a language ("Article 5") returns one
+    language version per document. When more than max_documents documents have
+    the article, one similarity search over those documents keeps the
+    max_documents closest to the query.
+    
+    Returns [] when the query names no article, the index does not know it or
+    the search cannot tell the documents apart, so callers fall back to
+    search_documents.
+    """
+    references = scan_articles(query)
+    if not references:
+        return []
+    
+    loaded = get_loaded_store(vector_store_path)
+    vector_store = vector_store or (loaded.vector_store if loaded else None)
+    if not vector_store:
+        return []
+    
+    article_index = loaded.article_index if loaded else ArticleIndex.load(vector_store_path)
+    documents = []
+    seen = set()
+    for reference in references:
+        language = reference['language']
+        entries = article_index.lookup(reference['number'], language, source_files)
+        if not entries and language:
+            # e.g. "Ingingo ya 5" asked about a document indexed only in English
+            language = None
+            entries = article_index.lookup(reference['number'], None, source_files)
+        if language is None:
+            entries = preferred_versions(entries)
+        
+        sources = list(dict.fromkeys(entry['source_file'] for entry in entries))
+        if len(sources) > max_documents:
+            ranked = _rank_sources(query, sources, vector_store, max_documents)
+            if not ranked:
+                return []
+            entries = [entry for entry in entries if entry['source_file'] in ranked]
+        
+        for entry in entries:
+            for chunk_id in entry['chunk_ids']:
+                doc = vector_store.docstore.search(chunk_id)
+                if isinstance(doc, Document) and chunk_id not in seen:
+                    seen.add(chunk_id)
+                    documents.append(doc)
+    
+    return with_document_metadata(documents, vector_store_path)
+
+
 def delete_document_from_store(
     source_file_name: str, 
     vector_store_path: str = VECTOR_STORE_PATH
@@ -162,35 +360,48 @@ def delete_document_from_store(
     """
     Remove all chunks for a specific document from FAISS vector store
     
-    Note: FAISS doesn't support direct deletion. This function:
-    1. Loads the existing index
-    2. Filters out documents matching source_file_name
-    3. Recreates the index with remaining documents
+    The document's vectors are removed from the index by ID (FAISS.delete maps
+    docstore IDs to index positions), its docstore entries are dropped and the
+    result is saved. Nothing is re-embedded and the embedding model is never
+    loaded. compact_vector_store runs when the embedding cache has grown well
+    past the live index.
     """
-    vector_store = load_vector_store(vector_store_path)
+    vector_store = load_vector_store(vector_store_path, shared=False)
     if not vector_store:
         return
     
     try:
-        # Get all documents from the store
-        all_docs = vector_store.docstore._dict.values()
-        
-        # Filter out documents from the specified file
-        remaining_docs = [
-            doc for doc in all_docs 
-            if doc.metadata.get("source_file") != source_file_name
+        # Chunks of the specified file (vectors and docstore-only sibling chunks)
+        doc_ids = [
+            doc_id for doc_id, doc in vector_store.docstore._dict.items()
+            if doc.metadata.get("source_file") == source_file_name
         ]
         
-        if len(remaining_docs) == len(all_docs):
+        if not doc_ids:
             print(f"No documents found with source_file: {source_file_name}")
             return
         
-        # Recreate FAISS index with remaining documents
-        if remaining_docs:
-            embeddings = get_embedding_model()
-            new_store = FAISS.from_documents(remaining_docs, embeddings)
-            new_store.save_local(vector_store_path)
-            print(f"Deleted {len(all_docs) - len(remaining_docs)} chunks from {source_file_name}")
+        article_index = ArticleIndex.load(vector_store_path)
+        if article_index.remove_source(source_file_name):
+            article_index.save()
+        document_store = DocumentMetadataStore.load(vector_store_path)
+        if document_store.remove(source_file_name):
+            document_store.save()
+        
+        indexed = set(vector_store.index_to_docstore_id.values())
+        vector_ids = [doc_id for doc_id in doc_ids if doc_id in indexed]
+        if vector_ids:
+            vector_store.delete(vector_ids)
+        stored_only = [doc_id for doc_id in doc_ids if doc_id not in indexed]
+        if stored_only:
+            vector_store.docstore.delete(stored_only)
+        
+        if vector_store.index.ntotal:
+            vector_store.save_local(vector_store_path)
+            print(f"Deleted {len(doc_ids)} chunks from {source_file_name}")
+            cache = vector_store.embedding_function.cache
+            if len(cache) > COMPACT_RATIO * _embedded_texts(vector_store):
+                compact_vector_store(vector_store_path, vector_store)
         else:
             # All documents removed - delete the index
             import shutil
@@ -200,4 +411,50 @@ def delete_document_from_store(
     
     except Exception as e:
         print(f"Error deleting document: {e}")
+    finally:
+        STORE_REGISTRY.invalidate(vector_store_path)
+
+
+def _embedded_texts(vector_store: FAISS) -> int:
+    """Texts of the store that have a cached vector: the indexed chunks, plus the
+    sibling-language chunks averaged into them in 'pooled' mode"""
+    if EMBEDDING_GROUP_MODE == 'pooled':
+        return len(vector_store.docstore._dict)
+    return vector_store.index.ntotal
 
+
+def compact_vector_store(
+    vector_store_path: str = VECTOR_STORE_PATH,
+    vector_store: Optional[FAISS] = None
+) -> Dict[str, int]:
+    """
+    Reclaim space left behind by deletions and re-uploads.
+    
+    - Docstore entries with no vector that no indexed chunk lists as a sibling
+      (article_groups.py) are dropped.
+    - The embedding cache is rewritten with only the vectors of text still in
+      the store (it is append-only, so deleted and replaced chunks stay there
+      until compaction). Each vector store has its own cache
+      (embedding_cache.store_cache_dir), so other stores keep their vectors.
+    
+    Returns the number of docstore entries and cached vectors dropped.
+    """
+    vector_store = vector_store or load_vector_store(vector_store_path, shared=False)
+    if not vector_store:
+        return {'docstore': 0, 'embedding_cache': 0}
+    
+    documents = vector_store.docstore._dict
+    indexed = set(vector_store.index_to_docstore_id.values())
+    referenced = set(indexed)
+    for doc_id in indexed:
+        referenced.update(documents[doc_id].metadata.get('sibling_chunk_ids') or [])
+    orphans = [doc_id for doc_id in documents if doc_id not in referenced]
+    if orphans:
+        vector_store.docstore.delete(orphans)
+        vector_store.save_local(vector_store_path)
+        STORE_REGISTRY.invalidate(vector_store_path)
+    
+    cache = vector_store.embedding_function.cache
+    dropped = cache.compact([doc.page_content for doc in documents.values()])
+    print(f"Compacted: {len(orphans)} orphaned chunks, {dropped} cached vectors dropped")
+    return {'docstore': len(orphans), 'embedding_cache': dropped}
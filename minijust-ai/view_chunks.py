@@ -7,21 +7,21 @@ import json
 
 
 def view_chunks(pdf_path: str, num_chunks: int = 5):
-    """View full content of first N chunks"""
+    """View full content of first N chunks (only the pages they come from are parsed)"""
     
     print(f"\n{'='*80}")
     print(f"VIEWING CHUNKS FROM: {pdf_path}")
     print(f"{'='*80}\n")
     
-    chunks = create_chunks_from_pdf(pdf_path)
+    chunks = create_chunks_from_pdf(pdf_path, max_chunks=num_chunks)
     
-    for i, chunk in enumerate(chunks[:num_chunks], 1):
+    for i, chunk in enumerate(chunks, 1):
         print(f"\n{'─'*80}")
         print(f"CHUNK {i}/{len(chunks)}")
         print(f"{'─'*80}")
         print(f"Chunk ID: {chunk['chunk_id']}")
         print(f"\nMetadata:")
-        print(json.dumps(chunk['metadata'], indent=2))
+        print(json.dumps(dict(chunk['metadata']), indent=2))
         print(f"\n📄 FULL TEXT:")
         print(f"{'─'*80}")
         print(chunk['text'])